@@ -2,4 +2,11 @@ from django.apps import AppConfig
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps'  # Should match your app's Python path
\ No newline at end of file
+    name = 'apps'  # Should match your app's Python path
+
+    def ready(self):
+        from django.conf import settings
+
+        if settings.PROVIDER_CLIENTS_WARMUP:
+            from .provider_clients import clients
+            clients.warm_up_in_background()
@@ -0,0 +1,192 @@
+# apps/disk_cache.py
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRUCache:
+    """
+    Content-addressed file cache on local disk with a total size bound.
+
+    Entries live in <root>/<key[:2]>/<key><suffix>. A hit bumps the file's
+    mtime. Files are written to a temporary name and renamed into place,
+    so readers never see partial entries and several processes can share
+    one cache directory.
+
+    The size and entry count are tracked in memory and updated on every
+    insert, so an insert costs no directory scan. Only when the tracked
+    total passes max_bytes (or max_entries) is the directory scanned and
+    the least recently used files removed, down to LOW_WATER of the bound
+    so the next inserts do not scan again. The scan also resynchronizes
+    the totals with what other processes wrote; so does a periodic scan
+    every RESYNC_PUTS inserts.
+
+    Hit/miss counters are kept per process.
+    """
+
+    # Eviction stops at this fraction of the bounds
+    LOW_WATER = 0.9
+    # Inserts between rescans that pick up other processes' writes
+    RESYNC_PUTS = 1000
+
+    def __init__(self, root, max_bytes=None, suffix='', max_entries=None):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Tracked totals; None until the first insert scans the directory
+        self._bytes = None
+        self._entry_count = None
+        self._puts_since_scan = 0
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], f"{key}{self.suffix}")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def open(self, key):
+        """Return the cached file opened for reading, or None on a miss."""
+        path = self.path_for(key)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            self._count(False)
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self._count(True)
+        return f
+
+    def get(self, key):
+        """Return the cached bytes, or None on a miss."""
+        f = self.open(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def contains(self, key):
+        return os.path.exists(self.path_for(key))
+
+    def _commit(self, key, write):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            size = os.path.getsize(temp_path)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = None
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        if self._track(size, replaced):
+            self.evict()
+        return path
+
+    def _over(self, total, count, factor=1.0):
+        return ((self.max_bytes is not None and total > self.max_bytes * factor)
+                or (self.max_entries is not None and count > self.max_entries * factor))
+
+    def _track(self, size, replaced):
+        """Add an insert to the tracked totals; True when a scan is due."""
+        with self._lock:
+            if self._bytes is None:
+                return True
+            self._bytes += size - (replaced or 0)
+            self._entry_count += 0 if replaced is not None else 1
+            self._puts_since_scan += 1
+            return self._puts_since_scan >= self.RESYNC_PUTS or self._over(self._bytes, self._entry_count)
+
+    def put_file(self, key, source_path):
+        """Copy a file into the cache under key and return its cached path."""
+        def write(f):
+            with open(source_path, 'rb') as source:
+                shutil.copyfileobj(source, f, 1024 * 1024)
+        return self._commit(key, write)
+
+    def put(self, key, data):
+        """Store bytes under key and return the cached path."""
+        return self._commit(key, lambda f: f.write(data))
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith('.tmp-') or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """
+        Rescan the cache, and when it is over a bound remove least recently
+        used entries until it is under LOW_WATER of the bounds.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+
+        removed = 0
+        if self._over(total, count):
+            for _, size, path in sorted(entries):
+                if not self._over(total, count, self.LOW_WATER):
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                count -= 1
+                removed += 1
+            logger.info(f"Evicted {removed} entries from {self.root}")
+        with self._lock:
+            self.evictions += removed
+            self._bytes, self._entry_count, self._puts_since_scan = total, count, 0
+        return removed
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'evictions': evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+        }
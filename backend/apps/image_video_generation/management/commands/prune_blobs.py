@@ -0,0 +1,46 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.image_video_generation.models import GeneratedImageBlob, Video, VideoImage
+from apps.image_video_generation.services.media_delivery import max_token_age
+from apps.image_video_generation.storage import BlobStorage, blob_storage
+
+
+class Command(BaseCommand):
+    help = 'Delete blob files that no video or image references and no unexpired generated-image URL points to'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the unreferenced blobs')
+
+    def handle(self, *args, **options):
+        referenced = set()
+        for video_file, poster_file, sprite_file, thumbnails in Video.objects.values_list(
+                'video_file', 'poster_file', 'sprite_file', 'thumbnails').iterator():
+            referenced.update([video_file, poster_file, sprite_file, *thumbnails.values()])
+        for image_file, thumbnails in VideoImage.objects.values_list('image_file', 'thumbnails').iterator():
+            referenced.update([image_file, *thumbnails.values()])
+        # Generated images are only referenced by signed URLs, kept until the last one expires
+        expired = GeneratedImageBlob.objects.filter(served_at__lt=timezone.now() - timedelta(seconds=max_token_age()))
+        if not options['dry_run']:
+            expired.delete()
+        referenced.update(GeneratedImageBlob.objects.exclude(pk__in=expired.values('pk')).values_list('name', flat=True))
+
+        root = blob_storage.path(BlobStorage.prefix)
+        removed = freed = 0
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, blob_storage.location).replace(os.sep, '/')
+                if name in referenced:
+                    continue
+                size = os.path.getsize(path)
+                if not options['dry_run']:
+                    os.remove(path)
+                removed += 1
+                freed += size
+
+        action = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(f"{action} {removed} blobs ({freed} bytes)")
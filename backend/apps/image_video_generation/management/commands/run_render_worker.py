@@ -0,0 +1,86 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from ...services.render_jobs import RenderJobService
+from ...services.uploads import UploadSessionService
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps of abandoned upload sessions
+PURGE_INTERVAL = 600
+# Seconds between sweeps for jobs of workers that died mid-render
+REQUEUE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Process queued video render and subtitle burn-in jobs from the database (no external broker needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=300,
+                            help='Requeue running jobs without a heartbeat for this many seconds')
+        parser.add_argument('--once', action='store_true',
+                            help='Process the jobs currently queued, then exit')
+        parser.add_argument('--concurrency', type=int, default=settings.RENDER_WORKER_CONCURRENCY,
+                            help='Jobs rendered at once; they split RENDER_CPU_CORES through the render '
+                                 'scheduler, which only sees the jobs of its own process, so prefer one '
+                                 'worker with a higher concurrency over several workers on one machine')
+
+    def _run(self, job):
+        started = time.time()
+        try:
+            RenderJobService.run(job)
+            job.refresh_from_db()
+            self.stdout.write(f"Job {job.id} {job.status} in {time.time() - started:.1f}s")
+        finally:
+            # Pool threads keep their own connection otherwise
+            connection.close()
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        self.stdout.write("Render worker started")
+
+        last_purge = 0
+        last_requeue = 0
+        concurrency = max(1, options['concurrency'])
+        running = set()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            while True:
+                close_old_connections()
+                if time.time() - last_requeue > REQUEUE_INTERVAL:
+                    # Running jobs heartbeat every second, so only dead workers' jobs go stale
+                    requeued = RenderJobService.requeue_stale(options['stale_after'])
+                    if requeued:
+                        self.stdout.write(f"Requeued {requeued} stale render job(s)")
+                    last_requeue = time.time()
+                if time.time() - last_purge > PURGE_INTERVAL:
+                    purged = UploadSessionService.purge_expired(settings.UPLOAD_SESSION_MAX_AGE)
+                    if purged:
+                        self.stdout.write(f"Removed {purged} expired upload session(s)")
+                    last_purge = time.time()
+
+                job = RenderJobService.claim_next() if len(running) < concurrency else None
+                if job is not None:
+                    self.stdout.write(f"Rendering job {job.id}")
+                    running.add(executor.submit(self._run, job))
+                    continue
+                if not running and options['once']:
+                    break
+                # Wake up when a slot frees or it is time to poll again
+                done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        logger.error(f"Render worker thread failed: {future.exception()}")
+                if not done and not running:
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Render worker stopped")
+        finally:
+            executor.shutdown(wait=True)
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:06
+
+import base64
+import mimetypes
+import tempfile
+
+import apps.image_video_generation.storage
+from django.core.files import File
+from django.db import migrations, models
+
+BATCH_SIZE = 20
+# Base64 characters decoded per step; a multiple of 4 so chunks decode independently
+DECODE_CHUNK = 4 * 256 * 1024
+
+
+def _decode_to_file(text, target):
+    for start in range(0, len(text), DECODE_CHUNK):
+        target.write(base64.b64decode(text[start:start + DECODE_CHUNK]))
+
+
+def _split_data_url(value):
+    """Return (extension, base64 payload) of a data URL or a bare base64 string."""
+    if value.startswith('data:') and ',' in value:
+        header, payload = value.split(',', 1)
+        content_type = header[5:].split(';', 1)[0]
+        return mimetypes.guess_extension(content_type) or '.png', payload
+    return '.png', value
+
+
+def _convert(model, text_field, file_field, default_extension):
+    """
+    Move base64 text into the blob store, BATCH_SIZE rows at a time.
+
+    Only the primary keys are listed up front; each batch loads its rows'
+    text, decodes it by chunks into a temporary file and saves that file.
+    Memory stays bounded by one batch: the database driver may fetch all
+    BATCH_SIZE texts of a batch at once.
+    """
+    from apps.image_video_generation.storage import blob_storage
+
+    pks = list(model.objects.filter(**{f'{file_field}__isnull': True}).values_list('pk', flat=True).order_by('pk'))
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = pks[start:start + BATCH_SIZE]
+        for pk, text in model.objects.filter(pk__in=batch).values_list('pk', text_field).iterator():
+            if not text:
+                continue
+            extension, payload = _split_data_url(text) if default_extension is None else (default_extension, text)
+            del text
+            with tempfile.TemporaryFile() as temp_file:
+                _decode_to_file(payload, temp_file)
+                del payload
+                name = blob_storage.save(f"blob{extension}", File(temp_file))
+            model.objects.filter(pk=pk).update(**{file_field: name, text_field: ''})
+
+
+def _restore(model, text_field, file_field, data_url):
+    from apps.image_video_generation.storage import blob_storage
+
+    pks = list(model.objects.exclude(**{file_field: ''}).exclude(**{f'{file_field}__isnull': True})
+               .values_list('pk', flat=True).order_by('pk'))
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = pks[start:start + BATCH_SIZE]
+        for pk, name in model.objects.filter(pk__in=batch).values_list('pk', file_field).iterator():
+            with blob_storage.open(name, 'rb') as f:
+                text = base64.b64encode(f.read()).decode('utf-8')
+            if data_url:
+                content_type = mimetypes.guess_type(name)[0] or 'image/png'
+                text = f"data:{content_type};base64,{text}"
+            model.objects.filter(pk=pk).update(**{text_field: text})
+
+
+def blobs_forward(apps, schema_editor):
+    _convert(apps.get_model('image_video_generation', 'Video'), 'video_base64', 'video_file', '.mp4')
+    _convert(apps.get_model('image_video_generation', 'VideoImage'), 'image_base64', 'image_file', None)
+
+
+def blobs_backward(apps, schema_editor):
+    _restore(apps.get_model('image_video_generation', 'Video'), 'video_base64', 'video_file', False)
+    _restore(apps.get_model('image_video_generation', 'VideoImage'), 'image_base64', 'image_file', True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_video_generation', '0003_renderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='video_file',
+            field=models.FileField(blank=True, null=True, storage=apps.image_video_generation.storage.get_blob_storage, upload_to='videos/'),
+        ),
+        migrations.AddField(
+            model_name='videoimage',
+            name='image_file',
+            field=models.FileField(blank=True, null=True, storage=apps.image_video_generation.storage.get_blob_storage, upload_to='images/'),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='video_base64',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='videoimage',
+            name='image_base64',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(blobs_forward, blobs_backward),
+        migrations.RemoveField(
+            model_name='video',
+            name='video_base64',
+        ),
+        migrations.RemoveField(
+            model_name='videoimage',
+            name='image_base64',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_video_generation', '0004_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='video_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:12
+
+import apps.image_video_generation.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_video_generation', '0005_video_listing_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='poster_file',
+            field=models.FileField(blank=True, null=True, storage=apps.image_video_generation.storage.get_blob_storage, upload_to='posters/'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='sprite_file',
+            field=models.FileField(blank=True, null=True, storage=apps.image_video_generation.storage.get_blob_storage, upload_to='sprites/'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='sprite_meta',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='videoimage',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
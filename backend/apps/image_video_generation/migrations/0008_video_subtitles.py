@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_video_generation', '0007_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='subtitles',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_video_generation', '0008_video_subtitles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneratedImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('served_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_video_generation', '0009_generatedimageblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='renderjob',
+            name='kind',
+            field=models.CharField(choices=[('render', 'Render story video'), ('burn', 'Burn in subtitles')], default='render', max_length=20),
+        ),
+    ]
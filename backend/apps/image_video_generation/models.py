@@ -1,5 +1,7 @@
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from .storage import get_blob_storage
 
 
 # class GeneratedImage(models.Model):
@@ -20,20 +22,100 @@ from django.contrib.auth.models import User
 
 class Video(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='videos')
-    video_base64 = models.TextField()  # Store base64-encoded video
+    video_file = models.FileField(upload_to='videos/', storage=get_blob_storage, null=True, blank=True)  # Content-addressed MP4
+    poster_file = models.FileField(upload_to='posters/', storage=get_blob_storage, null=True, blank=True)  # First frame, JPEG
+    thumbnails = models.JSONField(default=dict, blank=True)  # Poster thumbnails: {"<width>": blob name}
+    sprite_file = models.FileField(upload_to='sprites/', storage=get_blob_storage, null=True, blank=True)  # Scrubbing sprite sheet
+    sprite_meta = models.JSONField(default=dict, blank=True)  # Sprite layout: interval, count, columns, rows, tile size
+    subtitles = models.JSONField(default=list, blank=True)  # Caption cues of the narration: [[start, end, text], ...]
     resolution = models.CharField(max_length=20)  # e.g., "1024x576"
     frame_count = models.IntegerField()
     total_duration = models.FloatField()  # Duration in seconds
     created_at = models.DateTimeField(auto_now_add=True)
     prompt = models.TextField(blank=True)  # Optional: Store the prompt used to generate the video
 
+    class Meta:
+        indexes = [
+            # Serves the cursor-paginated gallery listing
+            models.Index(fields=['user', '-created_at', '-id'], name='video_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Video by {self.user.username} ({self.resolution}, {self.created_at})"
 
 class VideoImage(models.Model):
     video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='images')
-    image_base64 = models.TextField()  # Store base64-encoded image
+    image_file = models.FileField(upload_to='images/', storage=get_blob_storage, null=True, blank=True)  # Content-addressed image
+    thumbnails = models.JSONField(default=dict, blank=True)  # {"<width>": blob name}
     order = models.PositiveIntegerField()  # Order of the image in the video
 
     def __str__(self):
-        return f"Image {self.order} for Video {self.video.id}"
\ No newline at end of file
+        return f"Image {self.order} for Video {self.video.id}"
+
+class RenderJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    KIND_RENDER = 'render'
+    KIND_BURN = 'burn'
+    KIND_CHOICES = [
+        (KIND_RENDER, 'Render story video'),
+        (KIND_BURN, 'Burn in subtitles'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='render_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_RENDER)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    stage = models.CharField(max_length=50, blank=True)  # e.g. "encoding", "muxing"
+    frames_encoded = models.IntegerField(default=0)
+    total_frames = models.IntegerField(default=0)
+    params = models.JSONField(default=dict)  # durations, fps, resolution, render_mode, prompt...
+    workspace = models.CharField(max_length=255)  # Directory holding the uploaded inputs
+    video = models.ForeignKey(Video, on_delete=models.SET_NULL, null=True, blank=True, related_name='render_jobs')  # Result, or the source video of a burn job
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Doubles as the worker heartbeat
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"RenderJob {self.id} ({self.status})"
+
+class UploadSession(models.Model):
+    """A resumable upload of one render input, received in byte-range chunks."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)  # Next offset the client must send
+    path = models.CharField(max_length=255)  # Partial file on disk
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def complete(self):
+        return self.received_bytes >= self.total_size
+
+    def __str__(self):
+        return f"UploadSession {self.id} ({self.received_bytes}/{self.total_size})"
+
+class GeneratedImageBlob(models.Model):
+    """A generated image returned by URL; no video refers to its blob, so prune_blobs keeps it by age."""
+
+    name = models.CharField(max_length=255, unique=True)  # Blob name in blob_storage
+    served_at = models.DateTimeField()  # Last time a signed URL to it was handed out
+
+    def __str__(self):
+        return f"GeneratedImageBlob {self.name}"
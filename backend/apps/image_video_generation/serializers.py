@@ -0,0 +1,41 @@
+from rest_framework import serializers
+from rest_framework.pagination import CursorPagination
+from .models import Video
+from .services.media_delivery import signed_content_url, signed_url
+
+# Poster width used by the gallery cards
+POSTER_LIST_WIDTH = 320
+
+
+class VideoListSerializer(serializers.ModelSerializer):
+    """Gallery entry: metadata and URLs only, never the media bytes."""
+
+    video_url = serializers.SerializerMethodField()
+    poster_url = serializers.SerializerMethodField()
+    image_ids = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Video
+        fields = ['id', 'resolution', 'frame_count', 'total_duration', 'prompt', 'created_at',
+                  'video_url', 'poster_url', 'image_ids']
+
+    def get_video_url(self, video):
+        return signed_content_url(self.context.get('request'), 'video', video.id) if video.video_file else None
+
+    def get_poster_url(self, video):
+        request = self.context.get('request')
+        if video.poster_file:
+            return signed_url(request, 'video_poster', 'video', video.id, width=POSTER_LIST_WIDTH)
+        # Videos stored before posters existed: fall back to the first scene image
+        images = video.images.all()
+        return signed_content_url(request, 'image', images[0].id) if images else None
+
+    def get_image_ids(self, video):
+        return [img.id for img in video.images.all()]
+
+
+class VideoCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
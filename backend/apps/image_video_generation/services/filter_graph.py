@@ -0,0 +1,75 @@
+# image_video_generation/services/filter_graph.py
+
+
+def _zoom_expression(effect_frames, max_zoom):
+    """Zoompan `z` expression: zoom in over effect_frames, then restart."""
+    if effect_frames <= 1:
+        return '1'
+    step = f"mod(on,{effect_frames})"
+    return f"'1+{max_zoom - 1:.6f}*{step}/{effect_frames - 1}'"
+
+
+def build_story_filter_graph(durations, width, height, fps, transition_duration,
+                             has_audio=True, max_zoom=1.1, effect_duration=5.0):
+    """
+    Build the filter_complex for a one-pass image + audio story render.
+
+    Inputs are expected in order: one still image per scene (not looped),
+    then one audio file per scene when has_audio is set.
+
+    Each image becomes a zoompan clip of duration + transition seconds
+    (the last one without the transition), clips are joined with xfade so
+    consecutive scenes overlap by transition_duration, and every audio is
+    trimmed/padded to exactly its scene duration before being concatenated.
+
+    Returns:
+        tuple[str, str, str | None]: filter graph, video label, audio label
+    """
+    count = len(durations)
+    filters = []
+
+    for i, duration in enumerate(durations):
+        adjusted_duration = duration + transition_duration if i < count - 1 else duration
+        total_frames = max(1, int(fps * adjusted_duration))
+        effect_frames = max(1, int(min(adjusted_duration, effect_duration) * fps))
+        # Upscale once so the integer zoompan crop moves in half-pixel steps
+        filters.append(
+            f"[{i}:v]scale={width * 2}:{height * 2}:flags=lanczos,setsar=1,"
+            f"zoompan=z={_zoom_expression(effect_frames, max_zoom)}"
+            f":x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
+            f":d={total_frames}:s={width}x{height}:fps={fps},"
+            f"format=yuv420p[v{i}]"
+        )
+
+    if count == 1:
+        video_label = 'v0'
+    elif transition_duration > 0:
+        previous = 'v0'
+        offset = 0.0
+        for i in range(1, count):
+            offset += durations[i - 1]
+            label = f"x{i}"
+            filters.append(
+                f"[{previous}][v{i}]xfade=transition=fade"
+                f":duration={transition_duration:.3f}:offset={offset:.3f}[{label}]"
+            )
+            previous = label
+        video_label = previous
+    else:
+        inputs = ''.join(f"[v{i}]" for i in range(count))
+        filters.append(f"{inputs}concat=n={count}:v=1:a=0[vcat]")
+        video_label = 'vcat'
+
+    audio_label = None
+    if has_audio:
+        for i, duration in enumerate(durations):
+            filters.append(
+                f"[{count + i}:a]aformat=sample_rates=44100:channel_layouts=stereo,"
+                f"atrim=0:{duration:.3f},asetpts=PTS-STARTPTS,"
+                f"apad=whole_dur={duration:.3f}[a{i}]"
+            )
+        inputs = ''.join(f"[a{i}]" for i in range(count))
+        filters.append(f"{inputs}concat=n={count}:v=0:a=1[aout]")
+        audio_label = 'aout'
+
+    return ';'.join(filters), video_label, audio_label
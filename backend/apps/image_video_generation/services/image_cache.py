@@ -0,0 +1,36 @@
+# image_video_generation/services/image_cache.py
+import hashlib
+import os
+
+from django.conf import settings
+
+from ...disk_cache import DiskLRUCache
+
+# Bump when a change to the generation call makes cached images stale
+IMAGE_CACHE_VERSION = 2
+
+
+def normalize_prompt(prompt):
+    """Case and whitespace differences do not change the requested image."""
+    return ' '.join(prompt.split()).casefold()
+
+
+def image_cache_key(model, kind, text, style):
+    """
+    SHA-256 of the model and the normalized scene text and style.
+
+    Aspect ratio and resolution are left out on purpose: every output size
+    of a scene is derived from the same master image.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        f"{IMAGE_CACHE_VERSION}\0{model}\0{kind}\0{normalize_prompt(text)}\0{normalize_prompt(style)}".encode('utf-8')
+    )
+    return digest.hexdigest()
+
+
+# Scene masters as returned by the API, before any crop or re-encode
+image_cache = DiskLRUCache(
+    getattr(settings, 'IMAGE_CACHE_ROOT', os.path.join(settings.BASE_DIR, 'cache', 'images')),
+    getattr(settings, 'IMAGE_CACHE_MAX_BYTES', 512 * 1024 ** 2),
+)
@@ -0,0 +1,352 @@
+# image_video_generation/services/image_generation.py
+import base64
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from google.genai import errors, types
+from PIL import Image
+
+from ...provider_clients import clients
+from ..models import GeneratedImageBlob
+from ..storage import blob_storage
+from .image_cache import image_cache_key
+from .media_delivery import signed_url
+from .scene_images import (
+    CROP_MODES, covers, crop_box, derived_cache, derived_key, larger_resolution, master_lock,
+    parse_resolution, scene_masters, validate_resolution,
+)
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MODEL = "gemini-2.0-flash-exp-image-generation"
+
+
+class ImageGenerationError(Exception):
+    pass
+
+
+# Masters are cropped to every aspect ratio, so keep the subject away from the edges
+MASTER_FRAMING = "main subject centered with room around it"
+
+
+def image_prompt(prompt, style, resolution):
+    return f"{prompt}, style: {style}, resolution: {resolution}, {MASTER_FRAMING}"
+
+
+def story_prompt(paragraph, style, resolution):
+    return f"Generate not text image: {paragraph}, style: {style}, resolution: {resolution}, {MASTER_FRAMING}"
+
+
+SCENE_PROMPTS = {'image': image_prompt, 'story': story_prompt}
+
+
+def extract_image(response):
+    """Return the bytes of the first image part of a Gemini response."""
+    if not response.candidates or not response.candidates[0].content:
+        raise ImageGenerationError('No image content returned by API')
+    for part in response.candidates[0].content.parts:
+        if part.inline_data and part.inline_data.mime_type.startswith('image/'):
+            return part.inline_data.data
+    raise ImageGenerationError('Image generation failed or no image in response.')
+
+
+def aspect_size(size, aspect_ratio):
+    """Largest size with the requested aspect ratio that fits in `size`."""
+    width, height = size
+    aspect_width, aspect_height = map(int, aspect_ratio.split(':'))
+    target_width = width
+    target_height = int(width * aspect_height / aspect_width)
+
+    if target_height > height:
+        target_height = height
+        target_width = int(height * aspect_width / aspect_height)
+
+    return target_width, target_height
+
+
+def _at_least_one(size):
+    """Clamp both sides of a size to at least one pixel."""
+    return max(1, size[0]), max(1, size[1])
+
+
+# format name -> (PIL format, MIME type, file extension)
+OUTPUT_FORMATS = {
+    'png': ('PNG', 'image/png', '.png'),
+    'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+    'webp': ('WEBP', 'image/webp', '.webp'),
+    'avif': ('AVIF', 'image/avif', '.avif'),
+}
+DELIVERIES = ('base64', 'url', 'binary')
+
+
+class ImageOutput:
+    """
+    How a generated image is encoded and handed back to the client.
+
+    Args:
+        format (str): One of OUTPUT_FORMATS (png keeps the old output)
+        quality (int): 1-100, for the lossy formats
+        max_width (int): Optional downscale bound
+        crop (str): How a master is cropped to the aspect ratio, center or
+            saliency (follows the busiest part of the image)
+        delivery (str): base64 in the JSON, a signed url to the stored
+            image, or the binary image as the response body
+        request: Needed to build absolute URLs for the url delivery
+    """
+
+    def __init__(self, format='png', quality=80, max_width=None, delivery='base64', request=None, crop='center'):
+        if format not in OUTPUT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(OUTPUT_FORMATS)}")
+        if not 1 <= quality <= 100:
+            raise ValueError('quality must be between 1 and 100')
+        if max_width is not None and max_width < 16:
+            raise ValueError('max_width must be at least 16')
+        if delivery not in DELIVERIES:
+            raise ValueError(f"delivery must be one of {', '.join(DELIVERIES)}")
+        if crop not in CROP_MODES:
+            raise ValueError(f"crop must be one of {', '.join(CROP_MODES)}")
+        self.format = format
+        self.quality = quality
+        self.max_width = max_width
+        self.delivery = delivery
+        self.request = request
+        self.crop = crop
+        # Blobs handed out by URL, recorded by the request thread (see record_deliveries)
+        self._delivered = []
+        self._delivered_lock = threading.Lock()
+
+    @classmethod
+    def from_request(cls, data, request=None, deliveries=DELIVERIES):
+        """
+        Build from the JSON body of an image endpoint.
+
+        Raises:
+            ValueError: On unknown or out of range options, including
+                a malformed or too small resolution
+        """
+        try:
+            quality = int(data.get('quality', 80))
+            max_width = int(data['max_width']) if data.get('max_width') else None
+        except (TypeError, ValueError):
+            raise ValueError('quality and max_width must be integers')
+        if data.get('resolution') is not None:
+            validate_resolution(data['resolution'])
+        delivery = data.get('delivery', 'base64')
+        if delivery not in deliveries:
+            raise ValueError(f"delivery must be one of {', '.join(deliveries)}")
+        return cls(str(data.get('format', 'png')).lower().replace('jpg', 'jpeg'), quality, max_width, delivery, request,
+                   data.get('crop', 'center'))
+
+    @property
+    def mime_type(self):
+        return OUTPUT_FORMATS[self.format][1]
+
+    def encode(self, image_data, aspect_ratio, resolution=None):
+        """
+        Crop a master image to the aspect ratio, scale it down to fit
+        `resolution` (never up) and encode it in the output format.
+        """
+        img = Image.open(io.BytesIO(image_data))
+        crop = _at_least_one(aspect_size(img.size, aspect_ratio))
+        target = crop
+        bound = parse_resolution(resolution)
+        if bound:
+            target = _at_least_one(min(target, aspect_size(bound, aspect_ratio)))
+        if self.max_width and target[0] > self.max_width:
+            target = (self.max_width, max(1, round(target[1] * self.max_width / target[0])))
+
+        # Downscale on decode: JPEG sources are decoded at 1/2..1/8 scale,
+        # others are box-reduced by an integer factor before the final
+        # LANCZOS pass, which then only works on a small image
+        scale = target[0] / crop[0]
+        img.draft('RGB', (max(1, round(img.width * scale)), max(1, round(img.height * scale))))
+        if img.mode not in ('RGB', 'RGBA', 'L'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        crop = _at_least_one(aspect_size(img.size, aspect_ratio))
+        img = img.crop(crop_box(img, *crop, mode=self.crop))
+        factor = max(1, min(img.width // target[0], img.height // target[1]))
+        if factor >= 2:
+            img = img.reduce(factor)
+        if img.size != target:
+            img = img.resize(target, Image.LANCZOS)
+
+        pil_format = OUTPUT_FORMATS[self.format][0]
+        options = {}
+        if self.format == 'jpeg':
+            img = img.convert('RGB')
+            options = {'quality': self.quality, 'optimize': True, 'progressive': True}
+        elif self.format == 'webp':
+            options = {'quality': self.quality, 'method': 4}
+        elif self.format == 'avif':
+            options = {'quality': self.quality, 'speed': 8}
+        buffered = io.BytesIO()
+        img.save(buffered, format=pil_format, **options)
+        return buffered.getvalue()
+
+    def deliver(self, encoded):
+        """JSON fields carrying an encoded image for the base64 and url deliveries."""
+        if self.delivery == 'url':
+            name = blob_storage.save(f"generated{OUTPUT_FORMATS[self.format][2]}", ContentFile(encoded))
+            with self._delivered_lock:
+                self._delivered.append(name)
+            return {'image_url': signed_url(self.request, 'generated_image', 'generated', os.path.basename(name)),
+                    'mime_type': self.mime_type, 'size': len(encoded)}
+        return {'image': base64.b64encode(encoded).decode('utf-8'), 'mime_type': self.mime_type, 'size': len(encoded)}
+
+
+    def record_deliveries(self):
+        """
+        Record the blobs delivered by URL since the last call, so prune_blobs
+        keeps them while their signed URLs are valid.
+
+        deliver runs on the generator's pool threads; this is called from
+        the request thread so the pool threads never open DB connections.
+        """
+        with self._delivered_lock:
+            names, self._delivered = self._delivered, []
+        for name in names:
+            GeneratedImageBlob.objects.update_or_create(name=name, defaults={'served_at': timezone.now()})
+
+
+def _retryable(error):
+    if isinstance(error, errors.ClientError):
+        # Bad requests will fail again; only rate limiting is worth a retry
+        return error.code == 429
+    return True
+
+
+class StoryImageGenerator:
+    """
+    Generate the image of every paragraph of a story with bounded concurrency.
+
+    Each paragraph is an independent request with its own timeout and
+    retries; a paragraph that still fails is reported in its result rather
+    than failing the whole story.
+
+    A scene is generated once as a master, without aspect ratio, and every
+    aspect ratio and size is cropped from it locally, so the same scene for
+    16:9 and 9:16 costs one API call. Unchanged paragraphs of an edited
+    story reuse their masters.
+    """
+
+    def __init__(self, max_workers=None, retries=None, timeout=None):
+        self.max_workers = max_workers or settings.IMAGE_GENERATION_MAX_WORKERS
+        self.retries = settings.IMAGE_GENERATION_RETRIES if retries is None else retries
+        self.timeout = timeout or settings.IMAGE_GENERATION_TIMEOUT
+        # Shared by all workers and requests of the process (see provider_clients)
+        self.client = clients.get('genai')
+
+    def master(self, kind, text, style, resolution):
+        """
+        Return (key, resolution, raw image bytes, cached) of a scene's master.
+
+        A stored master is reused unless it was generated for a smaller
+        resolution than requested; then it is generated again at the larger
+        one and replaces the old master. New masters are requested from the
+        API, retrying transient failures.
+        """
+        key = image_cache_key(IMAGE_MODEL, kind, text, style)
+        with master_lock(key):
+            image_data, master_resolution = scene_masters.get(key)
+            if image_data is not None and covers(master_resolution, resolution):
+                return key, master_resolution, image_data, True
+            if image_data is not None:
+                resolution = larger_resolution(master_resolution, resolution)
+            image_data = self._request(SCENE_PROMPTS[kind](text, style, resolution))
+            scene_masters.put(key, image_data, resolution)
+            return key, resolution, image_data, False
+
+    def scene(self, kind, text, style, resolution, aspect_ratio, output):
+        """
+        Return (encoded image bytes, cached) of a scene at one aspect ratio and size.
+
+        `cached` tells whether the master came from the store; the crop and
+        encode derived from it are cached separately.
+        """
+        key, master_resolution, image_data, cached = self.master(kind, text, style, resolution)
+        derived = derived_key(key, master_resolution, aspect_ratio, resolution, output)
+        encoded = derived_cache.get(derived)
+        if encoded is None:
+            encoded = output.encode(image_data, aspect_ratio, resolution)
+            derived_cache.put(derived, encoded)
+        return encoded, cached
+
+    def _request(self, prompt):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.client.models.generate_content(
+                    model=IMAGE_MODEL,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_modalities=['Text', 'Image'],
+                        http_options=types.HttpOptions(timeout=int(self.timeout * 1000)),
+                    )
+                )
+                return extract_image(response)
+            except Exception as e:
+                if attempt > self.retries or not _retryable(e):
+                    raise
+                delay = 2 ** (attempt - 1)
+                logger.warning(f"Image generation attempt {attempt} failed ({e}); retrying in {delay}s")
+                time.sleep(delay)
+
+    def _generate_item(self, index, paragraph, style, resolution, aspect_ratio, output):
+        started = time.time()
+        try:
+            encoded, cached = self.scene('story', paragraph, style, resolution, aspect_ratio, output)
+            return {
+                'index': index,
+                'status': 'ok',
+                'cached': cached,
+                **output.deliver(encoded),
+                'elapsed': round(time.time() - started, 2),
+            }
+        except Exception as e:
+            logger.error(f"Image generation failed for paragraph {index}: {str(e)}")
+            return {
+                'index': index,
+                'status': 'error',
+                'error': str(e),
+                'elapsed': round(time.time() - started, 2),
+            }
+
+    def iter_story(self, paragraphs, style, resolution, aspect_ratio, output=None):
+        """
+        Yield each paragraph's result as soon as it is ready (completion order).
+
+        Finished results are handed over through a queue and no futures are
+        kept, so a result is only referenced until the caller drops it. If
+        the caller stops early, paragraphs not started yet are cancelled.
+        """
+        output = output or ImageOutput()
+        ready = queue.Queue()
+
+        def hand_over(future):
+            if not future.cancelled():
+                ready.put(future.result())
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(paragraphs))))
+        try:
+            for i, paragraph in enumerate(paragraphs):
+                executor.submit(
+                    self._generate_item, i, paragraph, style, resolution, aspect_ratio, output
+                ).add_done_callback(hand_over)
+            for _ in paragraphs:
+                yield ready.get()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate_story(self, paragraphs, style, resolution, aspect_ratio, output=None):
+        """Return the results of all paragraphs in paragraph order."""
+        results = list(self.iter_story(paragraphs, style, resolution, aspect_ratio, output))
+        return sorted(results, key=lambda result: result['index'])
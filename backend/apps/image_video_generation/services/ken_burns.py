@@ -0,0 +1,189 @@
+# image_video_generation/services/ken_burns.py
+import logging
+import subprocess
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class KenBurnsFrameGenerator:
+    """
+    Generate the slow zoom-in ("Ken Burns") frames for one still image.
+
+    The source is resized once to the size it has at the maximum zoom level.
+    Every output frame is then a scale + translate (affine) resampling of that
+    pre-scaled source. The sample positions of all zoom steps are computed
+    up front as NumPy tables and frames are produced with bilinear
+    interpolation instead of a PIL resize per frame.
+    """
+
+    def __init__(self, image, width, height, fps, duration,
+                 max_zoom=1.1, effect_duration=5.0, batch_size=4, band_rows=8, on_decoded=None):
+        """
+        Args:
+            image: Path, file object or PIL image of the scene
+            width (int), height (int): Output frame size (even numbers)
+            fps (int): Output frame rate
+            duration (float): Length of the segment in seconds
+            max_zoom (float): Zoom factor reached at the end of the effect
+            effect_duration (float): Max length of one zoom pass; the zoom
+                restarts after it, as the old frame loop did
+            batch_size (int): Number of frames handed to ffmpeg per write
+            band_rows (int): Rows resampled per NumPy pass
+            on_decoded (callable): Called with the decoded RGB source before
+                it is resized (e.g. to make thumbnails without decoding again)
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.max_zoom = max_zoom
+        self.batch_size = max(1, batch_size)
+        self.band_rows = max(1, band_rows)
+        self.total_frames = int(fps * duration)
+        self.effect_frames = max(1, int(min(duration, effect_duration) * fps))
+
+        if isinstance(image, Image.Image):
+            source = image
+        else:
+            source = Image.open(image)
+        with source:
+            source = source.convert('RGB')
+            if on_decoded:
+                on_decoded(source)
+            # The only LANCZOS resize: straight to the size at max zoom
+            src_width = int(round(width * max_zoom))
+            src_height = int(round(height * max_zoom))
+            self.source = np.asarray(source.resize((src_width, src_height), Image.LANCZOS))
+
+        self._x0, self._x1, self._wx = self._sample_tables(width, src_width)
+        self._y0, self._y1, self._wy = self._sample_tables(height, src_height)
+
+    def _zooms(self):
+        if self.effect_frames > 1:
+            steps = np.arange(self.effect_frames, dtype=np.float32) / (self.effect_frames - 1)
+        else:
+            steps = np.zeros(1, dtype=np.float32)
+        return 1 + (self.max_zoom - 1) * steps
+
+    def _sample_tables(self, out_size, src_size):
+        """Bilinear sample positions along one axis for every zoom step."""
+        zooms = self._zooms()[:, None]
+        centers = np.arange(out_size, dtype=np.float32) + 0.5
+        # Output pixel -> position in the base-size image -> pre-scaled source
+        base = out_size / 2 + (centers - out_size / 2) / zooms
+        pos = base * (src_size / out_size) - 0.5
+        pos = np.clip(pos, 0, src_size - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, src_size - 1)
+        weight = (pos - lo).astype(np.float32)
+        return lo, hi, weight
+
+    def __len__(self):
+        return self.total_frames
+
+    def render(self, step, out):
+        """
+        Render the frame for one zoom step into `out` (H, W, 3) uint8.
+
+        The transform is axis-aligned, so bilinear sampling is done as a row
+        pass then a column pass, in bands of rows that stay in CPU cache.
+        """
+        x0, x1 = self._x0[step], self._x1[step]
+        wx = self._wx[step][None, :, None]
+        y0, y1, wy = self._y0[step], self._y1[step], self._wy[step]
+
+        for start in range(0, self.height, self.band_rows):
+            band = slice(start, min(start + self.band_rows, self.height))
+            rows = self.source[y0[band]].astype(np.float32)
+            below = self.source[y1[band]].astype(np.float32)
+            below -= rows
+            below *= wy[band][:, None, None]
+            rows += below
+
+            left = np.take(rows, x0, axis=1)
+            right = np.take(rows, x1, axis=1)
+            right -= left
+            right *= wx
+            left += right
+            left += 0.5
+            out[band] = left
+        return out
+
+    def batches(self):
+        """
+        Yield every frame of the segment in (N, H, W, 3) uint8 batches.
+
+        The batch buffer is reused, so each batch must be consumed (written
+        to ffmpeg) before the next one is requested.
+        """
+        buffer = np.empty((self.batch_size, self.height, self.width, 3), dtype=np.uint8)
+        for start in range(0, self.total_frames, self.batch_size):
+            count = min(self.batch_size, self.total_frames - start)
+            for offset in range(count):
+                # Frames past the effect length loop back to the start of the zoom
+                self.render((start + offset) % self.effect_frames, buffer[offset])
+            yield buffer[:count]
+
+
+def encode_frames(ffmpeg_path, generator, output_path, extra_args=None, on_frames=None, on_batch=None):
+    """
+    Encode the frames of a generator by streaming rawvideo into ffmpeg's stdin.
+
+    Args:
+        ffmpeg_path (str): FFmpeg executable
+        generator (KenBurnsFrameGenerator): Frame source
+        output_path (str): Target video file
+        extra_args (list[str]): Extra output options placed before the output path
+        on_frames (callable): Called with the size of every batch written
+        on_batch (callable): Called as on_batch(first_frame, batch) before a
+            batch is written; the batch buffer is reused afterwards
+
+    Returns:
+        int: Number of frames written
+    """
+    cmd = [
+        ffmpeg_path, '-y',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        '-s', f"{generator.width}x{generator.height}",
+        '-framerate', str(generator.fps),
+        '-i', '-',
+        '-c:v', 'libx264',
+        '-preset', 'ultrafast',
+        '-crf', '28',
+        '-pix_fmt', 'yuv420p',
+        *(extra_args or []),
+        output_path,
+    ]
+    frames_written = 0
+    # stderr goes to a file so a chatty ffmpeg can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        try:
+            for batch in generator.batches():
+                if on_batch:
+                    on_batch(frames_written, batch)
+                process.stdin.write(batch.data)
+                frames_written += len(batch)
+                if on_frames:
+                    on_frames(len(batch))
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            return_code = process.wait()
+
+        if return_code != 0:
+            stderr_file.seek(0)
+            error = stderr_file.read().decode('utf-8', errors='replace')
+            logger.error(f"FFmpeg failed: {error}")
+            raise Exception(f"FFmpeg failed: {error}")
+
+    return frames_written
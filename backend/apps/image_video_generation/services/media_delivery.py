@@ -0,0 +1,169 @@
+# image_video_generation/services/media_delivery.py
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import parse_etags
+
+CHUNK_SIZE = 256 * 1024
+
+# For derived assets (posters, thumbnails, sprites) that never change once written
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+_signer = signing.Signer(salt='image_video_generation.media')
+
+
+def _token_period():
+    return getattr(settings, 'MEDIA_TOKEN_MAX_AGE', 6 * 3600)
+
+
+def max_token_age():
+    """Longest time a signed URL handed out now stays valid."""
+    return 2 * _token_period()
+
+
+def media_token(kind, pk):
+    """
+    Signed token granting read access to one video or image and its assets.
+
+    The expiry is rounded up to the next period boundary (one to two
+    periods from now), so URLs stay identical within a period and the
+    browser cache can reuse them.
+    """
+    period = _token_period()
+    expires = (int(time.time()) // period + 2) * period
+    return _signer.sign(f"{kind}:{pk}:{expires}")
+
+
+def check_media_token(token, kind, pk):
+    try:
+        value = _signer.unsign(token)
+    except signing.BadSignature:
+        return False
+    token_kind, _, rest = value.partition(':')
+    token_pk, _, expires = rest.partition(':')
+    return token_kind == kind and token_pk == str(pk) and expires.isdigit() and int(expires) > time.time()
+
+
+def signed_url(request, url_name, kind, pk, **params):
+    """
+    Absolute, signed URL of one of the media endpoints of an object.
+
+    Media elements (<video src>, <img src>) cannot send an Authorization
+    header, so the owner check is carried by the token instead.
+    """
+    query = urlencode({**params, 'token': media_token(kind, pk)})
+    url = f"{reverse(url_name, args=[pk])}?{query}"
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def signed_content_url(request, kind, pk):
+    return signed_url(request, f'{kind}_content', kind, pk)
+
+
+def blob_etag(name):
+    """Strong ETag: blob names are the SHA-256 of the content."""
+    return f'"{os.path.splitext(os.path.basename(name))[0]}"'
+
+
+def _iter_file(f, start, length):
+    try:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable byte range, None to serve
+    the whole file, or False when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Malformed or multiple ranges: ignoring the header is allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _with_headers(response, headers):
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def stream_file(request, field_file, content_type=None, cache_control='private, max-age=3600'):
+    """Stream the blob behind a FileField; see stream_blob."""
+    return stream_blob(request, field_file.storage, field_file.name, content_type, cache_control)
+
+
+def stream_blob(request, storage, name, content_type=None, cache_control='private, max-age=3600'):
+    """
+    Stream a stored file with Range, ETag and If-None-Match support.
+
+    The file is read CHUNK_SIZE bytes at a time, so memory use does not
+    depend on the file size.
+    """
+    etag = blob_etag(name)
+    content_type = content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    headers = {'ETag': etag, 'Accept-Ranges': 'bytes', 'Cache-Control': cache_control}
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+        response = HttpResponse(status=304)
+        return _with_headers(response, headers)
+
+    size = storage.size(name)
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header:
+        # If-Range: only honour the range when the client's copy is current
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range.strip() == etag:
+            byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return _with_headers(response, headers)
+
+    start, end = byte_range if byte_range else (0, size - 1)
+    length = end - start + 1 if size else 0
+    f = storage.open(name, 'rb')
+    response = StreamingHttpResponse(
+        _iter_file(f, start, length),
+        status=206 if byte_range else 200,
+        content_type=content_type,
+    )
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    return _with_headers(response, headers)
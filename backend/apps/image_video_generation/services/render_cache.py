@@ -0,0 +1,67 @@
+# image_video_generation/services/render_cache.py
+import hashlib
+import json
+import os
+
+from django.conf import settings
+
+from ...disk_cache import DiskLRUCache
+from ..storage import blob_storage
+
+# Bump when a renderer change makes previously cached videos stale
+RENDER_CACHE_VERSION = 2
+
+# Parameters that change the rendered output
+KEY_PARAMS = ('durations', 'fps', 'transition_duration', 'resolution', 'render_mode', 'texts')
+
+
+def _hash_upload(digest, upload):
+    # Length prefix keeps the boundaries between files unambiguous
+    digest.update(str(upload.size).encode())
+    upload.seek(0)
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+
+
+def render_cache_key(image_files, audio_files, params):
+    """
+    SHA-256 over the input bytes and the render parameters.
+
+    Args:
+        image_files (list[UploadedFile]): Scene images, in order
+        audio_files (list[UploadedFile]): Scene audios, in order
+        params (dict): Render parameters; only KEY_PARAMS are used
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {'version': RENDER_CACHE_VERSION, **{name: params.get(name) for name in KEY_PARAMS}},
+        sort_keys=True,
+    ).encode())
+    for upload in image_files:
+        digest.update(b'image')
+        _hash_upload(digest, upload)
+    for upload in audio_files:
+        digest.update(b'audio')
+        _hash_upload(digest, upload)
+    return digest.hexdigest()
+
+
+# Entries hold the blob name of the rendered video, not a second copy of it
+render_cache = DiskLRUCache(
+    getattr(settings, 'RENDER_CACHE_ROOT', os.path.join(settings.BASE_DIR, 'cache', 'renders')),
+    max_entries=getattr(settings, 'RENDER_CACHE_MAX_ENTRIES', 100000),
+)
+
+
+def cached_video_blob(key):
+    """Blob name of the video rendered for key, or None (also when prune_blobs removed it)."""
+    data = render_cache.get(key)
+    if data is None:
+        return None
+    name = data.decode('utf-8')
+    return name if blob_storage.exists(name) else None
+
+
+def remember_video_blob(key, name):
+    render_cache.put(key, name.encode('utf-8'))
@@ -0,0 +1,414 @@
+# image_video_generation/services/render_jobs.py
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+from imageio_ffmpeg import get_ffmpeg_exe
+from mutagen.mp3 import MP3
+from PIL import Image
+
+from ...subtitles import build_cues, embed as embed_subtitles
+from ..models import RenderJob, Video, VideoImage
+from .render_cache import remember_video_blob
+from .subtitle_burn import burn_video
+from .thumbnails import ThumbnailCollector, save_thumbnail_set, store_video_thumbnails
+from .video_renderer import StoryVideoRenderer, story_frame_count
+
+logger = logging.getLogger(__name__)
+
+STAGE_QUEUED = 'queued'
+STAGE_PREPARING = 'preparing'
+STAGE_SAVING = 'saving'
+STAGE_BURNING = 'burning'
+STAGE_DONE = 'done'
+
+
+def _image_extension(image_file):
+    """File extension matching the image content (uploads in the workspace have none)."""
+    try:
+        with Image.open(image_file) as img:
+            extension = f".{(img.format or 'png').lower()}"
+    except Exception:
+        extension = '.png'
+    image_file.seek(0)
+    return '.jpg' if extension == '.jpeg' else extension
+
+
+def _place_input(upload, target):
+    """
+    Put an upload at target without reading it into memory.
+
+    Uploads Django already spooled to disk (TemporaryUploadedFile, upload
+    sessions) are hard-linked; small in-memory uploads and uploads on
+    another filesystem are copied by chunks. Scratch inputs are not fsynced.
+    """
+    if hasattr(upload, 'temporary_file_path'):
+        try:
+            os.link(upload.temporary_file_path(), target)
+            return
+        except OSError:
+            pass
+    upload.seek(0)
+    with open(target, 'wb') as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+
+
+def _workspace_root():
+    return getattr(settings, 'RENDER_JOBS_ROOT', os.path.join(settings.BASE_DIR, 'render_jobs'))
+
+
+class _ProgressReporter(threading.Thread):
+    """
+    Flush a job's progress to the database at most once per interval.
+
+    The renderer reports from its encoding threads; only this thread
+    touches the database, so the pool threads never open connections.
+    updated_at is written on every interval even without new progress:
+    it is the heartbeat requeue_stale checks, and muxing and saving
+    report no frames.
+    """
+
+    def __init__(self, job, interval=1.0):
+        super().__init__(daemon=True)
+        self.job_id = job.pk
+        self.interval = interval
+        self.stage = job.stage
+        self.frames_encoded = job.frames_encoded
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stopped = threading.Event()
+
+    def update(self, stage, frames_encoded):
+        with self._lock:
+            self.stage = stage
+            self.frames_encoded = frames_encoded
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            dirty = self._dirty
+            stage, frames_encoded = self.stage, self.frames_encoded
+            self._dirty = False
+        if not dirty:
+            RenderJob.objects.filter(pk=self.job_id).update(updated_at=timezone.now())
+            return
+        RenderJob.objects.filter(pk=self.job_id).update(
+            stage=stage, frames_encoded=frames_encoded, updated_at=timezone.now()
+        )
+
+    def run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                self.flush()
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.flush()
+
+
+class RenderJobService:
+    @staticmethod
+    def _store_video(user, params, video_file, image_files, thumbnails=None):
+        """
+        Create the Video and its VideoImages from a rendered file and the scene images.
+
+        Args:
+            video_file: Open rendered MP4, or the name of a video blob
+                already in the blob store (render cache hits)
+            thumbnails (ThumbnailCollector): Poster, sprite and scene
+                thumbnails gathered during the render, if any
+        """
+        with transaction.atomic():
+            video = Video(
+                user=user,
+                resolution=params['resolution'],
+                frame_count=story_frame_count(params['durations'], params['fps'], params['transition_duration']),
+                # Segments overlap by the transition, so the video ends with the last audio
+                total_duration=sum(params['durations']),
+                prompt=params.get('prompt', ''),
+                subtitles=build_cues(params.get('texts') or [], params['durations']),
+            )
+            if isinstance(video_file, str):
+                video.video_file.name = video_file
+            else:
+                # The blob store streams the file to disk; nothing is base64-encoded
+                video.video_file.save('video.mp4', File(video_file), save=False)
+            if thumbnails is not None:
+                store_video_thumbnails(video, thumbnails)
+            video.save()
+            for order, image_file in enumerate(image_files):
+                image = VideoImage(video=video, order=order + 1)
+                image.image_file.save(f"image{_image_extension(image_file)}", File(image_file), save=False)
+                if thumbnails is not None and order in thumbnails.scene_thumbnails:
+                    image.thumbnails = save_thumbnail_set(thumbnails.scene_thumbnails[order])
+                image.save()
+        return video
+
+    @staticmethod
+    def _reuse_thumbnails(video):
+        """
+        Copy thumbnails from earlier rows with the same blobs (render cache hits).
+
+        Blobs are content-addressed, so an identical video or image stored
+        before already has its thumbnails in the blob store.
+        """
+        previous = Video.objects.filter(video_file=video.video_file.name).exclude(pk=video.pk).exclude(
+            poster_file='').exclude(poster_file__isnull=True).first()
+        if previous is not None:
+            Video.objects.filter(pk=video.pk).update(
+                poster_file=previous.poster_file.name,
+                thumbnails=previous.thumbnails,
+                sprite_file=previous.sprite_file.name,
+                sprite_meta=previous.sprite_meta,
+            )
+        for image in video.images.all():
+            previous_image = VideoImage.objects.filter(image_file=image.image_file.name).exclude(
+                pk=image.pk).exclude(thumbnails={}).first()
+            if previous_image is not None:
+                VideoImage.objects.filter(pk=image.pk).update(thumbnails=previous_image.thumbnails)
+
+    @staticmethod
+    def from_cache(user, video_blob, image_files, params):
+        """
+        Record an already finished job for a render cache hit.
+
+        Args:
+            video_blob (str): Blob name of the cached video; nothing is copied
+            image_files (list[UploadedFile]): Scene images of the request
+        """
+        for image_file in image_files:
+            image_file.seek(0)
+        video = RenderJobService._store_video(user, params, video_blob, image_files)
+        RenderJobService._reuse_thumbnails(video)
+        now = timezone.now()
+        job = RenderJob.objects.create(
+            user=user,
+            status=RenderJob.STATUS_DONE,
+            stage=STAGE_DONE,
+            params=params,
+            video=video,
+            started_at=now,
+            finished_at=now,
+        )
+        logger.info(f"Render cache hit for user {user.id}: video {video.id}")
+        return job
+
+    @staticmethod
+    def enqueue(user, image_files, audio_files, params):
+        """
+        Place the uploads in a fresh workspace and queue a render job.
+
+        The job row is only written once every input is on disk, so a
+        worker never picks up a half-written job.
+
+        Args:
+            user: Owner of the job and of the resulting video
+            image_files (list[UploadedFile]): One image per scene (uploads or SessionUploads)
+            audio_files (list[UploadedFile]): One MP3 per scene
+            params (dict): Render parameters (durations, fps, resolution, ...)
+
+        Raises:
+            ValueError: If an audio upload is not a readable MP3
+        """
+        job = RenderJob(user=user, stage=STAGE_QUEUED)
+        job.workspace = os.path.join(_workspace_root(), str(job.id))
+        os.makedirs(job.workspace, exist_ok=True)
+
+        try:
+            params['images'] = []
+            for i, img_file in enumerate(image_files):
+                name = f"image_{i}"
+                _place_input(img_file, os.path.join(job.workspace, name))
+                params['images'].append(name)
+
+            params['audios'] = []
+            for i, audio_file in enumerate(audio_files):
+                name = f"audio_{i}.mp3"
+                audio_path = os.path.join(job.workspace, name)
+                _place_input(audio_file, audio_path)
+
+                # Validate audio with mutagen before accepting the job
+                try:
+                    MP3(audio_path)
+                except Exception as e:
+                    logger.error(f"Invalid audio file {audio_path}: {str(e)}")
+                    raise ValueError(f'Invalid audio file for clip {i+1}')
+                params['audios'].append(name)
+
+            job.params = params
+            job.save()
+        except Exception:
+            shutil.rmtree(job.workspace, ignore_errors=True)
+            raise
+
+        logger.info(f"Queued render job {job.id} for user {user.id}")
+        return job
+
+    @staticmethod
+    def enqueue_burn(video, key):
+        """
+        Queue burning the captions of a video into its picture, for the burned cache entry key.
+
+        A queued or running job for the same key is returned instead of
+        queuing another one.
+        """
+        job = RenderJob.objects.filter(
+            kind=RenderJob.KIND_BURN, params__burn_key=key,
+            status__in=[RenderJob.STATUS_QUEUED, RenderJob.STATUS_RUNNING],
+        ).first()
+        if job is None:
+            job = RenderJob.objects.create(
+                user=video.user, kind=RenderJob.KIND_BURN, stage=STAGE_QUEUED, video=video, params={'burn_key': key},
+            )
+            logger.info(f"Queued subtitle burn job {job.id} for video {video.id}")
+        return job
+
+    @staticmethod
+    def claim_next():
+        """Atomically move the oldest queued job to running; None when idle."""
+        while True:
+            job = RenderJob.objects.filter(status=RenderJob.STATUS_QUEUED).order_by('created_at').first()
+            if job is None:
+                return None
+            claimed = RenderJob.objects.filter(pk=job.pk, status=RenderJob.STATUS_QUEUED).update(
+                status=RenderJob.STATUS_RUNNING,
+                stage=STAGE_PREPARING,
+                started_at=timezone.now(),
+                updated_at=timezone.now(),
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+            # Another worker won the race, try the next one
+
+    @staticmethod
+    def requeue_stale(max_age_seconds):
+        """Put back jobs whose worker stopped heartbeating (e.g. it was killed)."""
+        cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+        return RenderJob.objects.filter(status=RenderJob.STATUS_RUNNING, updated_at__lt=cutoff).update(
+            status=RenderJob.STATUS_QUEUED, stage=STAGE_QUEUED, frames_encoded=0
+        )
+
+    @staticmethod
+    def _run_burn(job):
+        reporter = _ProgressReporter(job)
+        reporter.start()
+        reporter.update(STAGE_BURNING, 0)
+        try:
+            if job.video is None:
+                raise ValueError('The video was deleted')
+            burn_video(job.video, job.params['burn_key'])
+            reporter.stop()
+            RenderJob.objects.filter(pk=job.pk).update(
+                status=RenderJob.STATUS_DONE,
+                stage=STAGE_DONE,
+                finished_at=timezone.now(),
+            )
+            logger.info(f"Subtitle burn job {job.id} finished: video {job.video_id}")
+        except Exception as e:
+            reporter.stop()
+            logger.error(f"Subtitle burn job {job.id} failed: {str(e)}", exc_info=True)
+            RenderJob.objects.filter(pk=job.pk).update(
+                status=RenderJob.STATUS_FAILED,
+                error=str(e),
+                finished_at=timezone.now(),
+            )
+
+    @staticmethod
+    def run(job):
+        """Render a claimed job and store the resulting video (or burn in its subtitles)."""
+        if job.kind == RenderJob.KIND_BURN:
+            return RenderJobService._run_burn(job)
+        params = job.params
+        durations = params['durations']
+        image_paths = [os.path.join(job.workspace, name) for name in params['images']]
+        audio_paths = [os.path.join(job.workspace, name) for name in params['audios']]
+        base_width, base_height = map(int, params['resolution'].split('x'))
+
+        reporter = _ProgressReporter(job)
+        reporter.start()
+        thumbnails = ThumbnailCollector(params['fps'], base_width, base_height)
+        try:
+            ffmpeg_path = get_ffmpeg_exe()
+            subprocess.run([ffmpeg_path, '-version'], capture_output=True, check=True)
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                renderer = StoryVideoRenderer(
+                    ffmpeg_path, temp_dir, base_width, base_height,
+                    params['fps'], params['transition_duration'],
+                    on_progress=reporter.update,
+                    thumbnails=thumbnails,
+                )
+                RenderJob.objects.filter(pk=job.pk).update(
+                    total_frames=renderer.expected_frames(durations, params['render_mode'])
+                )
+                output_path = renderer.render(image_paths, audio_paths, durations, mode=params['render_mode'])
+                if params.get('texts'):
+                    # Captions as a soft track: a stream-copy remux, nothing is drawn
+                    output_path = embed_subtitles(
+                        output_path, build_cues(params['texts'], durations), os.path.join(temp_dir, 'captioned.mp4')
+                    )
+
+                reporter.update(STAGE_SAVING, renderer.frames_encoded)
+                image_files = [open(path, 'rb') for path in image_paths]
+                try:
+                    with open(output_path, 'rb') as video_file:
+                        video = RenderJobService._store_video(job.user, params, video_file, image_files, thumbnails)
+                finally:
+                    for image_file in image_files:
+                        image_file.close()
+                if params.get('cache_key'):
+                    remember_video_blob(params['cache_key'], video.video_file.name)
+            reporter.stop()
+            RenderJob.objects.filter(pk=job.pk).update(
+                status=RenderJob.STATUS_DONE,
+                stage=STAGE_DONE,
+                video=video,
+                finished_at=timezone.now(),
+            )
+            shutil.rmtree(job.workspace, ignore_errors=True)
+            logger.info(f"Render job {job.id} finished: video {video.id}")
+        except Exception as e:
+            reporter.stop()
+            logger.error(f"Render job {job.id} failed: {str(e)}", exc_info=True)
+            RenderJob.objects.filter(pk=job.pk).update(
+                status=RenderJob.STATUS_FAILED,
+                error=str(e),
+                finished_at=timezone.now(),
+            )
+            shutil.rmtree(job.workspace, ignore_errors=True)
+
+    @staticmethod
+    def describe(job):
+        """Status payload for the polling endpoint."""
+        progress = 0.0
+        if job.total_frames:
+            progress = round(min(1.0, job.frames_encoded / job.total_frames), 3)
+        if job.status == RenderJob.STATUS_DONE:
+            progress = 1.0
+        return {
+            'job_id': str(job.id),
+            'kind': job.kind,
+            'status': job.status,
+            'stage': job.stage,
+            'frames_encoded': job.frames_encoded,
+            'total_frames': job.total_frames,
+            'progress': progress,
+            'error': job.error or None,
+            'video_id': job.video_id,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+        }
@@ -0,0 +1,80 @@
+# image_video_generation/services/render_scheduler.py
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class RenderLease:
+    """A render's share of the CPU budget, handed out by RenderCPUScheduler."""
+
+    def __init__(self, scheduler, workers):
+        self.scheduler = scheduler
+        self.workers = workers
+
+    def threads(self):
+        """
+        Encoder threads for one ffmpeg process started now.
+
+        Re-evaluated for every process, so a render that started alone
+        shrinks its later encodes once other renders join.
+        """
+        return self.scheduler.threads_per_process(self.workers)
+
+
+class RenderCPUScheduler:
+    """
+    Process-wide divider of CPU cores between concurrent video renders.
+
+    Every render holds a lease while it runs. The cores are split evenly
+    between the active leases, and each lease splits its share between its
+    parallel ffmpeg processes through the -threads option, so concurrent
+    requests do not each start one encoder thread per core.
+    """
+
+    def __init__(self, total_cores=None, max_workers=None):
+        self.total_cores = max(1, total_cores or os.cpu_count() or 1)
+        self.max_workers = max(1, max_workers or self.total_cores)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active_renders(self):
+        with self._lock:
+            return self._active
+
+    def share(self):
+        """Cores available to each active render."""
+        with self._lock:
+            return max(1, self.total_cores // max(1, self._active))
+
+    def threads_per_process(self, workers):
+        return max(1, self.share() // max(1, workers))
+
+    @contextmanager
+    def lease(self, tasks):
+        """
+        Register a render for its lifetime.
+
+        Args:
+            tasks (int): Number of independent encodes the render wants to run
+
+        Yields:
+            RenderLease: Number of parallel workers and per-process threads
+        """
+        with self._lock:
+            self._active += 1
+            share = max(1, self.total_cores // self._active)
+        workers = max(1, min(tasks, share, self.max_workers))
+        try:
+            yield RenderLease(self, workers)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+render_scheduler = RenderCPUScheduler(
+    total_cores=getattr(settings, 'RENDER_CPU_CORES', None),
+    max_workers=getattr(settings, 'RENDER_MAX_SEGMENT_WORKERS', None),
+)
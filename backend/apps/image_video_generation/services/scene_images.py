@@ -0,0 +1,152 @@
+# image_video_generation/services/scene_images.py
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from ...disk_cache import DiskLRUCache
+from .image_cache import image_cache
+
+CROP_MODES = ('center', 'saliency')
+
+# Side of the grayscale thumbnail the saliency map is computed on
+SALIENCY_SIZE = 128
+
+# Smallest side a requested resolution may have
+MIN_RESOLUTION = 16
+
+# Fixed stripe of locks shared by all masters, so the set never grows
+MASTER_LOCK_STRIPES = 64
+_master_locks = [threading.Lock() for _ in range(MASTER_LOCK_STRIPES)]
+
+
+def parse_resolution(resolution):
+    """'1024x576' -> (1024, 576); None for anything else."""
+    try:
+        width, height = map(int, str(resolution).lower().split('x'))
+    except ValueError:
+        return None
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def validate_resolution(resolution):
+    """
+    Check a requested 'WIDTHxHEIGHT' resolution.
+
+    Raises:
+        ValueError: If it is malformed or a side is below MIN_RESOLUTION
+    """
+    size = parse_resolution(resolution)
+    if size is None or min(size) < MIN_RESOLUTION:
+        raise ValueError(f"resolution must be WIDTHxHEIGHT with both sides at least {MIN_RESOLUTION}")
+
+
+def covers(master_resolution, resolution):
+    """Whether a master generated for master_resolution is good enough for resolution."""
+    master_size, size = parse_resolution(master_resolution), parse_resolution(resolution)
+    if master_size is None or size is None:
+        return True
+    return max(master_size) >= max(size)
+
+
+def larger_resolution(a, b):
+    size_a, size_b = parse_resolution(a), parse_resolution(b)
+    if size_a is None:
+        return b
+    if size_b is None:
+        return a
+    return a if max(size_a) >= max(size_b) else b
+
+
+def master_lock(key):
+    """
+    Lock for one master, so concurrent requests for a scene generate it once.
+    Keys share a fixed set of locks; two scenes on one stripe just queue.
+    """
+    return _master_locks[hash(key) % MASTER_LOCK_STRIPES]
+
+
+class SceneMasterStore:
+    """
+    Generated scene masters in the image cache, with the resolution each
+    one was requested at kept in a small sidecar entry.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, key):
+        """Return (master bytes, requested resolution), or (None, None)."""
+        data = self.cache.get(key)
+        if data is None:
+            return None, None
+        # Read directly so the sidecar does not count towards hit/miss stats
+        try:
+            with open(self.cache.path_for(f"{key}-meta"), 'rb') as f:
+                resolution = json.loads(f.read()).get('resolution')
+        except (OSError, ValueError):
+            resolution = None
+        return data, resolution
+
+    def put(self, key, data, resolution):
+        self.cache.put(key, data)
+        self.cache.put(f"{key}-meta", json.dumps({'resolution': resolution}).encode('utf-8'))
+
+
+scene_masters = SceneMasterStore(image_cache)
+
+# Encoded outputs derived from masters (crop, size, format, quality)
+derived_cache = DiskLRUCache(
+    getattr(settings, 'DERIVED_IMAGE_CACHE_ROOT', os.path.join(settings.BASE_DIR, 'cache', 'derived')),
+    getattr(settings, 'DERIVED_IMAGE_CACHE_MAX_BYTES', 256 * 1024 ** 2),
+)
+
+
+def derived_key(master_key, master_resolution, aspect_ratio, resolution, output):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([
+        master_key, master_resolution, aspect_ratio, resolution,
+        output.format, output.quality, output.max_width, output.crop,
+    ]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _best_window(profile, window):
+    """Start of the window of the given length with the largest sum."""
+    if window >= len(profile):
+        return 0
+    sums = np.convolve(profile, np.ones(window, dtype=np.float32), mode='valid')
+    # Mild preference for the center, so flat images still crop centrally
+    offsets = np.abs(np.arange(len(sums)) - (len(sums) - 1) / 2) / max(1, len(sums))
+    return int(np.argmax(sums * (1 - 0.2 * offsets)))
+
+
+def crop_box(img, crop_width, crop_height, mode='center'):
+    """
+    Box (left, top, right, bottom) of a crop_width x crop_height crop.
+
+    The saliency mode looks for the window with the most edge energy
+    (gradient magnitude on a small grayscale copy), which keeps the
+    subject in frame when it is not centered.
+    """
+    left = (img.width - crop_width) // 2
+    top = (img.height - crop_height) // 2
+    if mode == 'saliency' and (crop_width < img.width or crop_height < img.height):
+        small = img.convert('L')
+        small.thumbnail((SALIENCY_SIZE, SALIENCY_SIZE))
+        luma = np.asarray(small, dtype=np.float32)
+        energy = np.zeros_like(luma)
+        energy[:, 1:] += np.abs(np.diff(luma, axis=1))
+        energy[1:, :] += np.abs(np.diff(luma, axis=0))
+        scale_x = img.width / small.width
+        scale_y = img.height / small.height
+        if crop_width < img.width:
+            start = _best_window(energy.sum(axis=0), max(1, round(crop_width / scale_x)))
+            left = min(img.width - crop_width, round(start * scale_x))
+        if crop_height < img.height:
+            start = _best_window(energy.sum(axis=1), max(1, round(crop_height / scale_y)))
+            top = min(img.height - crop_height, round(start * scale_y))
+    return left, top, left + crop_width, top + crop_height
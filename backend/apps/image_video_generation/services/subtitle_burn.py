@@ -0,0 +1,54 @@
+# image_video_generation/services/subtitle_burn.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+from ... import subtitles
+from ...disk_cache import DiskLRUCache
+
+# Bump when a change to the burn-in style makes cached videos stale
+BURN_CACHE_VERSION = 1
+
+# Stories re-encoded with their captions drawn in, made by the render worker when a burn is requested
+burned_cache = DiskLRUCache(
+    getattr(settings, 'BURNED_VIDEO_CACHE_ROOT', os.path.join(settings.BASE_DIR, 'cache', 'burned')),
+    getattr(settings, 'BURNED_VIDEO_CACHE_MAX_BYTES', 2 * 1024 ** 3),
+    suffix='.mp4',
+)
+burned_storage = FileSystemStorage(location=burned_cache.root)
+
+
+def burned_key(video):
+    """SHA-256 over the stored video blob and its cues."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {'version': BURN_CACHE_VERSION, 'video': video.video_file.name, 'cues': video.subtitles},
+    ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def burned_name(key):
+    """Name of a cached burned video in burned_storage."""
+    return os.path.relpath(burned_cache.path_for(key), burned_cache.root)
+
+
+def burn_video(video, key):
+    """
+    Re-encode the video with its captions drawn in and cache it under key.
+
+    Every frame is encoded again, so this runs in the render worker
+    (see RenderJobService.enqueue_burn), never in a request.
+    """
+    if burned_cache.contains(key):
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_path = os.path.join(temp_dir, 'video.mp4')
+        with video.video_file.open('rb') as source, open(source_path, 'wb') as f:
+            shutil.copyfileobj(source, f)
+        output_path = subtitles.burn_in(source_path, video.subtitles, os.path.join(temp_dir, 'burned.mp4'))
+        burned_cache.put_file(key, output_path)
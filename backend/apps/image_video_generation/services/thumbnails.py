@@ -0,0 +1,152 @@
+# image_video_generation/services/thumbnails.py
+import io
+import math
+import threading
+
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from ..storage import blob_storage
+
+# Widths of the thumbnails kept for posters and scene images
+THUMBNAIL_WIDTHS = (160, 320, 640)
+JPEG_QUALITY = 82
+
+# Scrubbing sprite sheet: one tile every SPRITE_INTERVAL seconds of video
+SPRITE_INTERVAL = 1.0
+SPRITE_TILE_WIDTH = 160
+SPRITE_COLUMNS = 10
+
+
+def _jpeg(image, quality=JPEG_QUALITY):
+    buffer = io.BytesIO()
+    image.convert('RGB').save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _scaled(image, width):
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def thumbnail_set(image):
+    """JPEG bytes for each of THUMBNAIL_WIDTHS that is not wider than the image."""
+    widths = [width for width in THUMBNAIL_WIDTHS if width < image.width] or [image.width]
+    # Downscale progressively: each size is made from the previous, larger one
+    thumbnails = {}
+    current = image
+    for width in sorted(widths, reverse=True):
+        current = _scaled(current, width)
+        thumbnails[width] = _jpeg(current)
+    return thumbnails
+
+
+def save_thumbnail_set(thumbnails):
+    """Store a thumbnail set in the blob store; returns {width: blob name} for a JSONField."""
+    return {
+        str(width): blob_storage.save(f"thumb{width}.jpg", ContentFile(data))
+        for width, data in thumbnails.items()
+    }
+
+
+def pick_thumbnail(thumbnails, width=None):
+    """Blob name of the smallest stored thumbnail at least `width` wide (largest if none is)."""
+    if not thumbnails:
+        return None
+    widths = sorted(int(w) for w in thumbnails)
+    if width:
+        for candidate in widths:
+            if candidate >= width:
+                return thumbnails[str(candidate)]
+    return thumbnails[str(widths[-1])]
+
+
+class ThumbnailCollector:
+    """
+    Gather poster, scene thumbnails and sprite tiles while a video renders.
+
+    The renderer hands over images and frames it already holds in memory
+    (decoded scene images, Ken Burns frame batches, or the tiles ffmpeg
+    writes from the same filter graph), so nothing is decoded a second
+    time. Only the sampled frames are converted, and they are reduced to
+    tile size right away. Safe to call from the encoding threads.
+    """
+
+    def __init__(self, fps, width, height, interval=SPRITE_INTERVAL, tile_width=SPRITE_TILE_WIDTH):
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.interval = interval
+        self.tile_width = tile_width
+        self.poster = None
+        self.scene_thumbnails = {}
+        self._tiles = {}
+        self._lock = threading.Lock()
+
+    def add_scene_image(self, index, image):
+        """Thumbnails of a decoded scene image."""
+        thumbnails = thumbnail_set(image)
+        with self._lock:
+            self.scene_thumbnails[index] = thumbnails
+
+    def set_poster(self, image):
+        with self._lock:
+            self.poster = image
+
+    def add_tile(self, index, image):
+        tile = _scaled(image, self.tile_width) if image.width != self.tile_width else image.copy()
+        with self._lock:
+            self._tiles.setdefault(index, tile)
+
+    def add_frames(self, start_time, first_frame, batch):
+        """
+        Sample a batch of rendered frames.
+
+        Args:
+            start_time (float): Position of the segment in the final video
+            first_frame (int): Index of the batch's first frame in the segment
+            batch: (N, H, W, 3) uint8 frames
+        """
+        for offset in range(len(batch)):
+            frame = first_frame + offset
+            time = start_time + frame / self.fps
+            index = int(time // self.interval)
+            with self._lock:
+                wanted = index not in self._tiles
+            if wanted:
+                image = Image.fromarray(batch[offset])
+                if start_time == 0 and frame == 0:
+                    self.set_poster(image.copy())
+                self.add_tile(index, image)
+
+    def sprite(self):
+        """Return (JPEG bytes, metadata) of the sprite sheet, or (None, {}) without tiles."""
+        with self._lock:
+            tiles = [self._tiles[index] for index in sorted(self._tiles)]
+        if not tiles:
+            return None, {}
+        tile_width, tile_height = tiles[0].size
+        columns = min(SPRITE_COLUMNS, len(tiles))
+        rows = math.ceil(len(tiles) / columns)
+        sheet = Image.new('RGB', (columns * tile_width, rows * tile_height))
+        for i, tile in enumerate(tiles):
+            sheet.paste(tile, ((i % columns) * tile_width, (i // columns) * tile_height))
+        return _jpeg(sheet, quality=70), {
+            'interval': self.interval,
+            'count': len(tiles),
+            'columns': columns,
+            'rows': rows,
+            'tile_width': tile_width,
+            'tile_height': tile_height,
+        }
+
+
+def store_video_thumbnails(video, collector):
+    """Save poster, poster thumbnails and sprite sheet of a collector onto a Video (not saved)."""
+    if collector.poster is not None:
+        video.poster_file.save('poster.jpg', ContentFile(_jpeg(collector.poster)), save=False)
+        video.thumbnails = save_thumbnail_set(thumbnail_set(collector.poster))
+    sprite, meta = collector.sprite()
+    if sprite is not None:
+        video.sprite_file.save('sprite.jpg', ContentFile(sprite), save=False)
+        video.sprite_meta = meta
@@ -0,0 +1,163 @@
+# image_video_generation/services/uploads.py
+import logging
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from ..models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadOffsetError(Exception):
+    """A chunk did not start where the session left off; the client should resume from `offset`."""
+
+    def __init__(self, offset):
+        super().__init__(f'Expected a chunk starting at byte {offset}')
+        self.offset = offset
+
+
+class SessionUpload(File):
+    """A completed upload session, usable wherever an UploadedFile is."""
+
+    def temporary_file_path(self):
+        # Same contract as TemporaryUploadedFile: the data is already on disk
+        return self.file.name
+
+
+def _uploads_root():
+    # Kept next to the render workspaces so inputs can be hard-linked into them
+    root = getattr(settings, 'RENDER_JOBS_ROOT', os.path.join(settings.BASE_DIR, 'render_jobs'))
+    return os.path.join(root, 'uploads')
+
+
+def parse_content_range(header, length):
+    """
+    Return (start, end, total) of a chunk's Content-Range header.
+
+    Raises:
+        ValueError: If the header is malformed or does not match the body length
+    """
+    match = _CONTENT_RANGE_RE.match(header.strip())
+    if not match:
+        raise ValueError('Content-Range must look like "bytes <start>-<end>/<total>"')
+    start, end, total = map(int, match.groups())
+    if end < start or end >= total or end - start + 1 != length:
+        raise ValueError('Content-Range does not match the request body')
+    return start, end, total
+
+
+class UploadSessionService:
+    @staticmethod
+    def create(user, filename, total_size):
+        session = UploadSession(user=user, filename=os.path.basename(filename)[:255], total_size=total_size)
+        os.makedirs(_uploads_root(), exist_ok=True)
+        session.path = os.path.join(_uploads_root(), str(session.id))
+        open(session.path, 'wb').close()
+        session.save()
+        logger.info(f"Opened upload session {session.id} for user {user.id} ({total_size} bytes)")
+        return session
+
+    @staticmethod
+    def append(session, start, length, stream):
+        """
+        Write `length` bytes read from `stream` at offset `start`.
+
+        The body is copied in CHUNK_SIZE reads, never held in memory. If the
+        client disconnects mid-chunk, the bytes received so far still count,
+        so the next attempt resumes from there.
+
+        Raises:
+            UploadOffsetError: If start is not the session's current offset
+            ValueError: If the chunk would go past the announced size
+        """
+        if start != session.received_bytes:
+            raise UploadOffsetError(session.received_bytes)
+        if start + length > session.total_size:
+            raise ValueError('Chunk goes past the size of the upload')
+
+        written = 0
+        with open(session.path, 'r+b') as f:
+            f.seek(start)
+            while written < length:
+                chunk = stream.read(min(CHUNK_SIZE, length - written))
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+            f.truncate(start + written)
+
+        # Conditional update: a concurrent chunk for the same offset loses
+        updated = UploadSession.objects.filter(pk=session.pk, received_bytes=start).update(
+            received_bytes=start + written, updated_at=timezone.now()
+        )
+        if not updated:
+            session.refresh_from_db()
+            raise UploadOffsetError(session.received_bytes)
+        session.received_bytes = start + written
+        return session
+
+    @staticmethod
+    def open_completed(user, session_ids):
+        """
+        Open completed sessions of a user as SessionUpload files, in order.
+
+        Raises:
+            ValueError: If a session is unknown, foreign or still incomplete
+        """
+        sessions = {str(s.id): s for s in UploadSession.objects.filter(user=user, id__in=session_ids)}
+        uploads = []
+        try:
+            for session_id in session_ids:
+                session = sessions.get(str(session_id))
+                if session is None:
+                    raise ValueError(f'Upload {session_id} not found')
+                if not session.complete:
+                    raise ValueError(f'Upload {session_id} is incomplete ({session.received_bytes}/{session.total_size} bytes)')
+                uploads.append(SessionUpload(open(session.path, 'rb'), name=session.filename))
+        except Exception:
+            for upload in uploads:
+                upload.close()
+            raise
+        return uploads
+
+    @staticmethod
+    def discard(user, session_ids):
+        """Delete sessions whose data has been handed over to a render job."""
+        for session in UploadSession.objects.filter(user=user, id__in=session_ids):
+            try:
+                os.remove(session.path)
+            except FileNotFoundError:
+                pass
+            session.delete()
+
+    @staticmethod
+    def purge_expired(max_age_seconds):
+        """Remove sessions that received nothing for max_age_seconds."""
+        cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+        expired = list(UploadSession.objects.filter(updated_at__lt=cutoff))
+        for session in expired:
+            try:
+                os.remove(session.path)
+            except FileNotFoundError:
+                pass
+            session.delete()
+        return len(expired)
+
+    @staticmethod
+    def describe(session):
+        return {
+            'upload_id': str(session.id),
+            'filename': session.filename,
+            'total_size': session.total_size,
+            'offset': session.received_bytes,
+            'complete': session.complete,
+        }
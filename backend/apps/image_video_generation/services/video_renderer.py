@@ -0,0 +1,288 @@
+# image_video_generation/services/video_renderer.py
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from .filter_graph import build_story_filter_graph
+from .ken_burns import KenBurnsFrameGenerator, encode_frames
+from .render_scheduler import render_scheduler
+from .thumbnails import THUMBNAIL_WIDTHS
+
+logger = logging.getLogger(__name__)
+
+RENDER_MODE_SEGMENTS = 'segments'
+RENDER_MODE_FILTER_GRAPH = 'filtergraph'
+RENDER_MODES = (RENDER_MODE_SEGMENTS, RENDER_MODE_FILTER_GRAPH)
+
+STAGE_ENCODING = 'encoding'
+STAGE_MUXING = 'muxing'
+
+
+def run_ffmpeg(cmd, description, on_frame=None):
+    """
+    Run an ffmpeg command, logging and raising with its stderr on failure.
+
+    When on_frame is given, ffmpeg reports its progress on stdout and the
+    callback receives the number of frames encoded so far.
+    """
+    logger.info(f"Running FFmpeg {description} command: {' '.join(cmd)}")
+    if on_frame is None:
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            logger.info(f"FFmpeg {description} output: {result.stdout}")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg {description} failed: {e.stderr}")
+            raise Exception(f"FFmpeg {description} failed: {e.stderr}")
+        return
+
+    cmd = [cmd[0], '-progress', 'pipe:1', '-nostats', *cmd[1:]]
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True)
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key == 'frame' and value.isdigit():
+                on_frame(int(value))
+        if process.wait() != 0:
+            stderr_file.seek(0)
+            error = stderr_file.read().decode('utf-8', errors='replace')
+            logger.error(f"FFmpeg {description} failed: {error}")
+            raise Exception(f"FFmpeg {description} failed: {error}")
+
+
+def story_frame_count(durations, fps, transition_duration):
+    """Frames of all scenes, each but the last extended by the transition."""
+    return sum(
+        int(fps * (duration + (transition_duration if i < len(durations) - 1 else 0)))
+        for i, duration in enumerate(durations)
+    )
+
+
+class StoryVideoRenderer:
+    """
+    Render an image + narration story into a single MP4.
+
+    Two render modes are available:
+    - segments: one libx264 encode per scene fed by the Ken Burns frame
+      generator, run in parallel within the render's CPU lease, then
+      stream-copy concat, audio concat and merge.
+    - filtergraph: a single ffmpeg invocation with zoompan, xfade
+      transitions and audio trim/concat in one filter graph.
+    """
+
+    def __init__(self, ffmpeg_path, work_dir, width, height, fps, transition_duration, on_progress=None,
+                 thumbnails=None):
+        """
+        Args:
+            on_progress (callable): Optional progress hook, called as
+                on_progress(stage, frames_encoded) from any encoding thread
+            thumbnails (ThumbnailCollector): Optional collector fed with the
+                poster, scene images and sprite tiles during the render
+        """
+        self.ffmpeg_path = ffmpeg_path
+        self.work_dir = work_dir
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.transition_duration = transition_duration
+        self.on_progress = on_progress
+        self.thumbnails = thumbnails
+        self.frames_encoded = 0
+        self._progress_lock = threading.Lock()
+
+    def _report(self, stage, added_frames=0, frames_encoded=None):
+        with self._progress_lock:
+            if frames_encoded is not None:
+                self.frames_encoded = frames_encoded
+            self.frames_encoded += added_frames
+            frames = self.frames_encoded
+        if self.on_progress:
+            self.on_progress(stage, frames)
+
+    def _path(self, name):
+        return os.path.normpath(os.path.join(self.work_dir, name))
+
+    def _adjusted_duration(self, i, durations):
+        # Every scene but the last runs into the next one for the transition
+        return durations[i] + self.transition_duration if i < len(durations) - 1 else durations[i]
+
+    def frame_count(self, durations):
+        return story_frame_count(durations, self.fps, self.transition_duration)
+
+    def expected_frames(self, durations, mode):
+        """Frames the encoders will report for a render mode, for progress."""
+        if mode == RENDER_MODE_FILTER_GRAPH:
+            # xfade overlaps the scenes, so the single output is shorter
+            return int(self.fps * sum(durations))
+        return self.frame_count(durations)
+
+    def render(self, image_paths, audio_paths, durations, mode=RENDER_MODE_SEGMENTS):
+        """
+        Render the story and return the path of the final MP4.
+
+        Args:
+            image_paths (list[str]): One still image per scene
+            audio_paths (list[str]): One MP3 per scene (may be empty)
+            durations (list[float]): Scene durations in seconds
+            mode (str): One of RENDER_MODES
+        """
+        logger.info(f"Creating video with dimensions: {self.width}x{self.height} ({mode})")
+        if mode == RENDER_MODE_FILTER_GRAPH:
+            with render_scheduler.lease(1) as lease:
+                return self._render_filter_graph(image_paths, audio_paths, durations, lease)
+        with render_scheduler.lease(len(image_paths)) as lease:
+            return self._render_segments(image_paths, audio_paths, durations, lease)
+
+    def _render_filter_graph(self, image_paths, audio_paths, durations, lease):
+        output_path = self._path('output.mp4')
+        filter_graph, video_label, audio_label = build_story_filter_graph(
+            durations, self.width, self.height, self.fps, self.transition_duration,
+            has_audio=bool(audio_paths),
+        )
+
+        inputs = []
+        for image_path in image_paths:
+            inputs += ['-i', image_path]
+        for audio_path in audio_paths:
+            inputs += ['-i', audio_path]
+
+        tiles_dir = self._path('tiles')
+        if self.thumbnails is not None:
+            # Sprite tiles come from the same graph as a second, tiny output
+            collector = self.thumbnails
+            filter_graph += (
+                f";[{video_label}]split=2[vmain][vtiles]"
+                f";[vtiles]fps=1/{collector.interval},scale={collector.tile_width}:-2[tiles]"
+            )
+            video_label = 'vmain'
+            os.makedirs(tiles_dir, exist_ok=True)
+
+        threads = str(lease.threads())
+        cmd = [
+            self.ffmpeg_path, '-y',
+            '-filter_complex_threads', threads,
+            *inputs,
+            '-filter_complex', filter_graph,
+            '-map', f'[{video_label}]',
+        ]
+        if audio_label:
+            cmd += ['-map', f'[{audio_label}]', '-c:a', 'aac', '-b:a', '128k']
+        cmd += [
+            '-c:v', 'libx264',
+            '-preset', 'ultrafast',
+            '-crf', '28',
+            '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart',
+            '-threads', threads,
+            output_path,
+        ]
+        if self.thumbnails is not None:
+            cmd += ['-map', '[tiles]', '-c:v', 'mjpeg', '-q:v', '3', '-start_number', '0',
+                    os.path.join(tiles_dir, 'tile_%04d.jpg')]
+        self._report(STAGE_ENCODING)
+        run_ffmpeg(cmd, 'filter graph', on_frame=lambda frames: self._report(STAGE_ENCODING, frames_encoded=frames))
+        if self.thumbnails is not None:
+            self._collect_filter_graph_thumbnails(image_paths, tiles_dir)
+        return output_path
+
+    def _collect_filter_graph_thumbnails(self, image_paths, tiles_dir):
+        # ffmpeg decoded the scenes itself, so they are decoded here once,
+        # at reduced size where the format allows it
+        for i, image_path in enumerate(image_paths):
+            with Image.open(image_path) as image:
+                image.draft('RGB', (THUMBNAIL_WIDTHS[-1], THUMBNAIL_WIDTHS[-1]))
+                image = image.convert('RGB')
+                self.thumbnails.add_scene_image(i, image)
+                if i == 0:
+                    # First frame: the first scene at zoom 1 over the whole frame
+                    self.thumbnails.set_poster(image.resize((self.width, self.height), Image.LANCZOS))
+        for name in sorted(os.listdir(tiles_dir)):
+            with Image.open(os.path.join(tiles_dir, name)) as tile:
+                self.thumbnails.add_tile(int(name[5:9]), tile.convert('RGB'))
+
+    def _encode_segment(self, i, image_path, durations, lease):
+        segment_path = self._path(f"segment_{i}.mp4")
+        on_decoded = on_batch = None
+        if self.thumbnails is not None:
+            # Segments are concatenated back to back, so this one starts
+            # after all frames of the previous ones
+            start_time = sum(int(self.fps * self._adjusted_duration(j, durations)) for j in range(i)) / self.fps
+            on_decoded = lambda image: self.thumbnails.add_scene_image(i, image)
+            on_batch = lambda first_frame, batch: self.thumbnails.add_frames(start_time, first_frame, batch)
+        generator = KenBurnsFrameGenerator(
+            image_path, self.width, self.height, self.fps, self._adjusted_duration(i, durations),
+            on_decoded=on_decoded,
+        )
+        frames_written = encode_frames(
+            self.ffmpeg_path, generator, segment_path,
+            extra_args=['-threads', str(lease.threads())],
+            on_frames=lambda frames: self._report(STAGE_ENCODING, added_frames=frames),
+            on_batch=on_batch,
+        )
+        logger.info(f"Encoded segment {i+1}: {frames_written} frames")
+        return segment_path
+
+    def _render_segments(self, image_paths, audio_paths, durations, lease):
+        # Encode the segments concurrently, piping the Ken Burns frames
+        # straight into ffmpeg instead of writing them to disk
+        self._report(STAGE_ENCODING)
+        with ThreadPoolExecutor(max_workers=lease.workers) as executor:
+            futures = [
+                executor.submit(self._encode_segment, i, image_path, durations, lease)
+                for i, image_path in enumerate(image_paths)
+            ]
+            segment_paths = [future.result() for future in futures]
+
+        # Concatenate segments
+        self._report(STAGE_MUXING)
+        concat_list_path = self._path('concat_list.txt')
+        with open(concat_list_path, 'w') as f:
+            for segment_path in segment_paths:
+                f.write(f"file '{segment_path}'\n")
+
+        video_no_audio_path = self._path('video_no_audio.mp4')
+        run_ffmpeg([
+            self.ffmpeg_path,
+            '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', concat_list_path,
+            '-c', 'copy',
+            video_no_audio_path
+        ], 'concat')
+
+        if not audio_paths:
+            return video_no_audio_path
+
+        # Combine audio
+        all_audio_path = self._path('final_audio.mp3')
+        audio_inputs = []
+        filter_complex = []
+        for i, audio_path in enumerate(audio_paths):
+            audio_inputs += ['-i', os.path.normpath(audio_path)]
+            filter_complex.append(f'[{i}:a]')
+
+        run_ffmpeg([
+            self.ffmpeg_path, '-y',
+            *audio_inputs,
+            '-filter_complex', f"{''.join(filter_complex)}concat=n={len(audio_paths)}:v=0:a=1[outa]",
+            '-map', '[outa]',
+            all_audio_path
+        ], 'audio')
+
+        # Merge video + audio
+        final_output_path = self._path('output.mp4')
+        run_ffmpeg([
+            self.ffmpeg_path, '-y',
+            '-i', video_no_audio_path,
+            '-i', all_audio_path,
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-shortest',
+            final_output_path
+        ], 'merge')
+        return final_output_path
@@ -0,0 +1,48 @@
+# image_video_generation/storage.py
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class BlobStorage(FileSystemStorage):
+    """
+    Content-addressed file storage under MEDIA_ROOT/blobs.
+
+    Files are named after the SHA-256 of their content and sharded into
+    two directory levels (blobs/ab/cd/abcd....mp4). Saving content that is
+    already stored writes nothing and returns the existing name, so equal
+    videos and images are kept once on disk. Because blobs can be shared,
+    deleting a row never deletes its file; see manage.py prune_blobs.
+    """
+
+    prefix = 'blobs'
+
+    @staticmethod
+    def blob_name(digest, extension):
+        return f"{BlobStorage.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        # Hash by chunks so large videos are never fully in memory
+        sha = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        content.seek(0)
+
+        name = self.blob_name(sha.hexdigest(), os.path.splitext(name)[1])
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+
+def get_blob_storage():
+    return blob_storage
+
+
+blob_storage = BlobStorage()
+
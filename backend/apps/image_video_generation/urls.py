@@ -4,11 +4,28 @@ from . import views
 urlpatterns = [
     path('generate-image/', views.generate_image, name='generate_image'),
     path('generate-images/', views.generate_images_from_story, name='generate_images'),
+    path('generate-images/stream/', views.stream_images_from_story, name='stream_images'),
+    path('generated/<str:name>/', views.generated_image_content, name='generated_image'),
     # path('generate-video/', views.generate_video_from_image, name='generate_video'),
     # path('generate-video-from-text/', views.generate_video_from_text, name='generate_video_from_text'),
     path('create-video-from-images/', views.create_video_from_images, name='create_video_from_images'),
+    path('uploads/', views.create_upload_session, name='create_upload_session'),
+    path('uploads/<uuid:upload_id>/', views.upload_session, name='upload_session'),
+    path('render-jobs/<uuid:job_id>/', views.get_render_job, name='get_render_job'),
+    path('render-jobs/<uuid:job_id>/result/', views.get_render_job_result, name='get_render_job_result'),
+    path('render-cache/stats/', views.render_cache_stats, name='render_cache_stats'),
+    path('image-cache/stats/', views.image_cache_stats, name='image_cache_stats'),
     path('user-videos/', views.UserVideosView.as_view(), name='user_videos'),
     path('delete-video/<int:video_id>/', views.delete_video, name='delete_video'),
     path('video/<int:video_id>/', views.get_video, name='get_video'),
+    path('video/<int:video_id>/content/', views.video_content, name='video_content'),
+    path('video/<int:video_id>/poster/', views.video_poster, name='video_poster'),
+    path('video/<int:video_id>/sprite/', views.video_sprite, name='video_sprite'),
+    path('video/<int:video_id>/subtitles.srt', views.video_subtitles, {'extension': 'srt'}, name='video_subtitles_srt'),
+    path('video/<int:video_id>/subtitles.vtt', views.video_subtitles, {'extension': 'vtt'}, name='video_subtitles_vtt'),
+    path('video/<int:video_id>/burned/', views.video_burned, name='video_burned'),
+    path('video/<int:video_id>/burn/', views.burn_video_subtitles, name='burn_video_subtitles'),
     path('image/<int:image_id>/', views.get_image, name='get_image'),
+    path('image/<int:image_id>/content/', views.image_content, name='image_content'),
+    path('image/<int:image_id>/thumbnail/', views.image_thumbnail, name='image_thumbnail'),
 ]
\ No newline at end of file
@@ -1,30 +1,38 @@
-import os
 import json
-import base64
 import logging
-from io import BytesIO
 import time
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
-from google import genai
-from google.genai import types
+from django.views.decorators.http import require_GET
 from PIL import Image
 from django.conf import settings
-import io
-import requests
-from gradio_client import Client, handle_file
-from moviepy import ImageSequenceClip, concatenate_videoclips, AudioFileClip, CompositeAudioClip
-import tempfile
-import numpy as np
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Video, VideoImage
-from mutagen.mp3 import MP3
-import subprocess
-from imageio_ffmpeg import get_ffmpeg_exe
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from .. import subtitles
+from .models import Video, VideoImage, RenderJob, UploadSession
+from .serializers import VideoCursorPagination, VideoListSerializer
+from .services.image_cache import image_cache
+from .services.image_generation import ImageGenerationError, ImageOutput, StoryImageGenerator
+from .services.media_delivery import (
+    IMMUTABLE_CACHE_CONTROL, check_media_token, signed_content_url, signed_url, stream_blob, stream_file,
+)
+from .services.scene_images import derived_cache
+from .services.subtitle_burn import burned_cache, burned_key, burned_name, burned_storage
+from .services.thumbnails import pick_thumbnail
+from .services.uploads import UploadOffsetError, UploadSessionService, parse_content_range
+from .storage import blob_storage
+from .services.render_cache import cached_video_blob, render_cache, render_cache_key
+from .services.render_jobs import RenderJobService
+from .services.video_renderer import RENDER_MODES, RENDER_MODE_SEGMENTS
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -49,63 +57,36 @@ def generate_image(request):
 
         if not prompt:
             return JsonResponse({'error': 'Prompt is required'}, status=400)
-
-        # Create a Google Gemini AI client
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-
-        full_prompt = f"{prompt}, style: {style}, resolution: {resolution},({aspect_ratio} aspect ratio)"
-        logger.error(f"Prompt: {full_prompt}")
-
-        # Generate image using Gemini
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp-image-generation",
-            contents=full_prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=['Text', 'Image']
-            )
-        )
-
-        logger.info(f"API response received: {response}")
-
-        # Check if response is valid
-        if not response.candidates or not response.candidates[0].content:
-            logger.error(f"No valid content in response: {response}")
-            return JsonResponse({'error': 'No image content returned by API'}, status=500)
-
-        # Extract image data
-        image_data = None
-        for part in response.candidates[0].content.parts:
-            if part.inline_data and part.inline_data.mime_type.startswith('image/'):
-                image_data = part.inline_data.data
-                break
-
-        if image_data:
-            img = Image.open(BytesIO(image_data))
-            # Resize the image to match the aspect ratio
-            width, height = img.size
-            aspect_width, aspect_height = map(int, aspect_ratio.split(':'))
-            target_width = width
-            target_height = int(width * aspect_height / aspect_width)
-
-            if target_height > height:
-                target_height = height
-                target_width = int(height * aspect_width / aspect_height)
-
-            img = img.resize((target_width, target_height), Image.LANCZOS)
-            
-            buffred = io.BytesIO()
-            img.save(buffred, format="PNG")
-            image_base64 = base64.b64encode(buffred.getvalue()).decode('utf-8')
-            # Convert image bytes to Base64 for JSON response
-
-            return JsonResponse({
-                'image_data': image_base64, 
-                'style': style, 
-                'resolution': resolution, 
-                'aspect_ratio': aspect_ratio}, status=200)
-        else:
-            logger.error(f"Image generation failed. Response: {response}")
-            return JsonResponse({'error': 'Image generation failed or no image in response.'}, status=500)
+        try:
+            output = ImageOutput.from_request(data, request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        logger.info(f"Prompt: {prompt}, style: {style}, {resolution} at {aspect_ratio}")
+
+        # Generate the scene once with Gemini; other aspect ratios and sizes are cropped from it
+        try:
+            encoded, cached = StoryImageGenerator().scene('image', prompt, style, resolution, aspect_ratio, output)
+        except ImageGenerationError as e:
+            logger.error(f"Image generation failed: {str(e)}")
+            return JsonResponse({'error': str(e)}, status=500)
+
+        if output.delivery == 'binary':
+            response = HttpResponse(encoded, content_type=output.mime_type)
+            response['X-Image-Cached'] = 'true' if cached else 'false'
+            return response
+
+        fields = output.deliver(encoded)
+        output.record_deliveries()
+        if 'image' in fields:
+            fields['image_data'] = fields.pop('image')
+        return JsonResponse({
+            **fields,
+            'format': output.format,
+            'cached': cached,
+            'style': style,
+            'resolution': resolution,
+            'aspect_ratio': aspect_ratio}, status=200)
 
     except Exception as e:
         logger.error(f"Error generating image: {e}")
@@ -126,61 +107,30 @@ def generate_images_from_story(request):
 
         if not story:
             return JsonResponse({'error': 'Story is required'}, status=400)
+        try:
+            output = ImageOutput.from_request(data, request, deliveries=('base64', 'url'))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
         # Split story into paragraphs
         paragraphs = [p.strip() for p in story.split('\n') if p.strip()]
-        
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-        images_data = []
 
-        for paragraph in paragraphs:
-            full_prompt = f"Generate not text image: {paragraph}, style: {style}, resolution: {resolution}, ({aspect_ratio} aspect ratio)"
-            
-            response = client.models.generate_content(
-                model="gemini-2.0-flash-exp-image-generation",
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    response_modalities=['Text', 'Image']
-                )
-            )
-
-            # Check if response is valid
-            if not response.candidates or not response.candidates[0].content:
-                logger.error(f"No valid content in response: {response}")
-                return JsonResponse({'error': 'No image content returned by API'}, status=500)
-
-            # Extract image data
-            image_data = None
-            for part in response.candidates[0].content.parts:
-                if part.inline_data and part.inline_data.mime_type.startswith('image/'):
-                    image_data = part.inline_data.data
-                    break
-
-            if image_data:
-                img = Image.open(BytesIO(image_data))
-                # Resize to match aspect ratio
-                width, height = img.size
-                aspect_width, aspect_height = map(int, aspect_ratio.split(':'))
-                target_width = width
-                target_height = int(width * aspect_height / aspect_width)
-
-                if target_height > height:
-                    target_height = height
-                    target_width = int(height * aspect_width / aspect_height)
-
-                img = img.resize((target_width, target_height), Image.LANCZOS)
-                
-                buffered = io.BytesIO()
-                img.save(buffered, format="PNG")
-                image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-                images_data.append(image_base64)
-            else:
-                images_data.append(None)  # Or handle error as you prefer
-                logger.error(f"Image generation failed. Response: {response}")
-                return JsonResponse({'error': 'Image generation failed or no image in response.'}, status=500)
+        # Paragraphs are generated concurrently; each one succeeds or fails on its own
+        results = StoryImageGenerator().generate_story(paragraphs, style, resolution, aspect_ratio, output)
+        output.record_deliveries()
+        failed = [result for result in results if result['status'] != 'ok']
+        if failed and len(failed) == len(results):
+            return JsonResponse({
+                'error': 'Image generation failed for every paragraph',
+                'results': results,
+            }, status=502)
 
         return JsonResponse({
-            'images_data': images_data,
+            # base64 images, or signed URLs with delivery=url
+            'images_data': [result.get('image', result.get('image_url')) for result in results],
+            'results': [{key: value for key, value in result.items() if key != 'image'} for result in results],
+            'failed_count': len(failed),
+            'format': output.format,
             'style': style,
             'resolution': resolution,
             'aspect_ratio': aspect_ratio
@@ -190,6 +140,61 @@ def generate_images_from_story(request):
         logger.error(f"Error generating images: {e}")
         return JsonResponse({'error': str(e)}, status=500)
 
+def _story_events(paragraphs, style, resolution, aspect_ratio, output):
+    """Events of a streamed story: start, one per paragraph as it completes, done."""
+    yield 'start', {'count': len(paragraphs), 'style': style, 'resolution': resolution, 'aspect_ratio': aspect_ratio,
+                    'format': output.format}
+    failed = 0
+    started = time.time()
+    for result in StoryImageGenerator().iter_story(paragraphs, style, resolution, aspect_ratio, output):
+        if result['status'] != 'ok':
+            failed += 1
+        output.record_deliveries()
+        yield 'image', result
+    yield 'done', {'count': len(paragraphs), 'failed_count': failed, 'elapsed': round(time.time() - started, 2)}
+
+@csrf_exempt
+def stream_images_from_story(request):
+    """
+    Streaming variant of generate_images_from_story.
+
+    Each scene is sent as soon as its image is ready, tagged with its
+    paragraph index. The response is NDJSON (one JSON object per line with
+    a "type" field) unless the client asks for Server-Sent Events with
+    Accept: text/event-stream or ?format=sse.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    story = data.get('story')
+    style = data.get('style', 'realistic')
+    resolution = data.get('resolution', '1024x1024')
+    aspect_ratio = data.get('aspect_ratio', '16:9')
+
+    if not story:
+        return JsonResponse({'error': 'Story is required'}, status=400)
+    try:
+        output = ImageOutput.from_request(data, request, deliveries=('base64', 'url'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    paragraphs = [p.strip() for p in story.split('\n') if p.strip()]
+    events = _story_events(paragraphs, style, resolution, aspect_ratio, output)
+
+    if request.GET.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', ''):
+        body = (f"event: {event}\ndata: {json.dumps(payload)}\n\n" for event, payload in events)
+        response = StreamingHttpResponse(body, content_type='text/event-stream')
+    else:
+        body = (json.dumps({'type': event, **payload}) + '\n' for event, payload in events)
+        response = StreamingHttpResponse(body, content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Keep reverse proxies from buffering the stream
+    return response
+
 # @csrf_exempt
 # def create_video_from_images(request):
 #     if request.method != 'POST':
@@ -315,14 +320,29 @@ def create_video_from_images(request):
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
 
+    # Inputs sent beforehand through resumable upload sessions (JSON lists of upload ids)
+    session_files = []
+    try:
+        image_upload_ids = json.loads(request.POST.get('image_uploads', '[]'))
+        audio_upload_ids = json.loads(request.POST.get('audio_uploads', '[]'))
+        session_files += UploadSessionService.open_completed(request.user, image_upload_ids)
+        session_files += UploadSessionService.open_completed(request.user, audio_upload_ids)
+    except (json.JSONDecodeError, ValueError, ValidationError) as e:
+        for upload in session_files:
+            upload.close()
+        return JsonResponse({'error': f'Invalid uploads: {str(e)}'}, status=400)
+
     try:
         # Get parameters
-        image_files = request.FILES.getlist('images')
-        audio_files = request.FILES.getlist('audios')
+        image_files = request.FILES.getlist('images') + session_files[:len(image_upload_ids)]
+        audio_files = request.FILES.getlist('audios') + session_files[len(image_upload_ids):]
         fps = int(request.POST.get('fps', 12))
         durations = json.loads(request.POST.get('durations', '[]'))
         transition_duration = float(request.POST.get('transition_duration', 1.0))
         prompt = request.POST.get('prompt', '')
+        render_mode = request.POST.get('render_mode', RENDER_MODE_SEGMENTS)
+        # Optional narration text of each scene, for the caption track
+        texts = json.loads(request.POST.get('texts', '[]'))
 
         # Validate inputs
         if len(image_files) < 2:
@@ -335,6 +355,10 @@ def create_video_from_images(request):
             return JsonResponse({'error': 'Number of audios must match number of images'}, status=400)
         if not all(isinstance(d, (int, float)) and d > 0 for d in durations):
             return JsonResponse({'error': 'All durations must be positive numbers'}, status=400)
+        if render_mode not in RENDER_MODES:
+            return JsonResponse({'error': f"render_mode must be one of {', '.join(RENDER_MODES)}"}, status=400)
+        if texts and (len(texts) != len(image_files) or not all(isinstance(t, str) for t in texts)):
+            return JsonResponse({'error': 'texts must hold one string per image'}, status=400)
 
         # Set resolution
         base_width, base_height = None, None
@@ -350,293 +374,151 @@ def create_video_from_images(request):
         base_width = base_width - (base_width % 2)
         base_height = base_height - (base_height % 2)
 
-        image_base64_list = []
-        for img_file in image_files:
-            img_file.seek(0)
-            img_data = img_file.read()
-            img_base64 = base64.b64encode(img_data).decode('utf-8')
-            img_base64 = f"data:image/png;base64,{img_base64}"
-            image_base64_list.append(img_base64)
-        
-        # Create temporary directory for storing processed frames and audios
-        with tempfile.TemporaryDirectory() as temp_dir:
-            clips = []
-            audio_clips = []
-            effect_duration = 5.0  # Max duration for zoom effect
-            current_time = 0.0  # Track start time for each clip
-
-            # Find FFmpeg executable
-            ffmpeg_path = get_ffmpeg_exe()  # Default to 'ffmpeg' in PATH
-            # Optional: Specify full path if PATH is not set, e.g., 'C:/ffmpeg/bin/ffmpeg.exe'
-            # ffmpeg_path = 'C:/ffmpeg/bin/ffmpeg.exe'
-
-            # Verify FFmpeg is accessible
-            try:
-                subprocess.run([ffmpeg_path, '-version'], capture_output=True, check=True)
-            except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                logger.error(f"FFmpeg not found or inaccessible: {str(e)}")
-                return JsonResponse({'error': 'FFmpeg is not installed or not found in PATH'}, status=500)
-
-            # Process each image and create clips
-            for i, (img_file, duration, audio_file) in enumerate(zip(image_files, durations, audio_files)):
-                img_dir = os.path.join(temp_dir, f"img_{i}")
-                os.makedirs(img_dir)
-
-                # Save audio file temporarily
-                audio_path = os.path.join(temp_dir, f"audio_{i}.mp3")
-                with open(audio_path, 'wb') as f:
-                    f.write(audio_file.read())
-                    f.flush()
-                    os.fsync(f.fileno())
-
-                # Validate audio duration with mutagen
-                try:
-                    audio_info = MP3(audio_path)
-                    audio_duration = audio_info.info.length
-                except Exception as e:
-                    logger.error(f"Invalid audio file {audio_path}: {str(e)}")
-                    return JsonResponse({'error': f'Invalid audio file for clip {i+1}'}, status=400)
-
-                # Adjusted duration for overlap
-                adjusted_duration = duration + transition_duration if i < len(image_files) - 1 else duration
-                total_frames = int(fps * adjusted_duration)
-                effect_frames = int(min(adjusted_duration, effect_duration) * fps)
-
-                # Process image
-                with Image.open(img_file) as img:
-                    img = img.resize((base_width, base_height), Image.LANCZOS)
-                    base_frames = []
-
-                    for t in range(effect_frames):
-                        zoom = 1 + 0.1 * (t / (effect_frames - 1)) if effect_frames > 1 else 1
-                        zoomed_width = int(base_width * zoom) - (int(base_width * zoom) % 2)
-                        zoomed_height = int(base_height * zoom) - (int(base_height * zoom) % 2)
-
-                        with img.resize((zoomed_width, zoomed_height), Image.LANCZOS) as zoomed_img:
-                            left = (zoomed_width - base_width) // 2
-                            top = (zoomed_height - base_height) // 2
-                            right = left + base_width
-                            bottom = top + base_height
-                            
-                            # Crop and save the frame
-                            with zoomed_img.crop((left, top, right, bottom)) as cropped_img:
-                                base_frames.append(cropped_img.copy())
-
-                    # Repeat base frames to fill total_frames
-                    full_frames = []
-                    while len(full_frames) < total_frames:
-                        for frame in base_frames:
-                            if len(full_frames) >= total_frames:
-                                break
-                            full_frames.append(frame)
-
-                    for j, frame in enumerate(full_frames):
-                        frame_path = os.path.join(img_dir, f"{j:06d}.jpg")
-                        frame.save(frame_path, 'JPEG', quality=85)
-
-                # Create video clip
-                clip = ImageSequenceClip(img_dir, fps=fps).with_duration(adjusted_duration)
-                clips.append(clip)
-
-                # Create audio clip
-                audio_clip = None
-                try:
-                    audio_clip = AudioFileClip(audio_path).with_start(current_time)
-                    if audio_duration > duration:
-                        audio_clip = audio_clip.subclip(0, duration)
-                    audio_clips.append(audio_clip)
-                except Exception as e:
-                    logger.error(f"Failed to load audio clip {audio_path}: {str(e)}")
-                    if audio_clip:
-                        audio_clip.close()
-                    return JsonResponse({'error': f'Failed to process audio clip {i+1}'}, status=500)
-
-                # Update current_time (no overlap for audio)
-                current_time += duration
-
-            # Concatenate video clips with transitions
-            padding = -transition_duration if len(clips) > 1 else 0
-            final_clip = concatenate_videoclips(clips, method="compose", padding=padding)
-
-            # Combine audio clips
-            if audio_clips:
-                final_audio = CompositeAudioClip(audio_clips)
-                final_clip = final_clip.with_audio(final_audio)
-
-            # Set output file path
-            output_path = os.path.join(temp_dir, 'output.mp4')
-            
-            # Debug information
-            logger.info(f"Creating video with dimensions: {base_width}x{base_height}")
-            
-            # Write final video with optimized settings
-            try:
-                # Create list of input video segments from folders
-                concat_file_path = os.path.join(temp_dir, 'inputs.txt')
-                with open(concat_file_path, 'w') as f:
-                    for i in range(len(image_files)):
-                        img_dir = os.path.normpath(os.path.join(temp_dir, f"img_{i}"))
-                        f.write(f"file '{img_dir}/%06d.jpg'\n")
-
-                # Generate intermediate videos per segment
-                segment_paths = []
-                for i in range(len(image_files)):
-                    img_dir = os.path.normpath(os.path.join(temp_dir, f"img_{i}"))
-                    segment_path = os.path.normpath(os.path.join(temp_dir, f"segment_{i}.mp4"))
-                    cmd = [
-                        ffmpeg_path,
-                        '-y',
-                        '-framerate', str(fps),
-                        '-i', f"{img_dir}/%06d.jpg",
-                        '-c:v', 'libx264',
-                        '-preset', 'ultrafast',
-                        '-crf', '28',
-                        '-pix_fmt', 'yuv420p',
-                        segment_path
-                    ]
-                    try:
-                        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                        logger.info(f"FFmpeg output: {result.stdout}")
-                    except subprocess.CalledProcessError as e:
-                        logger.error(f"FFmpeg failed: {e.stderr}")
-                        raise Exception(f"FFmpeg failed: {e.stderr}")
-                    segment_paths.append(segment_path)
-
-                # Concatenate segments
-                concat_list_path = os.path.normpath(os.path.join(temp_dir, 'concat_list.txt'))
-                with open(concat_list_path, 'w') as f:
-                    for segment_path in segment_paths:
-                        f.write(f"file '{os.path.normpath(segment_path)}'\n")
-
-                video_no_audio_path = os.path.normpath(os.path.join(temp_dir, 'video_no_audio.mp4'))
-                cmd_concat = [
-                    ffmpeg_path,
-                    '-y',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', concat_list_path,
-                    '-c', 'copy',
-                    video_no_audio_path
-                ]
-                try:
-                    result = subprocess.run(cmd_concat, capture_output=True, text=True, check=True)
-                    logger.info(f"FFmpeg concat output: {result.stdout}")
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"FFmpeg concat failed: {e.stderr}")
-                    raise Exception(f"FFmpeg concat failed: {e.stderr}")
-
-                # Combine audio
-                if audio_clips:
-                    all_audio_path = os.path.normpath(os.path.join(temp_dir, 'final_audio.mp3'))
-                    audio_inputs = []
-                    filter_complex = []
-                    for i in range(len(audio_files)):
-                        audio_path = os.path.normpath(os.path.join(temp_dir, f"audio_{i}.mp3"))
-                        audio_inputs += ['-i', audio_path]
-                        filter_complex.append(f'[{i}:a]')
-
-                    cmd_audio = [
-                        ffmpeg_path, '-y',
-                        *audio_inputs,
-                        '-filter_complex', f"{''.join(filter_complex)}concat=n={len(audio_files)}:v=0:a=1[outa]",
-                        '-map', '[outa]',
-                        all_audio_path
-                    ]
-                    logger.info(f"Running FFmpeg audio command: {' '.join(cmd_audio)}")
-                    try:
-                        result = subprocess.run(cmd_audio, capture_output=True, text=True, check=True)
-                        logger.info(f"FFmpeg audio output: {result.stdout}")
-                    except subprocess.CalledProcessError as e:
-                        logger.error(f"FFmpeg audio failed: {e.stderr}")
-                        raise Exception(f"FFmpeg audio failed: {e.stderr}")
-
-                    # Merge video + audio
-                    final_output_path = os.path.normpath(os.path.join(temp_dir, 'output.mp4'))
-                    cmd_merge = [
-                        ffmpeg_path, '-y',
-                        '-i', video_no_audio_path,
-                        '-i', all_audio_path,
-                        '-c:v', 'copy',
-                        '-c:a', 'aac',
-                        '-shortest',
-                        final_output_path
-                    ]
-                    logger.info(f"Running FFmpeg merge command: {' '.join(cmd_merge)}")
-                    try:
-                        result = subprocess.run(cmd_merge, capture_output=True, text=True, check=True)
-                        logger.info(f"FFmpeg merge output: {result.stdout}")
-                    except subprocess.CalledProcessError as e:
-                        logger.error(f"FFmpeg merge failed: {e.stderr}")
-                        raise Exception(f"FFmpeg merge failed: {e.stderr}")
-                    output_path = final_output_path
-                else:
-                    final_output_path = video_no_audio_path
-                    output_path = final_output_path
-
-            except Exception as e:
-                logger.error(f"Failed to write video: {str(e)}")
-                return JsonResponse({'error': f'Video rendering failed: {str(e)}'}, status=500)
-            finally:
-                # Clean up MoviePy resources
-                for clip in clips:
-                    clip.close()
-                for audio_clip in audio_clips:
-                    audio_clip.close()
-                if 'final_audio' in locals():
-                    final_audio.close()
-                if 'final_clip' in locals():
-                    final_clip.close()
-
-            # Read and encode video
-            with open(output_path, 'rb') as f:
-                video_data = f.read()
-
-            video_base64 = base64.b64encode(video_data).decode('utf-8')
-            
-            # Save video to database
-            video = Video.objects.create(
-                user=request.user,
-                video_base64=video_base64,
-                resolution=f"{base_width}x{base_height}",
-                frame_count=sum(int(fps * (durations[i] + (transition_duration if i < len(image_files) - 1 else 0)))
-                               for i in range(len(image_files))),
-                total_duration=final_clip.duration if final_clip else sum(durations),
-                prompt=prompt
-            )
-
-            for order, img_base64 in enumerate(image_base64_list):
-                VideoImage.objects.create(
-                    video=video,
-                    image_base64=img_base64,
-                    order=order + 1
-                )
-            
-            return JsonResponse({
-                'video_id': video.id,
-                'video_base64': video_base64,
-                'resolution': f"{base_width}x{base_height}",
-                'frame_count': video.frame_count,
-                'total_duration': final_clip.duration if final_clip else sum(durations),
-                'prompt': prompt
-            })
-    
+        params = {
+            'durations': durations,
+            'fps': fps,
+            'transition_duration': transition_duration,
+            'resolution': f"{base_width}x{base_height}",
+            'render_mode': render_mode,
+            'prompt': prompt,
+            'texts': texts,
+        }
+
+        # Identical inputs and parameters were rendered before: reuse the video
+        params['cache_key'] = render_cache_key(image_files, audio_files, params)
+        video_blob = cached_video_blob(params['cache_key'])
+        if video_blob is not None:
+            job = RenderJobService.from_cache(request.user, video_blob, image_files, params)
+            UploadSessionService.discard(request.user, image_upload_ids + audio_upload_ids)
+            return JsonResponse(RenderJobService.describe(job), status=200)
+
+        # Rendering runs in the render worker (manage.py run_render_worker)
+        try:
+            job = RenderJobService.enqueue(request.user, image_files, audio_files, params)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        # The workspace holds its own links to the session files now
+        UploadSessionService.discard(request.user, image_upload_ids + audio_upload_ids)
+        return JsonResponse(RenderJobService.describe(job), status=202)
+
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid durations format'}, status=400)
+        return JsonResponse({'error': 'Invalid durations or texts format'}, status=400)
     except Exception as e:
         logger.error(f"Video generation error: {str(e)}", exc_info=True)
         return JsonResponse({'error': str(e)}, status=500)
     finally:
-        if 'clips' in locals():
-            for clip in clips:
-                clip.close()
-        if 'audio_clips' in locals():
-            for audio_clip in audio_clips:
-                audio_clip.close()
-        if 'final_audio' in locals():
-            final_audio.close()
-        if 'final_clip' in locals():
-            final_clip.close()
+        for upload in session_files:
+            upload.close()
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request):
+    filename = request.data.get('filename', '')
+    try:
+        total_size = int(request.data.get('size', 0))
+    except (TypeError, ValueError):
+        return Response({'error': 'size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not filename:
+        return Response({'error': 'filename is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < total_size <= settings.UPLOAD_SESSION_MAX_BYTES:
+        return Response({'error': f'size must be between 1 and {settings.UPLOAD_SESSION_MAX_BYTES} bytes'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    session = UploadSessionService.create(request.user, filename, total_size)
+    return Response(UploadSessionService.describe(session), status=status.HTTP_201_CREATED)
+
+@api_view(['GET', 'PUT'])
+@permission_classes([IsAuthenticated])
+def upload_session(request, upload_id):
+    """
+    GET: current offset of an upload session.
+    PUT: append one chunk; the raw body is the chunk and Content-Range
+    (bytes <start>-<end>/<total>) says where it goes. A 409 response
+    carries the offset to resume from.
+    """
+    try:
+        session = UploadSession.objects.get(id=upload_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Upload not found or you do not have permission to access it'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        return Response(UploadSessionService.describe(session))
+
+    content_range = request.headers.get('Content-Range')
+    try:
+        content_length = request.META.get('CONTENT_LENGTH') or '0'
+        if not content_length.isdigit():
+            raise ValueError('Invalid Content-Length header')
+        length = int(content_length)
+        if content_range:
+            start, _, total = parse_content_range(content_range, length)
+            if total != session.total_size:
+                raise ValueError('Content-Range total does not match the upload size')
+        else:
+            start = 0
+        # Read the raw body as a stream; request.body would load it in memory
+        UploadSessionService.append(session, start, length, request._request)
+    except UploadOffsetError:
+        return Response(UploadSessionService.describe(session), status=status.HTTP_409_CONFLICT)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(UploadSessionService.describe(session))
     
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_render_job(request, job_id):
+    try:
+        job = RenderJob.objects.get(id=job_id, user=request.user)
+        return Response(RenderJobService.describe(job))
+    except RenderJob.DoesNotExist:
+        return Response({'error': 'Render job not found or you do not have permission to access it'}, status=status.HTTP_404_NOT_FOUND)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_render_job_result(request, job_id):
+    try:
+        job = RenderJob.objects.select_related('video').get(id=job_id, user=request.user)
+    except RenderJob.DoesNotExist:
+        return Response({'error': 'Render job not found or you do not have permission to access it'}, status=status.HTTP_404_NOT_FOUND)
+
+    if job.status == RenderJob.STATUS_FAILED:
+        return Response({'error': f'Video rendering failed: {job.error}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if job.status != RenderJob.STATUS_DONE or job.video is None:
+        # Not ready yet: same payload as the status endpoint
+        return Response(RenderJobService.describe(job), status=status.HTTP_202_ACCEPTED)
+
+    video = job.video
+    if job.kind == RenderJob.KIND_BURN:
+        burned_url = _burned_url(request, video)
+        if burned_url is None:
+            return Response({'error': 'Burned video is no longer cached; start the burn again'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'job_id': str(job.id),
+            'video_id': video.id,
+            'burned_url': burned_url,
+        })
+    return Response({
+        'job_id': str(job.id),
+        'video_id': video.id,
+        'video_url': signed_content_url(request, 'video', video.id),
+        'resolution': video.resolution,
+        'frame_count': video.frame_count,
+        'total_duration': video.total_duration,
+        'prompt': video.prompt
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def render_cache_stats(request):
+    return Response(render_cache.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def image_cache_stats(request):
+    return Response({**image_cache.stats(), 'derived': derived_cache.stats()})
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_video(request, video_id):
@@ -657,7 +539,17 @@ def get_video(request, video_id):
         video = Video.objects.get(id=video_id, user=request.user)
         return Response({
             'id': video.id,
-            'video_base64': video.video_base64,
+            'video_url': signed_content_url(request, 'video', video.id),
+            'poster_url': signed_url(request, 'video_poster', 'video', video.id) if video.poster_file else None,
+            'sprite': {
+                'url': signed_url(request, 'video_sprite', 'video', video.id),
+                **video.sprite_meta,
+            } if video.sprite_file else None,
+            'subtitles': {
+                'srt_url': signed_url(request, 'video_subtitles_srt', 'video', video.id),
+                'vtt_url': signed_url(request, 'video_subtitles_vtt', 'video', video.id),
+                'burned_url': _burned_url(request, video),
+            } if video.subtitles else None,
             'resolution': video.resolution,
             'frame_count': video.frame_count,
             'total_duration': video.total_duration,
@@ -666,7 +558,8 @@ def get_video(request, video_id):
             'images': [
                 {
                     'id': img.id,
-                    'image_base64': img.image_base64,
+                    'image_url': signed_content_url(request, 'image', img.id),
+                    'thumbnail_url': signed_url(request, 'image_thumbnail', 'image', img.id) if img.thumbnails else None,
                     'order': img.order
                 }
                 for img in video.images.order_by('order')
@@ -685,7 +578,8 @@ def get_image(request, image_id):
         image = VideoImage.objects.get(id=image_id, video__user=request.user)
         return Response({
             'id': image.id,
-            'image_base64': image.image_base64,
+            'image_url': signed_content_url(request, 'image', image.id),
+            'thumbnail_url': signed_url(request, 'image_thumbnail', 'image', image.id) if image.thumbnails else None,
             'order': image.order
         })
     except VideoImage.DoesNotExist:
@@ -694,23 +588,134 @@ def get_image(request, image_id):
         logger.error(f"Image retrieval error: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _authorized_media(request, queryset, kind, pk):
+    """
+    Object for a content request, or None when the caller may not read it.
+
+    Accepts either a signed ?token= (media elements) or a JWT bearer header.
+    """
+    token = request.GET.get('token')
+    if token:
+        if check_media_token(token, kind, pk):
+            return queryset.filter(pk=pk).first()
+        return None
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    if authenticated is None:
+        return None
+    owner_field = 'user' if kind == 'video' else 'video__user'
+    return queryset.filter(pk=pk, **{owner_field: authenticated[0]}).first()
+
+@require_GET
+def video_content(request, video_id):
+    video = _authorized_media(request, Video.objects.all(), 'video', video_id)
+    if video is None or not video.video_file:
+        return JsonResponse({'error': 'Video not found or you do not have permission to access it'}, status=404)
+    return stream_file(request, video.video_file, content_type='video/mp4')
+
+@require_GET
+def image_content(request, image_id):
+    image = _authorized_media(request, VideoImage.objects.all(), 'image', image_id)
+    if image is None or not image.image_file:
+        return JsonResponse({'error': 'Image not found or you do not have permission to access it'}, status=404)
+    return stream_file(request, image.image_file)
+
+def _requested_width(request):
+    width = request.GET.get('width', '')
+    return int(width) if width.isdigit() else None
+
+@require_GET
+def generated_image_content(request, name):
+    # Generated images belong to no row; only a signed token grants access
+    digest, _, extension = name.partition('.')
+    token = request.GET.get('token', '')
+    if not check_media_token(token, 'generated', name) or not blob_storage.exists(blob_storage.blob_name(digest, f".{extension}")):
+        return JsonResponse({'error': 'Image not found or you do not have permission to access it'}, status=404)
+    return stream_blob(request, blob_storage, blob_storage.blob_name(digest, f".{extension}"),
+                       cache_control=IMMUTABLE_CACHE_CONTROL)
+
+@require_GET
+def video_poster(request, video_id):
+    video = _authorized_media(request, Video.objects.all(), 'video', video_id)
+    if video is None or not video.poster_file:
+        return JsonResponse({'error': 'Poster not found or you do not have permission to access it'}, status=404)
+    width = _requested_width(request)
+    if width:
+        return stream_blob(request, blob_storage, pick_thumbnail(video.thumbnails, width), cache_control=IMMUTABLE_CACHE_CONTROL)
+    return stream_file(request, video.poster_file, cache_control=IMMUTABLE_CACHE_CONTROL)
+
+@require_GET
+def video_sprite(request, video_id):
+    video = _authorized_media(request, Video.objects.all(), 'video', video_id)
+    if video is None or not video.sprite_file:
+        return JsonResponse({'error': 'Sprite not found or you do not have permission to access it'}, status=404)
+    return stream_file(request, video.sprite_file, cache_control=IMMUTABLE_CACHE_CONTROL)
+
+@require_GET
+def video_subtitles(request, video_id, extension):
+    video = _authorized_media(request, Video.objects.all(), 'video', video_id)
+    if video is None or not video.subtitles:
+        return JsonResponse({'error': 'Subtitles not found or you do not have permission to access them'}, status=404)
+    writer, content_type = subtitles.FORMATS[extension]
+    return HttpResponse(writer(video.subtitles), content_type=content_type)
+
+def _burned_url(request, video):
+    """Signed URL of the video with its captions burned in, or None until the file exists."""
+    if not video.video_file or not video.subtitles or not burned_cache.contains(burned_key(video)):
+        return None
+    return signed_url(request, 'video_burned', 'video', video.id)
+
+@require_GET
+def video_burned(request, video_id):
+    # Captions drawn into the picture, for players that ignore subtitle tracks (see burn_video_subtitles)
+    video = _authorized_media(request, Video.objects.all(), 'video', video_id)
+    if video is None or not video.video_file or not video.subtitles:
+        return JsonResponse({'error': 'Video not found or you do not have permission to access it'}, status=404)
+    key = burned_key(video)
+    if not burned_cache.contains(key):
+        return JsonResponse({'error': 'Burned video not found; start it with a POST to the burn endpoint'}, status=404)
+    return stream_blob(request, burned_storage, burned_name(key), content_type='video/mp4')
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def burn_video_subtitles(request, video_id):
+    try:
+        video = Video.objects.get(id=video_id, user=request.user)
+    except Video.DoesNotExist:
+        return Response({'error': 'Video not found or you do not have permission to access it'}, status=status.HTTP_404_NOT_FOUND)
+    if not video.video_file or not video.subtitles:
+        return Response({'error': 'Video has no subtitles to burn in'}, status=status.HTTP_400_BAD_REQUEST)
+
+    burned_url = _burned_url(request, video)
+    if burned_url is not None:
+        return Response({'video_id': video.id, 'burned_url': burned_url})
+
+    # Burning re-encodes every frame: the render worker does it, the client polls
+    job = RenderJobService.enqueue_burn(video, burned_key(video))
+    return Response({
+        **RenderJobService.describe(job),
+        'status_url': request.build_absolute_uri(reverse('get_render_job', args=[job.id])),
+    }, status=status.HTTP_202_ACCEPTED)
+
+@require_GET
+def image_thumbnail(request, image_id):
+    image = _authorized_media(request, VideoImage.objects.all(), 'image', image_id)
+    if image is None or not image.thumbnails:
+        return JsonResponse({'error': 'Thumbnail not found or you do not have permission to access it'}, status=404)
+    name = pick_thumbnail(image.thumbnails, _requested_width(request))
+    return stream_blob(request, blob_storage, name, cache_control=IMMUTABLE_CACHE_CONTROL)
+
 class UserVideosView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        videos = Video.objects.filter(user=request.user).order_by('-created_at')
-        video_data = [
-            {
-                'id': video.id,
-                'video_base64': video.video_base64,
-                'resolution': video.resolution,
-                'frame_count': video.frame_count,
-                'total_duration': video.total_duration,
-                'prompt': video.prompt,
-                'created_at': video.created_at,
-                'image_ids': [img.id for img in video.images.order_by('order')]
-            }
-            for video in videos
-        ]
-        return Response(video_data)
-    
\ No newline at end of file
+        # One query for the page of videos and one for all their images
+        videos = Video.objects.filter(user=request.user).prefetch_related(
+            Prefetch('images', queryset=VideoImage.objects.order_by('order').only('id', 'video_id', 'image_file', 'order'))
+        )
+        paginator = VideoCursorPagination()
+        page = paginator.paginate_queryset(videos, request, view=self)
+        serializer = VideoListSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,259 @@
+import io
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from ...offline_providers import speech_mp3
+
+STORY = (
+    "A seed wakes up under the warm spring soil.\n"
+    "Its roots reach down while a green shoot climbs toward the light.\n"
+    "Soon the young plant turns sunlight into food for the whole forest."
+)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def _png(seed, size=(320, 180)):
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3))).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class LoadTest:
+    """
+    Drive the API endpoints from a pool of threads, one keep-alive session each.
+
+    Requests are spread round-robin over the selected scenarios. Prompts are
+    drawn from a small pool so a run sees both cache misses and hits.
+    """
+
+    def __init__(self, base_url, token=None, timeout=120, prompt_pool=20, seed=0):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.prompt_pool = prompt_pool
+        self.seed = seed
+        self.video_path = None
+        self._local = threading.local()
+        self.scenarios = {
+            'generate-image': (False, self.generate_image),
+            'generate-images': (False, self.generate_images),
+            'stream-images': (False, self.stream_images),
+            'create-video': (True, self.create_video),
+            'user-videos': (True, self.user_videos),
+            'video-content': (True, self.video_content),
+            'image-cache-stats': (True, self.image_cache_stats),
+            'tts-audio': (False, self.tts_audio),
+            'tts-multi-audio': (False, self.tts_multi_audio),
+            'tts-video': (False, self.tts_video),
+            'science-story': (False, self.science_story),
+            'simplified-science': (False, self.simplified_science),
+        }
+
+    @property
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            if self.token:
+                session.headers['Authorization'] = f'Bearer {self.token}'
+        return session
+
+    def _url(self, path):
+        return f"{self.base_url}{path}"
+
+    def _prompt(self, i):
+        return f"scene {i % self.prompt_pool} of a glowing coral reef"
+
+    def discover(self):
+        """Pick a stored video for the content scenario, if the user has one."""
+        response = self.session.get(self._url('/api/image-video/user-videos/'), timeout=self.timeout)
+        if response.ok and response.json().get('results'):
+            self.video_path = response.json()['results'][0]['video_url']
+
+    # Scenarios: each sends one request and returns the response
+
+    def generate_image(self, i):
+        return self.session.post(self._url('/api/image-video/generate-image/'), json={
+            'prompt': self._prompt(i), 'aspect_ratio': random.choice(['16:9', '9:16', '1:1']), 'format': 'webp',
+        }, timeout=self.timeout)
+
+    def generate_images(self, i):
+        return self.session.post(self._url('/api/image-video/generate-images/'), json={
+            'story': f"{self._prompt(i)}\n{STORY}", 'format': 'webp', 'delivery': 'url',
+        }, timeout=self.timeout)
+
+    def stream_images(self, i):
+        response = self.session.post(self._url('/api/image-video/generate-images/stream/'), json={
+            'story': f"{self._prompt(i)}\n{STORY}", 'format': 'webp', 'delivery': 'url',
+        }, timeout=self.timeout, stream=True)
+        for _ in response.iter_lines():
+            pass
+        return response
+
+    def create_video(self, i):
+        files = []
+        for n in range(2):
+            files.append(('images', (f'scene{n}.png', _png(f"{self.seed}:{i % self.prompt_pool}:{n}"), 'image/png')))
+            files.append(('audios', (f'scene{n}.mp3', speech_mp3(f"scene {n}"), 'audio/mpeg')))
+        return self.session.post(self._url('/api/image-video/create-video-from-images/'), files=files,
+                                 data={'durations': '[1.5, 1.5]', 'transition_duration': '0.5', 'fps': '12'},
+                                 timeout=self.timeout)
+
+    def user_videos(self, i):
+        return self.session.get(self._url('/api/image-video/user-videos/'), timeout=self.timeout)
+
+    def video_content(self, i):
+        if not self.video_path:
+            raise RuntimeError('No stored video to fetch (render one first)')
+        url = self.video_path if self.video_path.startswith('http') else self._url(self.video_path)
+        return self.session.get(url, headers={'Range': 'bytes=0-262143'}, timeout=self.timeout)
+
+    def image_cache_stats(self, i):
+        return self.session.get(self._url('/api/image-video/image-cache/stats/'), timeout=self.timeout)
+
+    def tts_audio(self, i):
+        return self.session.post(self._url('/api/tts/generate-audio/'), data={
+            'text': STORY.split('\n')[i % 3], 'language': 'en', 'style': 'funny',
+        }, timeout=self.timeout)
+
+    def tts_multi_audio(self, i):
+        return self.session.post(self._url('/api/tts/generate-multi-audio/'), data={
+            'text': STORY, 'language': 'en',
+        }, timeout=self.timeout)
+
+    def tts_video(self, i):
+        return self.session.post(self._url('/api/tts/generate-video/'), data={
+            'text': STORY.split('\n')[i % 3], 'language': 'en',
+        }, timeout=self.timeout)
+
+    def science_story(self, i):
+        return self.session.post(self._url('/api/gen_script/science-stories/'), json={
+            'content': f"Photosynthesis, part {i % self.prompt_pool}", 'style': 'adventure',
+        }, timeout=self.timeout)
+
+    def simplified_science(self, i):
+        return self.session.post(self._url('/api/gen_script/simplified-science/'), json={
+            'content': f"Plate tectonics, part {i % self.prompt_pool}", 'audience': 'children',
+        }, timeout=self.timeout)
+
+    def run_one(self, name, i):
+        started = time.perf_counter()
+        try:
+            response = self.scenarios[name][1](i)
+            ok = response.status_code < 400
+            error = None if ok else f"HTTP {response.status_code}"
+        except Exception as e:
+            ok, error = False, type(e).__name__
+        return name, time.perf_counter() - started, ok, error
+
+    def run(self, names, total, concurrency):
+        """Return (results, wall time) of `total` requests spread over `names`."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(self.run_one, names[i % len(names)], i) for i in range(total)]
+            results = [future.result() for future in futures]
+        return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    """Per scenario and overall: count, errors, latency percentiles (ms) and throughput."""
+    groups = {}
+    for name, latency, ok, error in results:
+        groups.setdefault(name, []).append((latency, ok, error))
+    groups['all'] = [(latency, ok, error) for _, latency, ok, error in results]
+
+    summary = {}
+    for name, rows in groups.items():
+        latencies = sorted(latency * 1000 for latency, _, _ in rows)
+        errors = {}
+        for _, ok, error in rows:
+            if not ok:
+                errors[error] = errors.get(error, 0) + 1
+        summary[name] = {
+            'requests': len(rows),
+            'errors': sum(errors.values()),
+            'error_rate': round(sum(errors.values()) / len(rows), 4),
+            'error_kinds': errors,
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+            'max_ms': round(latencies[-1], 1),
+            'throughput_rps': round(len(rows) / elapsed, 2) if elapsed else None,
+        }
+    return summary
+
+
+class Command(BaseCommand):
+    help = ('Load-test a running deployment: concurrent requests against the /api endpoints, '
+            'reporting latency percentiles, throughput and error rates. '
+            'Start the server with PROVIDER_BACKEND=offline to keep provider quota out of it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--requests', type=int, default=100, help='Total requests to send')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+        parser.add_argument('--scenarios', help='Comma-separated scenarios (default: all available)')
+        parser.add_argument('--username', help='Account used for the endpoints that need a login')
+        parser.add_argument('--password')
+        parser.add_argument('--timeout', type=float, default=120, help='Seconds per request')
+        parser.add_argument('--prompt-pool', type=int, default=20,
+                            help='Distinct prompts to draw from; smaller pools mean more cache hits')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        token = None
+        if options['username']:
+            response = requests.post(f"{options['base_url'].rstrip('/')}/api/auth/login/", json={
+                'username': options['username'], 'password': options['password'],
+            }, timeout=options['timeout'])
+            if not response.ok:
+                raise CommandError(f"Login failed: HTTP {response.status_code}")
+            token = response.json()['access']
+
+        load_test = LoadTest(options['base_url'], token, options['timeout'], options['prompt_pool'], options['seed'])
+        names = options['scenarios'].split(',') if options['scenarios'] else list(load_test.scenarios)
+        unknown = [name for name in names if name not in load_test.scenarios]
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(unknown)} (known: {', '.join(load_test.scenarios)})")
+        if not token:
+            skipped = [name for name in names if load_test.scenarios[name][0]]
+            if skipped:
+                self.stderr.write(f"Skipping {', '.join(skipped)}: they need --username/--password")
+            names = [name for name in names if name not in skipped]
+        if not names:
+            raise CommandError('No scenario left to run')
+        if 'video-content' in names:
+            load_test.discover()
+
+        results, elapsed = load_test.run(names, options['requests'], options['concurrency'])
+        summary = summarize(results, elapsed)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'elapsed': round(elapsed, 2), 'scenarios': summary}, indent=2))
+            return
+        self.stdout.write(f"{options['requests']} requests, concurrency {options['concurrency']}, {elapsed:.1f}s")
+        self.stdout.write(f"{'scenario':<20}{'reqs':>6}{'err%':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>8}")
+        for name, row in summary.items():
+            self.stdout.write(
+                f"{name:<20}{row['requests']:>6}{row['error_rate'] * 100:>6.1f}%{row['p50_ms']:>10}"
+                f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['throughput_rps']:>8}"
+            )
+            for error, count in row['error_kinds'].items():
+                self.stdout.write(f"{'':<20}  {count} x {error}")
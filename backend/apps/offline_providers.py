@@ -0,0 +1,223 @@
+# apps/offline_providers.py
+"""
+Local stand-ins for the external AI providers (PROVIDER_BACKEND=offline).
+
+They mimic the parts of the SDK clients the apps use, answer with
+deterministic content derived from a hash of the input (placeholder
+images, filler text, sine-tone MP3s), and wait and fail according to a
+per-provider profile, so load tests exercise the whole request path
+without spending provider quota.
+"""
+import functools
+import hashlib
+import io
+import random
+import subprocess
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageDraw
+
+# Per provider: median latency in seconds, lognormal jitter (sigma), and
+# the share of calls failing with a transient error or a rate limit
+DEFAULT_PROFILES = {
+    'genai': {'latency': 4.0, 'jitter': 0.3, 'error_rate': 0.0, 'rate_limit_rate': 0.0},
+    'gemini_text': {'latency': 3.0, 'jitter': 0.3, 'error_rate': 0.0, 'rate_limit_rate': 0.0},
+    'gtts': {'latency': 0.6, 'jitter': 0.3, 'error_rate': 0.0, 'rate_limit_rate': 0.0},
+    'elevenlabs': {'latency': 1.0, 'jitter': 0.3, 'error_rate': 0.0, 'rate_limit_rate': 0.0},
+}
+
+_WORDS = (
+    'light energy planet ocean cell atom wave storm forest river star orbit gravity crystal '
+    'mountain signal current seed spark cloud field ice desert reef magnet comet pulse'
+).split()
+
+
+def _digest(text):
+    return hashlib.sha256(str(text).encode('utf-8')).digest()
+
+
+class Behaviour:
+    """
+    Latency and failures of one stand-in provider.
+
+    Draws come from a generator seeded with OFFLINE_PROVIDER_SEED and the
+    provider name, so a run with the same seed and call order repeats.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.profile = {**DEFAULT_PROFILES[provider], **settings.OFFLINE_PROVIDER_PROFILES.get(provider, {})}
+        self._rng = random.Random(f"{settings.OFFLINE_PROVIDER_SEED}:{provider}")
+        self._lock = threading.Lock()
+
+    def call(self, transient_error, rate_limit_error):
+        """Wait like a provider call would, then maybe raise one of the errors."""
+        with self._lock:
+            factor = self._rng.lognormvariate(0, self.profile['jitter'])
+            roll = self._rng.random()
+        time.sleep(self.profile['latency'] * factor)
+        if roll < self.profile['rate_limit_rate']:
+            raise rate_limit_error()
+        if roll < self.profile['rate_limit_rate'] + self.profile['error_rate']:
+            raise transient_error()
+
+
+@functools.lru_cache(maxsize=64)
+def placeholder_png(prompt, size=(1024, 1024)):
+    """A gradient with one bright disc, both placed by the prompt's hash."""
+    digest = _digest(prompt)
+    width, height = size
+    ramp = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+    start = np.array(list(digest[0:3]), dtype=np.float32)
+    end = np.array(list(digest[3:6]), dtype=np.float32)
+    pixels = np.broadcast_to(start + (end - start) * ramp, (height, width, 3)).astype(np.uint8)
+    img = Image.fromarray(pixels)
+    radius = min(size) // 6
+    x = radius + digest[6] * (width - 2 * radius) // 255
+    y = radius + digest[7] * (height - 2 * radius) // 255
+    ImageDraw.Draw(img).ellipse((x - radius, y - radius, x + radius, y + radius), fill=tuple(digest[8:11]))
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def filler_text(prompt, words=120):
+    digest = _digest(prompt)
+    rng = random.Random(digest)
+    if 'SCENE' in str(prompt):
+        scenes = [
+            f"### SCENE {i}: The {rng.choice(_WORDS)} of the {rng.choice(_WORDS)}\n"
+            f"- **Narration**: {' '.join(rng.choice(_WORDS) for _ in range(words // 3))}.\n"
+            f"- **Visual Description**: A {rng.choice(_WORDS)} above a {rng.choice(_WORDS)}."
+            for i in range(1, 4)
+        ]
+        return '\n\n'.join(scenes) + f"\n\n### FINAL SECTION: THE SCIENCE BEHIND\n{rng.choice(_WORDS)}."
+    return ' '.join(rng.choice(_WORDS) for _ in range(words)).capitalize() + '.'
+
+
+@functools.lru_cache(maxsize=64)
+def _tone_mp3(frequency, duration):
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    return subprocess.run(
+        [get_ffmpeg_exe(), '-v', 'error', '-f', 'lavfi', '-i', f'sine=frequency={frequency}:duration={duration}',
+         '-ac', '1', '-ar', '24000', '-b:a', '48k', '-f', 'mp3', 'pipe:1'],
+        capture_output=True, check=True,
+    ).stdout
+
+
+def speech_mp3(text, slow=False):
+    """A sine tone about as long as the text would take to read."""
+    seconds = max(1.0, len(str(text).split()) * (0.6 if slow else 0.4))
+    return _tone_mp3(220 + _digest(text)[0] * 2, round(seconds, 1))
+
+
+# google-genai (image generation)
+
+class _GenaiModels:
+    def __init__(self):
+        self.behaviour = Behaviour('genai')
+
+    def generate_content(self, model, contents, config=None):
+        from google.genai import errors, types
+
+        self.behaviour.call(
+            lambda: errors.ServerError(503, {'error': {'message': 'Offline stand-in: unavailable'}}),
+            lambda: errors.ClientError(429, {'error': {'message': 'Offline stand-in: rate limited'}}),
+        )
+        image = types.Part(inline_data=types.Blob(mime_type='image/png', data=placeholder_png(str(contents))))
+        return types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(parts=[image]))])
+
+    def list(self, config=None):
+        return []
+
+
+class OfflineGenaiClient:
+    def __init__(self):
+        self.models = _GenaiModels()
+
+
+# google.generativeai (text)
+
+class _TextResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class OfflineTextModel:
+    def __init__(self):
+        self.behaviour = Behaviour('gemini_text')
+
+    def generate_content(self, prompt):
+        from google.api_core import exceptions
+
+        self.behaviour.call(
+            lambda: exceptions.ServiceUnavailable('Offline stand-in: unavailable'),
+            lambda: exceptions.TooManyRequests('Offline stand-in: rate limited'),
+        )
+        return _TextResponse(filler_text(prompt))
+
+
+# gTTS
+
+class OfflineGTTS:
+    """Drop-in for gtts.gTTS (constructor, write_to_fp, save, stream)."""
+
+    behaviour = None
+    _behaviour_lock = threading.Lock()
+
+    def __init__(self, text, lang='en', slow=False, **kwargs):
+        self.text = text
+        self.lang = lang
+        self.slow = slow
+        with OfflineGTTS._behaviour_lock:
+            if OfflineGTTS.behaviour is None:
+                OfflineGTTS.behaviour = Behaviour('gtts')
+
+    def stream(self):
+        from gtts.tts import gTTSError
+
+        self.behaviour.call(
+            lambda: gTTSError('Offline stand-in: 500 (Internal Server Error) from TTS API'),
+            lambda: gTTSError('Offline stand-in: 429 (Too Many Requests) from TTS API'),
+        )
+        yield speech_mp3(self.text, self.slow)
+
+    def write_to_fp(self, fp):
+        for chunk in self.stream():
+            fp.write(chunk)
+
+    def save(self, savefile):
+        with open(str(savefile), 'wb') as f:
+            self.write_to_fp(f)
+
+
+# ElevenLabs
+
+class _TextToSpeech:
+    def __init__(self):
+        self.behaviour = Behaviour('elevenlabs')
+
+    def convert(self, text, voice_id=None, model_id=None, output_format=None, voice_settings=None, **kwargs):
+        from elevenlabs.core.api_error import ApiError
+
+        self.behaviour.call(
+            lambda: ApiError(status_code=500, body='Offline stand-in: internal error'),
+            lambda: ApiError(status_code=429, body='Offline stand-in: too many concurrent requests'),
+        )
+        audio = speech_mp3(text)
+        return (audio[i:i + 4096] for i in range(0, len(audio), 4096))
+
+
+class _ElevenLabsModels:
+    def list(self):
+        return []
+
+
+class OfflineElevenLabs:
+    def __init__(self):
+        self.text_to_speech = _TextToSpeech()
+        self.models = _ElevenLabsModels()
@@ -0,0 +1,143 @@
+# apps/provider_clients.py
+import logging
+import threading
+import time
+
+import httpx
+from django.conf import settings
+
+from . import offline_providers
+
+logger = logging.getLogger(__name__)
+
+GEMINI_TEXT_MODEL = 'gemini-1.5-flash-latest'
+
+
+def _http_client(timeout):
+    """httpx session whose TLS connections stay open between requests."""
+    return httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PROVIDER_MAX_CONNECTIONS,
+            keepalive_expiry=settings.PROVIDER_KEEPALIVE_EXPIRY,
+        ),
+        follow_redirects=True,
+    )
+
+
+class ProviderClientRegistry:
+    """
+    Process-wide clients of the external AI providers.
+
+    Each client is built on first use (or by warm_up) and then shared by
+    every request and worker thread of the process, so its HTTP connection
+    pool, and with it the TLS sessions, survive from one request to the
+    next. The SDK clients used here are thread-safe.
+
+    With PROVIDER_BACKEND=offline every provider is replaced by its stand-in
+    from offline_providers.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._offline_factories = {}
+        self._warmers = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory, offline, warm=None):
+        """
+        Args:
+            factory: Builds the client, called once per process
+            offline: Builds the stand-in used with PROVIDER_BACKEND=offline
+            warm: Optional cheap call on a new client that opens its connection
+        """
+        self._factories[name] = factory
+        self._offline_factories[name] = offline
+        if warm:
+            self._warmers[name] = warm
+
+    def get(self, name):
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                started = time.time()
+                offline = settings.PROVIDER_BACKEND == 'offline'
+                client = (self._offline_factories if offline else self._factories)[name]()
+                self._clients[name] = client
+                logger.info(f"Created {'offline ' if offline else ''}{name} client in {time.time() - started:.2f}s")
+        return client
+
+    def warm_up(self, names=None):
+        """Create the clients and open their connections; failures are only logged."""
+        for name in names or list(self._factories):
+            started = time.time()
+            try:
+                client = self.get(name)
+                if name in self._warmers and settings.PROVIDER_BACKEND != 'offline':
+                    self._warmers[name](client)
+                logger.info(f"Warmed up {name} client in {time.time() - started:.2f}s")
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} client failed: {e}")
+
+    def warm_up_in_background(self, names=None):
+        threading.Thread(target=self.warm_up, args=(names,), name='provider-warm-up', daemon=True).start()
+
+    def reset(self, name=None):
+        """Drop cached clients (all of them without a name), e.g. after a key change."""
+        with self._lock:
+            if name is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(name, None)
+
+
+def _genai_client():
+    from google import genai
+    from google.genai import types
+
+    timeout = settings.IMAGE_GENERATION_TIMEOUT
+    return genai.Client(
+        api_key=settings.GOOGLE_API_KEY,
+        http_options=types.HttpOptions(timeout=int(timeout * 1000), httpx_client=_http_client(timeout)),
+    )
+
+
+def _gemini_text_model():
+    import google.generativeai as generativeai
+
+    # configure() drops the SDK's cached transport, so it must run only once
+    generativeai.configure(api_key=settings.GEMINI_API_KEY)
+    return generativeai.GenerativeModel(GEMINI_TEXT_MODEL)
+
+
+def _warm_gemini_text(model):
+    import google.generativeai as generativeai
+
+    generativeai.get_model(f'models/{GEMINI_TEXT_MODEL}')
+
+
+def _elevenlabs_client():
+    from elevenlabs import ElevenLabs
+
+    return ElevenLabs(api_key=settings.ELEVEN_LABS_API_KEY, httpx_client=_http_client(240))
+
+
+def _gtts_class():
+    # gTTS objects are per text; the registry hands out the class to instantiate
+    from gtts import gTTS
+
+    return gTTS
+
+
+clients = ProviderClientRegistry()
+clients.register('genai', _genai_client, offline_providers.OfflineGenaiClient,
+                 warm=lambda client: next(iter(client.models.list(config={'page_size': 1})), None))
+clients.register('gemini_text', _gemini_text_model, offline_providers.OfflineTextModel, warm=_warm_gemini_text)
+clients.register('elevenlabs', _elevenlabs_client, offline_providers.OfflineElevenLabs,
+                 warm=lambda client: client.models.list())
+clients.register('gtts', _gtts_class, lambda: offline_providers.OfflineGTTS)
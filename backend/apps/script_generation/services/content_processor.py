@@ -1,13 +1,11 @@
 # script_generation/services/content_processor.py
-from django.conf import settings
-import google.generativeai as genai
 from PIL import Image
 import pytesseract
 from ...crawler.services.article_service import ArticleService  # Import từ crawler
+from ...provider_clients import clients
 
 class ContentProcessor:
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
         self.article_service = ArticleService()  # Sử dụng service từ crawler
     
     def get_articles_from_crawler(self, keyword=None, limit=5):
@@ -87,7 +85,7 @@ class ContentProcessor:
     """
 
         try:
-            model = genai.GenerativeModel('gemini-1.5-flash-latest')
+            model = clients.get('gemini_text')
             response = model.generate_content(prompt)
             return response.text
         except Exception as e:
@@ -175,7 +173,7 @@ Now begin the story.
 """
 
         try:
-            model = genai.GenerativeModel('gemini-1.5-flash-latest')
+            model = clients.get('gemini_text')
             response = model.generate_content(prompt)
             return str(response.text)
         except Exception as e:
@@ -0,0 +1,126 @@
+# apps/subtitles.py
+"""
+Timed captions for narrated audio and video.
+
+Cues are built from the narrated texts and their measured audio
+durations: each text covers its own span of the timeline, split into
+captions of at most two short lines with the span shared out by length.
+They are written as SRT or WebVTT, embedded as a mov_text stream (a
+stream-copy remux that renders nothing), or burned into the picture.
+"""
+import os
+import re
+import subprocess
+import tempfile
+import textwrap
+
+from imageio_ffmpeg import get_ffmpeg_exe
+
+# Characters per caption line, and lines per caption
+LINE_CHARS = 42
+MAX_LINES = 2
+
+# libass style of burned-in captions
+BURN_STYLE = 'FontName=DejaVu Sans,FontSize=22,PrimaryColour=&H00FFFFFF,OutlineColour=&H80000000,BorderStyle=3,Outline=1,Shadow=0,MarginV=24'
+
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?…。！？])\s+')
+
+
+def _captions(text):
+    """Split one narrated text into captions of at most MAX_LINES wrapped lines."""
+    captions = []
+    for sentence in _SENTENCE_BREAK.split(' '.join(text.split())):
+        lines = textwrap.wrap(sentence, LINE_CHARS, break_long_words=True)
+        for i in range(0, len(lines), MAX_LINES):
+            captions.append('\n'.join(lines[i:i + MAX_LINES]))
+    return captions
+
+
+def build_cues(texts, durations, start=0.0):
+    """
+    Return [(start, end, text), ...] for texts narrated back to back.
+
+    Args:
+        texts (list[str]): Narrated text of each segment, in order
+        durations (list[float]): Measured audio duration of each segment, in seconds
+    """
+    cues = []
+    for text, duration in zip(texts, durations):
+        captions = _captions(text or '')
+        total_chars = sum(len(caption) for caption in captions)
+        position = start
+        for caption in captions:
+            end = position + duration * len(caption) / total_chars
+            cues.append((round(position, 3), round(end, 3), caption))
+            position = end
+        start += duration
+    return cues
+
+
+def _timestamp(seconds, separator):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    seconds, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+def to_srt(cues):
+    return ''.join(
+        f"{i}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n\n"
+        for i, (start, end, text) in enumerate(cues, 1)
+    )
+
+
+def to_webvtt(cues):
+    return 'WEBVTT\n\n' + ''.join(
+        f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n\n" for start, end, text in cues
+    )
+
+
+# Sidecar formats by file extension: (writer, content type)
+FORMATS = {
+    'srt': (to_srt, 'application/x-subrip; charset=utf-8'),
+    'vtt': (to_webvtt, 'text/vtt; charset=utf-8'),
+}
+
+
+def _run(args):
+    result = subprocess.run([get_ffmpeg_exe(), '-v', 'error', '-y', *args], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+
+
+def embed(video_path, cues, output_path):
+    """Copy video_path to output_path with the cues as a mov_text subtitle stream."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        srt_path = os.path.join(temp_dir, 'captions.srt')
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write(to_srt(cues))
+        _run([
+            '-i', video_path, '-i', srt_path,
+            '-map', '0:v', '-map', '0:a?', '-map', '1:s',
+            '-c', 'copy', '-c:s', 'mov_text',
+            '-movflags', '+faststart',
+            output_path,
+        ])
+    return output_path
+
+
+def burn_in(video_path, cues, output_path):
+    """Re-encode the picture of video_path with the cues drawn in; the audio is copied."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        srt_path = os.path.join(temp_dir, 'captions.srt')
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write(to_srt(cues))
+        # The filter argument is parsed twice; the temp path has no characters that need escaping
+        _run([
+            '-i', video_path,
+            '-map', '0:v', '-map', '0:a?',
+            '-vf', f"subtitles={srt_path}:force_style='{BURN_STYLE}'",
+            '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+            '-c:a', 'copy',
+            '-movflags', '+faststart',
+            output_path,
+        ])
+    return output_path
@@ -0,0 +1,78 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from pydub import AudioSegment
+
+from apps.tts_generation.services import audio_effects
+
+
+def speech_like(seconds, sample_rate, seed=0):
+    """Harmonics of a gliding 100-220 Hz pitch under a 1.5 kHz formant, pulsed at syllable rate, plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    f0 = 160 + 60 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voice = sum(np.exp(-((k * 160 - 1500) / 600) ** 2) * np.sin(k * phase) for k in range(1, 30))
+    syllables = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    samples = 0.2 * voice * syllables + 0.01 * rng.standard_normal(len(t))
+    return (np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def pydub_path(pcm, sample_rate, pitch_shift, speed):
+    """The previous view code: frame-rate pitch shift, then AudioSegment.speedup."""
+    audio = AudioSegment(data=pcm, sample_width=2, frame_rate=sample_rate, channels=1)
+    audio = audio._spawn(audio.raw_data, overrides={'frame_rate': int(audio.frame_rate * pitch_shift)})
+    audio = audio.set_frame_rate(audio.frame_rate)
+    return audio.speedup(playback_speed=speed).raw_data
+
+
+def numpy_path(pcm, sample_rate, pitch_shift, speed):
+    samples = audio_effects.from_pcm16(pcm)
+    samples = audio_effects.pitch_shift(samples, pitch_shift, sample_rate)
+    samples = audio_effects.time_stretch(samples, speed, sample_rate)
+    return audio_effects.to_pcm16(samples)
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the NumPy audio effects against the pydub path they replaced '
+            '(pitch shift plus the 1.1x speed-up of the "funny" style) on synthetic speech')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', default='1,5,20', help='Comma-separated input lengths')
+        parser.add_argument('--sample-rate', type=int, default=24000, help='gTTS output rate')
+        parser.add_argument('--pitch-shift', type=float, default=1.2)
+        parser.add_argument('--speed', type=float, default=1.1)
+        parser.add_argument('--repeat', type=int, default=1, help='Runs per measurement; the fastest is reported')
+        parser.add_argument('--skip-pydub', action='store_true',
+                            help='Only time the NumPy path (pydub speedup is quadratic in the input length)')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def _time(self, path, pcm, options):
+        best = None
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            path(pcm, options['sample_rate'], options['pitch_shift'], options['speed'])
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        results = []
+        for minutes in (float(m) for m in options['minutes'].split(',')):
+            pcm = speech_like(minutes * 60, options['sample_rate'])
+            row = {'minutes': minutes, 'numpy_s': round(self._time(numpy_path, pcm, options), 3)}
+            if not options['skip_pydub']:
+                row['pydub_s'] = round(self._time(pydub_path, pcm, options), 3)
+                row['speedup'] = round(row['pydub_s'] / row['numpy_s'], 2)
+            row['numpy_realtime_x'] = round(minutes * 60 / row['numpy_s'], 1)
+            results.append(row)
+            if not options['json']:
+                self.stdout.write(
+                    f"{minutes:>6g} min  numpy {row['numpy_s']:>8.2f}s ({row['numpy_realtime_x']}x realtime)"
+                    + (f"  pydub {row['pydub_s']:>8.2f}s  speedup {row['speedup']}x" if 'pydub_s' in row else '')
+                )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
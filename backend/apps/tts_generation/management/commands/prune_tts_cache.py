@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.tts_generation.services.tts_cache import TTSCache
+
+
+class Command(BaseCommand):
+    help = 'Evict TTS cache entries by age, then least recently used ones until the cache fits its size bound'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-bytes', type=int, default=settings.TTS_CACHE_MAX_BYTES)
+        parser.add_argument('--max-age', type=int, default=settings.TTS_CACHE_MAX_AGE, help='Seconds since last use')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be evicted')
+
+    def handle(self, *args, **options):
+        count, freed = TTSCache.evict(options['max_bytes'], options['max_age'], dry_run=options['dry_run'])
+        action = 'Would evict' if options['dry_run'] else 'Evicted'
+        self.stdout.write(f"{action} {count} TTS cache entries ({freed} bytes)")
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tts_generation', '0003_generatedvoice_duration_generatedvoice_style_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedvoice',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='generatedvoice',
+            name='last_used_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='generatedvoice',
+            name='size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -18,6 +18,11 @@ class GeneratedVoice(models.Model):
     style = models.CharField(max_length=20, choices=[('funny', 'Funny'), ('serious', 'Serious')], null=True, blank=True)
     duration = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # TTS cache: hash of provider, voice, text and parameters (see services/tts_cache.py)
+    cache_key = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    subtitles = models.JSONField(default=list, blank=True)  # Caption cues: [[start, end, text], ...]
 
     def __str__(self):
         return f"GeneratedVoice (pitch={self.pitch_shift}, speed={self.speed}, style={self.style})"
\ No newline at end of file
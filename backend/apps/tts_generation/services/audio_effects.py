@@ -0,0 +1,136 @@
+# tts_generation/services/audio_effects.py
+"""
+Vectorized audio effects on NumPy sample arrays.
+
+Samples are float32 in [-1, 1], shaped (n,) for mono or (n, channels).
+Time-stretch is a phase vocoder whose analysis, phase propagation and
+overlap-add run on whole blocks of frames at once; pitch shift stretches
+by the shift factor, corrects the spectral envelope so formants stay in
+place, and resamples back to the original length.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Frames processed per block; bounds the memory of long inputs
+BLOCK_FRAMES = 2048
+
+# Cepstral lifter of the spectral envelope, in seconds; shorter than the pitch period of voices up to 400 Hz
+ENVELOPE_QUEFRENCY = 0.0025
+
+
+def from_pcm16(data, channels=1):
+    samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+    return samples.reshape(-1, channels) if channels > 1 else samples
+
+
+def to_pcm16(samples):
+    return (np.clip(samples, -1.0, 32767 / 32768) * 32768.0).astype(np.int16).tobytes()
+
+
+def _per_channel(effect, samples, *args, **kwargs):
+    if samples.ndim == 1:
+        return effect(samples, *args, **kwargs)
+    return np.stack([effect(samples[:, c], *args, **kwargs) for c in range(samples.shape[1])], axis=1)
+
+
+def _frame_size(sample_rate):
+    """About 40 ms, rounded to a power of two (1024 samples at 24 kHz)."""
+    return 2 ** int(round(np.log2(sample_rate * 0.04)))
+
+
+def _resample(x, length):
+    if length == len(x) or not len(x):
+        return x.astype(np.float32)
+    positions = np.linspace(0, len(x) - 1, length)
+    return np.interp(positions, np.arange(len(x)), x).astype(np.float32)
+
+
+def resample(samples, length):
+    """Resample to the given number of samples (linear interpolation)."""
+    return _per_channel(_resample, samples, length)
+
+
+def _envelope_ratio(magnitude, factor, lifter):
+    """
+    Per-bin gain that moves the spectral envelope at f*factor to f.
+
+    After the final resample scales every frequency by factor, the
+    envelope lands back where it was, so formants are preserved.
+    """
+    n_fft = 2 * (magnitude.shape[1] - 1)
+    cepstrum = np.fft.irfft(np.log(magnitude + 1e-6), n_fft, axis=1)
+    cepstrum[:, lifter:n_fft - lifter + 1] = 0
+    envelope = np.fft.rfft(cepstrum, axis=1).real
+
+    positions = np.minimum(np.arange(magnitude.shape[1]) * factor, magnitude.shape[1] - 1)
+    low = positions.astype(int)
+    high = np.minimum(low + 1, magnitude.shape[1] - 1)
+    frac = positions - low
+    warped = envelope[:, low] * (1 - frac) + envelope[:, high] * frac
+    return np.exp(np.clip(warped - envelope, -3, 3))
+
+
+def _vocoder(x, rate, sample_rate, formant_factor=None):
+    """Phase-vocoder time-stretch of one channel; the output is len(x) / rate long."""
+    n_fft = _frame_size(sample_rate)
+    hop = n_fft // 4
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+    bins = np.arange(n_fft // 2 + 1)
+    advance = 2 * np.pi * hop * bins / n_fft
+    lifter = max(1, int(ENVELOPE_QUEFRENCY * sample_rate))
+
+    frames = sliding_window_view(np.pad(x, (n_fft // 2, n_fft)), n_fft)[::hop]
+    steps = np.arange(0, len(frames) - 1, rate)
+    out = np.zeros((len(steps) + 3) * hop + n_fft, dtype=np.float32)
+
+    phase = np.angle(np.fft.rfft(frames[0] * window))
+    for start in range(0, len(steps), BLOCK_FRAMES):
+        block = steps[start:start + BLOCK_FRAMES]
+        first = int(block[0])
+        spectrum = np.fft.rfft(frames[first:int(block[-1]) + 2] * window, axis=1)
+        magnitudes, angles = np.abs(spectrum), np.angle(spectrum)
+        index = block.astype(int) - first
+        frac = (block - block.astype(int))[:, None]
+
+        magnitude = (1 - frac) * magnitudes[index] + frac * magnitudes[index + 1]
+        if formant_factor is not None:
+            magnitude *= _envelope_ratio(magnitude, formant_factor, lifter)
+            if formant_factor > 1:
+                # Bins the final resample would push above Nyquist
+                magnitude[:, bins * formant_factor > bins[-1]] = 0
+
+        # Each output frame gets the phase of the previous one plus the measured advance
+        delta = angles[index + 1] - angles[index] - advance
+        delta = advance + delta - 2 * np.pi * np.round(delta / (2 * np.pi))
+        phases = phase + np.cumsum(delta, axis=0) - delta
+        phase = np.mod(phases[-1] + delta[-1], 2 * np.pi)
+
+        # Wrapped first: float32 keeps enough precision for phases in [0, 2pi)
+        phases = np.mod(phases, 2 * np.pi).astype(np.float32)
+        magnitude = magnitude.astype(np.float32)
+        frames_out = np.empty(phases.shape, dtype=np.complex64)
+        frames_out.real = magnitude * np.cos(phases)
+        frames_out.imag = magnitude * np.sin(phases)
+        synthesized = np.fft.irfft(frames_out, n_fft, axis=1) * window
+        for part in range(n_fft // hop):
+            offset = (start + part) * hop
+            out[offset:offset + len(block) * hop] += synthesized[:, part * hop:(part + 1) * hop].reshape(-1)
+
+    out /= (window ** 2).sum() / hop
+    length = int(round(len(x) / rate))
+    return out[n_fft // 2:n_fft // 2 + length]
+
+
+def time_stretch(samples, rate, sample_rate):
+    """Play rate times faster without changing pitch (rate 1.1 is 10% shorter)."""
+    if rate == 1.0 or not len(samples):
+        return samples
+    return _per_channel(_vocoder, samples, rate, sample_rate)
+
+
+def pitch_shift(samples, factor, sample_rate, preserve_formants=True):
+    """Raise pitch by factor (0.5 is an octave down) without changing duration."""
+    if factor == 1.0 or not len(samples):
+        return samples
+    stretched = _per_channel(_vocoder, samples, 1 / factor, sample_rate, factor if preserve_formants else None)
+    return resample(stretched, len(samples))
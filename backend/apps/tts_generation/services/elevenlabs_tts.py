@@ -0,0 +1,108 @@
+# tts_generation/services/elevenlabs_tts.py
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from ...provider_clients import clients
+
+logger = logging.getLogger(__name__)
+
+VOICE_ID = "JBFqnCBsd6RMkjVDRZzb"
+MODEL_ID = "eleven_flash_v2_5"
+OUTPUT_FORMAT = "mp3_44100_128"
+
+
+def _retryable(error):
+    status_code = getattr(error, 'status_code', None)
+    # Rate limits and server errors pass; other client errors will fail again
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+class ParagraphSynthesizer:
+    """
+    Synthesize the paragraphs of a script with ElevenLabs concurrently.
+
+    At most max_workers requests are in flight, which should match the
+    concurrency limit of the account's plan; with enough workers a script
+    takes about as long as its slowest paragraph. Each paragraph retries
+    rate limits and server errors on its own, and a paragraph that still
+    fails is reported in its result.
+    """
+
+    def __init__(self, max_workers=None, retries=None):
+        self.max_workers = max_workers or settings.ELEVENLABS_MAX_CONCURRENCY
+        self.retries = settings.ELEVENLABS_RETRIES if retries is None else retries
+        self.client = clients.get('elevenlabs')
+
+    def _convert(self, text, stability):
+        return self.client.text_to_speech.convert(
+            text=text,
+            voice_id=VOICE_ID,
+            model_id=MODEL_ID,
+            output_format=OUTPUT_FORMAT,
+            voice_settings={
+                "stability": stability,
+                "similarity_boost": 0.5,
+                "style": 0.0,
+                "use_speaker_boost": True
+            }
+        )
+
+    def _with_retries(self, call):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return call()
+            except Exception as e:
+                if attempt > self.retries or not _retryable(e):
+                    raise
+                delay = 2 ** (attempt - 1)
+                logger.warning(f"Speech synthesis attempt {attempt} failed ({e}); retrying in {delay}s")
+                time.sleep(delay)
+
+    def synthesize(self, text, stability):
+        """Return the MP3 bytes of one paragraph."""
+        # Collect the chunks and join once, instead of re-copying the audio on every chunk
+        return self._with_retries(lambda: b''.join(self._convert(text, stability)))
+
+    def open_stream(self, text, stability):
+        """
+        Start synthesizing text and return an iterator over its MP3 chunks.
+
+        The request is retried until its first chunk arrives, so errors up
+        to then can still be reported normally; later chunks are passed on
+        as the provider sends them.
+        """
+        def start():
+            chunks = iter(self._convert(text, stability))
+            return itertools.chain([next(chunks, b'')], chunks)
+
+        return self._with_retries(start)
+
+    def _synthesize_item(self, index, text, stability):
+        started = time.time()
+        try:
+            logger.info(f"Generating audio for paragraph {index + 1}: {text[:50]}...")
+            audio_data = self.synthesize(text, stability)
+            return {'index': index, 'status': 'ok', 'audio': audio_data, 'elapsed': round(time.time() - started, 2)}
+        except Exception as e:
+            logger.error(f"Failed to generate audio for paragraph {index + 1}: {str(e)}")
+            return {'index': index, 'status': 'error', 'error': str(e), 'elapsed': round(time.time() - started, 2)}
+
+    def synthesize_all(self, paragraphs, stability):
+        """
+        Return the results of all paragraphs in paragraph order.
+
+        Args:
+            paragraphs: A list of texts, or {paragraph index: text} to
+                synthesize only some paragraphs of a script
+        """
+        items = sorted(paragraphs.items()) if isinstance(paragraphs, dict) else list(enumerate(paragraphs))
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(lambda item: self._synthesize_item(item[0], item[1], stability), items))
@@ -0,0 +1,226 @@
+# tts_generation/services/gtts_audio.py
+import hashlib
+import io
+import logging
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from imageio_ffmpeg import get_ffmpeg_exe
+from mutagen.mp3 import MP3
+from pydub import AudioSegment
+
+from ...disk_cache import DiskLRUCache
+from ...provider_clients import clients
+from . import audio_effects
+
+logger = logging.getLogger(__name__)
+
+# Bump when a change to the gTTS call makes cached chunks stale
+CHUNK_CACHE_VERSION = 1
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?…。！？])\s+|\n+')
+CLAUSE_BREAK = re.compile(r'(?<=[,;:、，；：])\s+')
+
+# gTTS MP3 of single chunks, shared by every request that contains the same sentence
+chunk_cache = DiskLRUCache(
+    getattr(settings, 'GTTS_CHUNK_CACHE_ROOT', os.path.join(settings.BASE_DIR, 'cache', 'gtts')),
+    getattr(settings, 'GTTS_CHUNK_CACHE_MAX_BYTES', 256 * 1024 ** 2),
+)
+
+
+def _ffmpeg(args, data):
+    """Run ffmpeg with data on stdin and return its stdout."""
+    result = subprocess.run([get_ffmpeg_exe(), '-v', 'error', *args], input=data, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+
+def _pieces(text, max_chars):
+    """Sentences of text; sentences longer than max_chars are cut at clauses, then at spaces."""
+    for sentence in SENTENCE_BREAK.split(text):
+        sentence = ' '.join(sentence.split())
+        if len(sentence) <= max_chars:
+            if sentence:
+                yield sentence
+            continue
+        for clause in CLAUSE_BREAK.split(sentence):
+            while len(clause) > max_chars:
+                cut = clause.rfind(' ', 0, max_chars + 1)
+                if cut <= 0:
+                    cut = max_chars
+                yield clause[:cut].strip()
+                clause = clause[cut:].strip()
+            if clause:
+                yield clause
+
+
+def split_text(text, max_chars=None):
+    """
+    Split text on sentence boundaries into chunks of at most max_chars.
+
+    Consecutive short sentences share a chunk, so a chunk is about one
+    gTTS request and the number of seams stays low.
+    """
+    max_chars = max_chars or settings.GTTS_CHUNK_CHARS
+    chunks = []
+    for piece in _pieces(text, max_chars):
+        if chunks and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def chunk_cache_key(text, language, slow):
+    digest = hashlib.sha256()
+    digest.update(f"{CHUNK_CACHE_VERSION}\0{language}\0{slow}\0{text}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def synthesize(text, language, slow):
+    """Return gTTS MP3 bytes of one chunk, written straight into memory."""
+    key = chunk_cache_key(text, language, slow)
+    data = chunk_cache.get(key)
+    if data is not None:
+        return data
+
+    attempt = 0
+    while True:
+        attempt += 1
+        buffer = io.BytesIO()
+        try:
+            clients.get('gtts')(text=text, lang=language, slow=slow).write_to_fp(buffer)
+            break
+        except Exception as e:
+            if attempt > settings.GTTS_RETRIES:
+                raise
+            delay = 2 ** (attempt - 1)
+            logger.warning(f"gTTS attempt {attempt} failed ({e}); retrying in {delay}s")
+            time.sleep(delay)
+    if not buffer.tell():
+        logger.error("gTTS generated empty file")
+        raise ValueError("gTTS generated empty file")
+    data = buffer.getvalue()
+    chunk_cache.put(key, data)
+    return data
+
+
+def decode_mp3(data):
+    """Decode MP3 bytes to an AudioSegment through ffmpeg pipes (no temp files)."""
+    info = MP3(io.BytesIO(data)).info
+    pcm = _ffmpeg(['-f', 'mp3', '-i', 'pipe:0', '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'], data)
+    return AudioSegment(data=pcm, sample_width=2, frame_rate=info.sample_rate, channels=info.channels)
+
+
+def encode_mp3(audio):
+    return _ffmpeg([
+        '-f', 's16le', '-ar', str(audio.frame_rate), '-ac', str(audio.channels), '-i', 'pipe:0',
+        '-f', 'mp3', 'pipe:1',
+    ], audio.raw_data)
+
+
+def stitch(segments, crossfade_ms=None):
+    """
+    Join decoded chunks into one track with a short linear crossfade at
+    each seam. The samples are concatenated once, so long narrations do
+    not re-copy the track for every chunk as repeated appends would.
+    """
+    crossfade_ms = settings.GTTS_CROSSFADE_MS if crossfade_ms is None else crossfade_ms
+    first = segments[0]
+    channels = first.channels
+    overlap = int(first.frame_rate * crossfade_ms / 1000) * channels
+
+    pieces = []
+    previous = np.frombuffer(first.raw_data, dtype=np.int16).astype(np.float32)
+    for segment in segments[1:]:
+        if segment.frame_rate != first.frame_rate or segment.channels != channels:
+            segment = segment.set_frame_rate(first.frame_rate).set_channels(channels)
+        current = np.frombuffer(segment.raw_data, dtype=np.int16).astype(np.float32)
+        n = min(overlap, len(previous), len(current)) // channels * channels
+        if n:
+            ramp = np.repeat(np.linspace(0, 1, n // channels, dtype=np.float32), channels)
+            pieces.append(previous[:-n])
+            pieces.append(previous[-n:] * (1 - ramp) + current[:n] * ramp)
+            current = current[n:]
+        else:
+            pieces.append(previous)
+        previous = current
+    pieces.append(previous)
+
+    samples = np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+    return first._spawn(samples.tobytes())
+
+
+def _process(audio, pitch_shift, style):
+    if pitch_shift != 1.0 or style == 'funny':
+        samples = audio_effects.from_pcm16(audio.raw_data, audio.channels)
+        if pitch_shift != 1.0:
+            samples = audio_effects.pitch_shift(samples, pitch_shift, audio.frame_rate)
+
+        # Apply effects based on style
+        if style == 'funny':
+            samples = audio_effects.time_stretch(samples, 1.1, audio.frame_rate)  # Tăng nhẹ tốc độ
+        audio = audio._spawn(audio_effects.to_pcm16(samples))
+
+    if len(audio) == 0:
+        logger.error("Audio is empty after processing")
+        raise ValueError("Generated audio is empty")
+    return audio
+
+
+def apply_effects(data, pitch_shift=1.0, style=None):
+    """
+    Return (MP3 bytes, duration in seconds) after pitch shift and style effects.
+
+    Without effects the original MP3 is passed through untouched and its
+    duration read from the frame headers. Otherwise it is decoded once,
+    processed, and encoded once; the duration comes from the samples.
+    """
+    if pitch_shift == 1.0 and style != 'funny':
+        return data, MP3(io.BytesIO(data)).info.length
+
+    audio = _process(decode_mp3(data), pitch_shift, style)
+    return encode_mp3(audio), len(audio) / 1000.0
+
+
+def render_timed(text, language, slow, pitch_shift=1.0, style=None):
+    """
+    Return (MP3 bytes, duration in seconds, [(chunk text, seconds), ...]) of a whole narration.
+
+    The text is split into sentence chunks that are synthesized (or taken
+    from the chunk cache) and decoded concurrently, at most
+    GTTS_MAX_CONCURRENCY at a time, so a long script takes a few chunk
+    latencies instead of one per sentence. The chunks are crossfaded into
+    one track, processed, and encoded once. The spans of the chunks add
+    up to the duration, for captions.
+    """
+    chunks = split_text(text)
+    if not chunks:
+        raise ValueError("Text has nothing to synthesize")
+    if len(chunks) == 1:
+        data, duration = apply_effects(synthesize(chunks[0], language, slow), pitch_shift, style)
+        return data, duration, [(chunks[0], duration)]
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=min(settings.GTTS_MAX_CONCURRENCY, len(chunks))) as executor:
+        segments = list(executor.map(lambda chunk: decode_mp3(synthesize(chunk, language, slow)), chunks))
+    logger.info(f"Synthesized {len(chunks)} gTTS chunks in {time.time() - started:.2f}s")
+
+    audio = _process(stitch(segments), pitch_shift, style)
+    duration = len(audio) / 1000.0
+    # Crossfades and the speed-up shorten every chunk alike, so the measured lengths scale
+    lengths = [len(segment) for segment in segments]
+    spans = [(chunk, duration * length / sum(lengths)) for chunk, length in zip(chunks, lengths)]
+    return encode_mp3(audio), duration, spans
+
+
+def render(text, language, slow, pitch_shift=1.0, style=None):
+    """Return (MP3 bytes, duration in seconds) of a whole narration; see render_timed."""
+    data, duration, _ = render_timed(text, language, slow, pitch_shift, style)
+    return data, duration
@@ -0,0 +1,120 @@
+# tts_generation/services/text_video.py
+import io
+import math
+import os
+import subprocess
+import tempfile
+
+from django.conf import settings
+from imageio_ffmpeg import get_ffmpeg_exe
+from PIL import Image, ImageDraw, ImageFont
+
+from ... import subtitles
+
+# Bump when a rendering change makes cached text videos stale (part of the TTS cache key)
+RENDER_VERSION = 2
+
+CARD_SIZE = (1280, 720)
+FONT_SIZE = 50
+# Long texts shrink the font down to this size before they are cut off
+MIN_FONT_SIZE = 18
+MARGIN = 60
+# Length of the encoded still segment that is looped; each loop starts with a keyframe
+SEGMENT_SECONDS = 30
+
+
+def _font(size):
+    try:
+        return ImageFont.truetype(settings.TEXT_VIDEO_FONT, size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def _wrap(draw, text, font, width):
+    lines = []
+    for paragraph in text.splitlines() or ['']:
+        line = ''
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if line and draw.textlength(candidate, font=font) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def text_card(text, size=CARD_SIZE, font_size=FONT_SIZE):
+    """PNG of the text in white, wrapped and centered on black, in the largest font that fits."""
+    img = Image.new('RGB', size, 'black')
+    draw = ImageDraw.Draw(img)
+    while True:
+        font = _font(font_size)
+        spacing = font_size // 4
+        wrapped = _wrap(draw, text, font, size[0] - 2 * MARGIN)
+        left, top, right, bottom = draw.multiline_textbbox((0, 0), wrapped, font=font, spacing=spacing)
+        if bottom - top <= size[1] - 2 * MARGIN or font_size <= MIN_FONT_SIZE:
+            break
+        font_size = max(MIN_FONT_SIZE, int(font_size * 0.85))
+
+    draw.multiline_text((size[0] / 2, size[1] / 2), wrapped, font=font, fill='white',
+                        anchor='mm', align='center', spacing=spacing)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _run(args, data=None):
+    result = subprocess.run([get_ffmpeg_exe(), '-v', 'error', '-y', *args], input=data, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+
+
+def render(text, audio_data, duration, cues=None, burn=False):
+    """
+    Return the MP4 bytes of a text card shown for the whole narration.
+
+    The card is rasterized once and encoded into a short still segment at
+    TEXT_VIDEO_FPS with the stillimage tune. ffmpeg then loops that
+    segment over the narration and muxes the MP3, both as stream copies,
+    so the cost no longer grows with the narration length. The segment
+    has no B-frames (whose reordering delay would push the picture past
+    the audio), and the loop is cut to the frames that cover the audio,
+    with -shortest ending the file with the narration.
+
+    Args:
+        cues: Caption cues (see apps.subtitles), added as a mov_text stream
+        burn: Draw the cues into the picture instead, over a blank card;
+            this re-encodes every frame
+    """
+    fps = str(settings.TEXT_VIDEO_FPS)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        card_path = os.path.join(temp_dir, 'card.png')
+        segment_path = os.path.join(temp_dir, 'segment.mp4')
+        output_path = os.path.join(temp_dir, 'video.mp4')
+        with open(card_path, 'wb') as f:
+            f.write(text_card('' if burn and cues else text))
+
+        _run([
+            '-loop', '1', '-framerate', fps, '-i', card_path,
+            '-t', f"{min(SEGMENT_SECONDS, duration):.3f}",
+            '-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'stillimage', '-pix_fmt', 'yuv420p', '-bf', '0',
+            segment_path,
+        ])
+        _run([
+            '-stream_loop', '-1', '-i', segment_path,
+            '-f', 'mp3', '-i', 'pipe:0',
+            '-map', '0:v', '-map', '1:a', '-c', 'copy',
+            '-frames:v', str(math.ceil(duration * settings.TEXT_VIDEO_FPS)), '-shortest',
+            '-movflags', '+faststart',
+            output_path,
+        ], audio_data)
+
+        if cues:
+            captioned_path = os.path.join(temp_dir, 'captioned.mp4')
+            (subtitles.burn_in if burn else subtitles.embed)(output_path, cues, captioned_path)
+            output_path = captioned_path
+
+        with open(output_path, 'rb') as f:
+            return f.read()
@@ -0,0 +1,133 @@
+# tts_generation/services/tts_cache.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models import GeneratedVoice
+
+logger = logging.getLogger(__name__)
+
+# Bump when a change to synthesis or post-processing makes cached audio stale
+TTS_CACHE_VERSION = 2
+
+# Seconds between automatic eviction sweeps of one process
+EVICT_INTERVAL = 600
+
+
+def tts_cache_key(kind, provider, voice_type, language, text, **params):
+    """SHA-256 of everything that determines the produced audio (or video)."""
+    payload = json.dumps(
+        [TTS_CACHE_VERSION, kind, provider, voice_type, language, text, params], sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """
+    Synthesized audio reused across requests, backed by GeneratedVoice rows.
+
+    A row with a cache_key is a cache entry: its stored files are served
+    again for the same key instead of calling the provider. Entries unused
+    for TTS_CACHE_MAX_AGE seconds are evicted, then the least recently used
+    ones until their total size fits in TTS_CACHE_MAX_BYTES. Evicting an
+    entry only clears its cache_key: the row and its files are the user's
+    generated audio and stay until deleted with it.
+    """
+
+    hits = 0
+    misses = 0
+    _lock = threading.Lock()
+    _last_evict = 0
+
+    @classmethod
+    def _count(cls, hit):
+        with cls._lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+    @classmethod
+    def lookup(cls, key, with_video=False):
+        """Return the GeneratedVoice cached under key, or None on a miss."""
+        generated_voice = GeneratedVoice.objects.filter(cache_key=key).order_by('-id').first()
+        if generated_voice is not None:
+            fields = [generated_voice.audio_file] + ([generated_voice.video_file] if with_video else [])
+            if all(field and field.storage.exists(field.name) for field in fields):
+                GeneratedVoice.objects.filter(pk=generated_voice.pk).update(last_used_at=timezone.now())
+                cls._count(True)
+                return generated_voice
+            # Files are gone (deleted by hand); the entry is worthless
+            GeneratedVoice.objects.filter(pk=generated_voice.pk).update(cache_key=None)
+        cls._count(False)
+        return None
+
+    @classmethod
+    def store(cls, generated_voice, key):
+        """Make a saved GeneratedVoice the cache entry for key."""
+        size = 0
+        for field in (generated_voice.audio_file, generated_voice.video_file):
+            if field:
+                size += field.size
+        generated_voice.cache_key = key
+        generated_voice.size = size
+        generated_voice.last_used_at = timezone.now()
+        generated_voice.save(update_fields=['cache_key', 'size', 'last_used_at'])
+        cls.maybe_evict()
+
+    @classmethod
+    def maybe_evict(cls):
+        with cls._lock:
+            if time.time() - cls._last_evict < EVICT_INTERVAL:
+                return
+            cls._last_evict = time.time()
+        try:
+            cls.evict(settings.TTS_CACHE_MAX_BYTES, settings.TTS_CACHE_MAX_AGE)
+        except Exception as e:
+            logger.error(f"TTS cache eviction failed: {str(e)}")
+
+    @staticmethod
+    def evict(max_bytes, max_age_seconds, dry_run=False):
+        """
+        Return (entries, bytes) evicted by age, then by size in least
+        recently used order. Evicted rows stop being cache entries; they
+        are not deleted.
+        """
+        entries = GeneratedVoice.objects.filter(cache_key__isnull=False)
+        cutoff = timezone.now() - timedelta(seconds=max_age_seconds)
+        victims = list(entries.filter(last_used_at__lt=cutoff))
+
+        total = (entries.aggregate(total=Sum('size'))['total'] or 0) - sum(v.size for v in victims)
+        if total > max_bytes:
+            for generated_voice in entries.filter(last_used_at__gte=cutoff).order_by('last_used_at', 'id').iterator():
+                if total <= max_bytes:
+                    break
+                victims.append(generated_voice)
+                total -= generated_voice.size
+
+        freed = sum(v.size for v in victims)
+        if not dry_run:
+            GeneratedVoice.objects.filter(pk__in=[v.pk for v in victims]).update(cache_key=None, last_used_at=None)
+            if victims:
+                logger.info(f"Evicted {len(victims)} TTS cache entries ({freed} bytes)")
+        return len(victims), freed
+
+    @classmethod
+    def stats(cls):
+        entries = GeneratedVoice.objects.filter(cache_key__isnull=False)
+        total = cls.hits + cls.misses
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_rate': round(cls.hits / total, 3) if total else None,
+            'entries': entries.count(),
+            'bytes': entries.aggregate(total=Sum('size'))['total'] or 0,
+            'max_bytes': settings.TTS_CACHE_MAX_BYTES,
+        }
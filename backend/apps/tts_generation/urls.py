@@ -1,10 +1,15 @@
 from django.urls import path
 from .views import GenerateAudioView, GenerateVideoView
-from .views import GenerateAudioView, GenerateMultiAudioView, delete_all_audios
+from .views import GenerateAudioView, GenerateMultiAudioView, StreamAudioView, delete_all_audios, tts_cache_stats
+from .views import generated_voice_subtitles
 
 urlpatterns = [
     path('generate-audio/', GenerateAudioView.as_view(), name='generate-audio'),
     path('generate-video/', GenerateVideoView.as_view(), name='generate-video'),
     path('generate-multi-audio/', GenerateMultiAudioView.as_view(), name='generate-multi-audio'),
+    path('stream-audio/', StreamAudioView.as_view(), name='stream-audio'),
     path('delete-all-audios/', delete_all_audios, name='delete_all_audios'),
+    path('tts-cache/stats/', tts_cache_stats, name='tts_cache_stats'),
+    path('generated-voices/<int:voice_id>/subtitles.<str:extension>', generated_voice_subtitles,
+         name='generated-voice-subtitles'),
 ]
\ No newline at end of file
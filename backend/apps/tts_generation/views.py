@@ -1,27 +1,34 @@
 import tempfile
 import os
 import logging
-from django.http import FileResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views import View
+from django.views.decorators.http import require_GET
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.core.files import File
-from gtts import gTTS
-from pydub import AudioSegment
+from django.core.files.base import ContentFile
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
-from moviepy import TextClip, CompositeVideoClip, AudioFileClip
 from .models import Voice, GeneratedVoice
 import logging
 from mutagen.mp3 import MP3
 import base64
+import io
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from elevenlabs import ElevenLabs
+from django.conf import settings
+from .. import subtitles
+from .services import gtts_audio, text_video
+from .services.elevenlabs_tts import MODEL_ID, OUTPUT_FORMAT, VOICE_ID, ParagraphSynthesizer
+from .services.tts_cache import TTSCache, tts_cache_key
 
 
 logger = logging.getLogger(__name__)
 
+SUBTITLE_MODES = ('soft', 'burn')
+
 @method_decorator(csrf_exempt, name='dispatch')
 @permission_classes([AllowAny])
 class GenerateAudioView(View):
@@ -43,38 +50,20 @@ class GenerateAudioView(View):
                 language=language,
                 voice_type='default'
             )
+            disposition = f'attachment; filename="{style}_audio.mp3"' if style else 'attachment; filename="output_audio.mp3"'
 
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-                temp_path = temp_file.name
-
-            # Generate audio with gTTS
-            tts = gTTS(text=text, lang=language, slow=slow)
-            tts.save(temp_path)
-
-            # Kiểm tra file gTTS
-            if os.path.getsize(temp_path) == 0:
-                logger.error("gTTS generated empty file")
-                raise ValueError("gTTS generated empty file")
-
-            # Apply pitch shift and effects with pydub
-            audio = AudioSegment.from_mp3(temp_path)
-
-            if pitch_shift != 1.0:
-                new_rate = int(audio.frame_rate * pitch_shift)
-                audio = audio._spawn(audio.raw_data, overrides={'frame_rate': new_rate})
-                audio = audio.set_frame_rate(audio.frame_rate)
+            # Identical requests are answered from the TTS cache without calling gTTS
+            cache_key = tts_cache_key('audio', 'gTTS', 'default', language, text,
+                                      pitch_shift=pitch_shift, slow=slow, style=style)
+            cached = TTSCache.lookup(cache_key)
+            if cached is not None:
+                response = FileResponse(cached.audio_file.open('rb'), content_type='audio/mpeg')
+                response['Content-Disposition'] = disposition
+                response['X-TTS-Cached'] = 'true'
+                return response
 
-            # Apply effects based on style
-            if style == 'funny':
-                audio = audio.speedup(playback_speed=1.1)  # Tăng nhẹ tốc độ
-
-            # Kiểm tra audio sau xử lý
-            if len(audio) == 0:
-                logger.error("Audio is empty after processing")
-                raise ValueError("Generated audio is empty")
-
-            audio.export(temp_path, format='mp3')
+            # Sentence chunks are synthesized concurrently and kept in memory
+            audio_data, duration = gtts_audio.render(text, language, slow, pitch_shift, style)
 
             # Save to GeneratedVoice
             generated_voice = GeneratedVoice.objects.create(
@@ -83,25 +72,15 @@ class GenerateAudioView(View):
                 pitch_shift=pitch_shift,
                 speed=1.0 if not slow else 0.5,
                 style=style,
-                duration=len(audio) / 1000.0
+                duration=duration
             )
-            with open(temp_path, 'rb') as f:
-                django_file = File(f, name=f'audio_{generated_voice.id}.mp3')
-                generated_voice.audio_file = django_file
-                generated_voice.save()
-
-            # Send file response
-            response = FileResponse(open(temp_path, 'rb'), content_type='audio/mpeg')
-            response['Content-Disposition'] = f'attachment; filename="{style}_audio.mp3"' if style else 'attachment; filename="output_audio.mp3"'
+            generated_voice.audio_file.save(f'audio_{generated_voice.id}.mp3', ContentFile(audio_data))
+            TTSCache.store(generated_voice, cache_key)
 
-            # Clean up temporary file after response
-            def cleanup():
-                try:
-                    os.remove(temp_path)
-                except Exception as e:
-                    logger.error(f"Failed to clean up {temp_path}: {str(e)}")
-
-            response.close = cleanup
+            # Storage and response are written from the same buffer
+            response = HttpResponse(audio_data, content_type='audio/mpeg')
+            response['Content-Disposition'] = disposition
+            response['X-TTS-Cached'] = 'false'
             return response
 
         except Exception as e:
@@ -215,6 +194,15 @@ class GenerateAudioView(View):
         
 
 
+def _elevenlabs_stability(pitch_shift):
+    # Log warning for pitch_shift (ElevenLabs doesn't support direct pitch shift)
+    if pitch_shift != 1.0:
+        logger.warning("ElevenLabs does not support pitch_shift. Using stability adjustment.")
+        # Map pitch_shift to stability (0.0 to 1.0)
+        return max(0.0, min(1.0, 1.0 / pitch_shift))
+    return 0.5  # Default stability
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 @permission_classes([IsAuthenticated])
 class GenerateMultiAudioView(View):
@@ -229,13 +217,7 @@ class GenerateMultiAudioView(View):
             if not text:
                 return JsonResponse({'error': 'Text is required'}, status=400)
 
-            # Log warning for pitch_shift (ElevenLabs doesn't support direct pitch shift)
-            if pitch_shift != 1.0:
-                logger.warning("ElevenLabs does not support pitch_shift. Using stability adjustment.")
-                # Map pitch_shift to stability (0.0 to 1.0)
-                stability = max(0.0, min(1.0, 1.0 / pitch_shift))
-            else:
-                stability = 0.5  # Default stability
+            stability = _elevenlabs_stability(pitch_shift)
 
             # Map slow to speed (ElevenLabs doesn't have a direct slow parameter)
             speed = 0.8 if slow else 1.0  # Approximate slow effect
@@ -249,62 +231,58 @@ class GenerateMultiAudioView(View):
             voice, _ = Voice.objects.get_or_create(
                 provider='ElevenLabs',
                 language=language,
-                voice_type='JBFqnCBsd6RMkjVDRZzb'  # Match voice_id
+                voice_type=VOICE_ID
             )
 
-            audio_results = []
-            temp_files = []
-
-            # Initialize ElevenLabs client
-            api_key = os.getenv('ELEVEN_LABS_API_KEY')
-            if not api_key:
+            # Process-wide ElevenLabs client, its connections stay open between requests
+            if not settings.ELEVEN_LABS_API_KEY and settings.PROVIDER_BACKEND != 'offline':
                 return JsonResponse({'error': 'ElevenLabs API key not configured'}, status=500)
-            client = ElevenLabs(api_key=api_key)
 
-            for idx, paragraph in enumerate(paragraphs):
-                # Generate audio with ElevenLabs
-                try:
-                    logger.info(f"Generating audio for paragraph {idx+1}: {paragraph[:50]}...")
-                    audio_stream = client.text_to_speech.convert(
-                        text=paragraph,
-                        voice_id="JBFqnCBsd6RMkjVDRZzb",
-                        model_id="eleven_flash_v2_5",
-                        output_format="mp3_44100_128",
-                        voice_settings={
-                            "stability": stability,
-                            "similarity_boost": 0.5,
-                            "style": 0.0,
-                            "use_speaker_boost": True
-                        }
-                    )
-
-                    # Read audio data
-                    audio_data = b''
-                    for chunk in audio_stream:
-                        audio_data += chunk
-                except Exception as e:
-                    logger.error(f"Failed to generate audio for paragraph {idx+1}: {str(e)}")
-                    return JsonResponse({'error': f'Audio generation failed: {str(e)}'}, status=500)
+            # Paragraphs synthesized before with the same settings come from the TTS cache
+            cache_keys = [
+                tts_cache_key('speech', 'ElevenLabs', VOICE_ID, language, paragraph,
+                              model_id=MODEL_ID, output_format=OUTPUT_FORMAT, stability=stability)
+                for paragraph in paragraphs
+            ]
+            hits = {idx: TTSCache.lookup(key) for idx, key in enumerate(cache_keys)}
+            missing = {idx: paragraphs[idx] for idx, hit in hits.items() if hit is None}
+
+            # The others are synthesized concurrently; results come back in paragraph order
+            synthesized = {result['index']: result for result in ParagraphSynthesizer().synthesize_all(missing, stability)}
+            results = [
+                synthesized[idx] if hits[idx] is None else {'index': idx, 'status': 'ok', 'cached': True, 'id': hits[idx].id}
+                for idx in range(len(paragraphs))
+            ]
 
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    temp_file.write(audio_data)
+            audio_results = []
+            for result in results:
+                idx = result['index']
+                paragraph = paragraphs[idx]
+                if result['status'] != 'ok':
+                    continue
+                if hits[idx] is not None:
+                    with hits[idx].audio_file.open('rb') as f:
+                        audio_data = f.read()
+                    audio_results.append({
+                        'id': hits[idx].id,
+                        'text': paragraph,
+                        'audio_base64': base64.b64encode(audio_data).decode('utf-8'),
+                        'pitch_shift': pitch_shift,
+                        'speed': speed,
+                        'duration': hits[idx].duration,
+                        'cached': True,
+                    })
+                    continue
+                audio_data = result.pop('audio')
+                result['cached'] = False
 
                 # Get audio duration with mutagen
                 try:
-                    audio = MP3(temp_path)
-                    audio_duration = audio.info.length
+                    audio_duration = MP3(io.BytesIO(audio_data)).info.length
                 except Exception as e:
                     logger.error(f"Failed to get audio duration for paragraph {idx+1}: {str(e)}")
-                    return JsonResponse({'error': f'Failed to process audio duration: {str(e)}'}, status=500)
-
-                # Encode audio as base64
-                try:
-                    audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                except Exception as e:
-                    logger.error(f"Failed to encode audio for paragraph {idx+1}: {str(e)}")
-                    return JsonResponse({'error': f'Failed to encode audio: {str(e)}'}, status=500)
+                    result.update(status='error', error=f'Failed to process audio duration: {str(e)}')
+                    continue
 
                 # Save to GeneratedVoice
                 generated_voice = GeneratedVoice.objects.create(
@@ -314,81 +292,155 @@ class GenerateMultiAudioView(View):
                     speed=speed,
                     duration=audio_duration
                 )
-                with open(temp_path, 'rb') as f:
-                    django_file = File(f, name=f'audio_{generated_voice.id}.mp3')
-                    generated_voice.audio_file = django_file
-                    generated_voice.save()
+                generated_voice.audio_file.save(f'audio_{generated_voice.id}.mp3', ContentFile(audio_data))
+                TTSCache.store(generated_voice, cache_keys[idx])
+                result['id'] = generated_voice.id
 
                 # Store result
                 audio_results.append({
                     'id': generated_voice.id,
                     'text': paragraph,
-                    'audio_base64': audio_base64,
+                    'audio_base64': base64.b64encode(audio_data).decode('utf-8'),
                     'pitch_shift': pitch_shift,
                     'speed': speed,
-                    'duration': audio_duration
+                    'duration': audio_duration,
+                    'cached': False,
                 })
-                temp_files.append(temp_path)
 
-            # Return JSON response
-            response = JsonResponse({'audios': audio_results})
+            # Every paragraph needs its audio; report which ones failed and why
+            failed = [result for result in results if result['status'] != 'ok']
+            if failed:
+                first = failed[0]
+                return JsonResponse({
+                    'error': f"Audio generation failed for paragraph {first['index'] + 1}: {first['error']}",
+                    'results': results,
+                    'failed_count': len(failed),
+                }, status=500)
+
+            # Paragraphs are played back to back, so their durations place the captions
+            cues = subtitles.build_cues([a['text'] for a in audio_results], [a['duration'] for a in audio_results])
+            return JsonResponse({
+                'audios': audio_results,
+                'subtitles': {'srt': subtitles.to_srt(cues), 'vtt': subtitles.to_webvtt(cues)},
+            })
+
+        except Exception as e:
+            logger.error(f"GenerateMultiAudioView error: {str(e)}", exc_info=True)
+            return JsonResponse({'error': f'Failed to generate audios: {str(e)}'}, status=500)
+
 
-            # Clean up temporary files
-            def cleanup():
-                for temp_path in temp_files:
-                    try:
-                        os.remove(temp_path)
-                        logger.info(f"Cleaned up temporary file: {temp_path}")
-                    except Exception:
-                        pass
+def _relay_and_store(chunks, store):
+    """
+    Yield the audio chunks to the client while spooling them to a temp file.
 
-            response.close = cleanup
+    Once the last chunk is sent, store(path) persists the complete file. If
+    the client goes away or synthesis breaks off, nothing is stored.
+    """
+    spool = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+    try:
+        for chunk in chunks:
+            spool.write(chunk)
+            yield chunk
+        spool.close()
+        store(spool.name)
+    except Exception as e:
+        # Headers are already sent; the client sees a truncated stream
+        logger.error(f"Streaming speech failed: {str(e)}", exc_info=True)
+    finally:
+        spool.close()
+        try:
+            os.remove(spool.name)
+        except OSError:
+            pass
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+@permission_classes([IsAuthenticated])
+class StreamAudioView(View):
+    """
+    Speech for a text as an audio/mpeg stream.
+
+    Chunks are relayed as ElevenLabs produces them, so playback can start
+    after the first one; the complete audio is stored as a GeneratedVoice
+    (and TTS cache entry) when the stream ends. Cached texts are served
+    from storage.
+    """
+
+    def post(self, request):
+        text = request.POST.get('text', '').strip()
+        language = request.POST.get('language', 'en')
+        try:
+            pitch_shift = float(request.POST.get('pitch_shift', 1.0))
+        except ValueError:
+            return JsonResponse({'error': 'pitch_shift must be a number'}, status=400)
+        slow = request.POST.get('slow', 'False').lower() == 'true'
+        if not text:
+            return JsonResponse({'error': 'Text is required'}, status=400)
+        if not settings.ELEVEN_LABS_API_KEY and settings.PROVIDER_BACKEND != 'offline':
+            return JsonResponse({'error': 'ElevenLabs API key not configured'}, status=500)
+
+        stability = _elevenlabs_stability(pitch_shift)
+        speed = 0.8 if slow else 1.0
+        cache_key = tts_cache_key('speech', 'ElevenLabs', VOICE_ID, language, text,
+                                  model_id=MODEL_ID, output_format=OUTPUT_FORMAT, stability=stability)
+        cached = TTSCache.lookup(cache_key)
+        if cached is not None:
+            response = FileResponse(cached.audio_file.open('rb'), content_type='audio/mpeg')
+            response['X-TTS-Cached'] = 'true'
+            response['X-Audio-Id'] = str(cached.id)
             return response
 
+        # Wait for the first chunk here, so a failing provider still gets a proper error response
+        try:
+            chunks = ParagraphSynthesizer().open_stream(text, stability)
         except Exception as e:
-            logger.error(f"GenerateMultiAudioView error: {str(e)}", exc_info=True)
-            return JsonResponse({'error': f'Failed to generate audios: {str(e)}'}, status=500)
+            logger.error(f"Failed to start speech stream: {str(e)}")
+            return JsonResponse({'error': f'Audio generation failed: {str(e)}'}, status=500)
+
+        voice, _ = Voice.objects.get_or_create(provider='ElevenLabs', language=language, voice_type=VOICE_ID)
+
+        def store(path):
+            generated_voice = GeneratedVoice.objects.create(
+                voice=voice,
+                text=text,
+                pitch_shift=pitch_shift,
+                speed=speed,
+                duration=MP3(path).info.length
+            )
+            with open(path, 'rb') as f:
+                generated_voice.audio_file.save(f'audio_{generated_voice.id}.mp3', File(f))
+            TTSCache.store(generated_voice, cache_key)
+
+        response = StreamingHttpResponse(_relay_and_store(chunks, store), content_type='audio/mpeg')
+        response['X-TTS-Cached'] = 'false'
+        response['Cache-Control'] = 'no-store'
+        # Let nginx pass chunks through instead of buffering the whole response
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+def _subtitles_url(request, generated_voice):
+    return request.build_absolute_uri(reverse('generated-voice-subtitles', args=[generated_voice.id, 'vtt']))
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 @permission_classes([AllowAny])
 class GenerateVideoView(View):
     def post(self, request):
-        temp_audio_file = None
-        temp_video_file = None
-        video_file = None
-        text_clip = None
-        audio_clip = None
-        video = None
-
-        # Define cleanup function at the beginning to avoid UnboundLocalError
-        def cleanup():
-            try:
-                if video_file:
-                    video_file.close()
-                if temp_audio_file and os.path.exists(temp_audio_file.name):
-                    os.remove(temp_audio_file.name)
-                if temp_video_file and os.path.exists(temp_video_file.name):
-                    os.remove(temp_video_file.name)
-                if text_clip:
-                    text_clip.close()
-                if audio_clip:
-                    audio_clip.close()
-                if video:
-                    video.close()
-            except Exception:
-                pass
-
         try:
             text = request.POST.get('text')
             language = request.POST.get('language', 'en')
             pitch_shift = float(request.POST.get('pitch_shift', 1.0))
             slow = request.POST.get('slow', 'False').lower() == 'true'
             style = request.POST.get('style', None)
+            # Captions as a soft mov_text track, or burned into the picture
+            captions = request.POST.get('subtitles', 'soft')
 
             if not text:
                 logger.error("Text is required")
                 return JsonResponse({'error': 'Text is required'}, status=400)
+            if captions not in SUBTITLE_MODES:
+                return JsonResponse({'error': f"subtitles must be one of {', '.join(SUBTITLE_MODES)}"}, status=400)
 
             # Create or get Voice object
             voice, _ = Voice.objects.get_or_create(
@@ -396,46 +448,26 @@ class GenerateVideoView(View):
                 language=language,
                 voice_type='default'
             )
-
-            # Create temporary files with delete=False
-            temp_audio_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-            temp_video_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-
-            # Generate audio with gTTS
-            tts = gTTS(text=text, lang=language, slow=slow)
-            tts.save(temp_audio_file.name)
-
-            # Kiểm tra file gTTS
-            if os.path.getsize(temp_audio_file.name) == 0:
-                logger.error("gTTS generated empty file")
-                raise ValueError("gTTS generated empty file")
-
-            # Apply pitch shift and effects with pydub
-            audio = AudioSegment.from_mp3(temp_audio_file.name)
-
-            if pitch_shift != 1.0:
-                new_rate = int(audio.frame_rate * pitch_shift)
-                audio = audio._spawn(audio.raw_data, overrides={'frame_rate': new_rate})
-                audio = audio.set_frame_rate(audio.frame_rate)
-
-            # Apply effects based on style
-            if style == 'funny':
-                audio = audio.speedup(playback_speed=1.1)  # Tăng nhẹ tốc độ
-
-            # Kiểm tra audio sau xử lý
-            if len(audio) == 0:
-                logger.error("Audio is empty after processing")
-                raise ValueError("Generated audio is empty")
-
-            audio.export(temp_audio_file.name, format='mp3')
-
-            # Create video with moviepy
-            duration = len(audio) / 1000.0
-            text_clip = TextClip(text, fontsize=50, color='white', bg_color='black', size=(1280, 720))
-            text_clip = text_clip.set_duration(duration)
-            audio_clip = AudioFileClip(temp_audio_file.name)
-            video = CompositeVideoClip([text_clip]).set_audio(audio_clip)
-            video.write_videofile(temp_video_file.name, fps=24, codec='libx264', audio_codec='aac')
+            disposition = f'attachment; filename="{style}_video.mp4"' if style else 'attachment; filename="output_video.mp4"'
+
+            # Identical requests are answered from the TTS cache without calling gTTS or rendering
+            cache_key = tts_cache_key('video', 'gTTS', 'default', language, text,
+                                      pitch_shift=pitch_shift, slow=slow, style=style, subtitles=captions,
+                                      render_version=text_video.RENDER_VERSION)
+            cached = TTSCache.lookup(cache_key, with_video=True)
+            if cached is not None:
+                response = FileResponse(cached.video_file.open('rb'), content_type='video/mp4')
+                response['Content-Disposition'] = disposition
+                response['X-Duration'] = str(cached.duration)
+                response['X-Subtitles-Url'] = _subtitles_url(request, cached)
+                response['X-TTS-Cached'] = 'true'
+                return response
+
+            audio_data, duration, spans = gtts_audio.render_timed(text, language, slow, pitch_shift, style)
+            cues = subtitles.build_cues([chunk for chunk, _ in spans], [seconds for _, seconds in spans])
+
+            # The text card is drawn once and looped by ffmpeg instead of composing every frame
+            video_data = text_video.render(text, audio_data, duration, cues, burn=captions == 'burn')
 
             # Save to GeneratedVoice
             generated_voice = GeneratedVoice.objects.create(
@@ -444,35 +476,29 @@ class GenerateVideoView(View):
                 pitch_shift=pitch_shift,
                 speed=1.0 if not slow else 0.5,
                 style=style,
-                duration=duration
+                duration=duration,
+                subtitles=cues
             )
 
             # Save audio file
-            audio_file = open(temp_audio_file.name, 'rb')
-            generated_voice.audio_file.save(f'audio_{generated_voice.id}.mp3', File(audio_file), save=False)
-            audio_file.close()
+            generated_voice.audio_file.save(f'audio_{generated_voice.id}.mp3', ContentFile(audio_data), save=False)
 
             # Save video file
-            video_file_for_storage = open(temp_video_file.name, 'rb')
-            generated_voice.video_file.save(f'video_{generated_voice.id}.mp4', File(video_file_for_storage), save=False)
-            video_file_for_storage.close()
+            generated_voice.video_file.save(f'video_{generated_voice.id}.mp4', ContentFile(video_data), save=False)
 
             # Save the GeneratedVoice instance
             generated_voice.save()
+            TTSCache.store(generated_voice, cache_key)
 
-            # Open video file for response
-            video_file = open(temp_video_file.name, 'rb')
-            response = FileResponse(video_file, content_type='video/mp4')
-            response['Content-Disposition'] = f'attachment; filename="{style}_video.mp4"' if style else 'attachment; filename="output_video.mp4"'
+            response = HttpResponse(video_data, content_type='video/mp4')
+            response['Content-Disposition'] = disposition
             response['X-Duration'] = str(duration)
-
-            # Attach cleanup to response
-            response.close = cleanup
+            response['X-Subtitles-Url'] = _subtitles_url(request, generated_voice)
+            response['X-TTS-Cached'] = 'false'
             return response
 
         except Exception as e:
             logger.error(f"Error generating video: {str(e)}")
-            cleanup()
             return JsonResponse({'error': f'Failed to generate video: {str(e)}'}, status=500)
         
 
@@ -509,4 +535,20 @@ def delete_all_audios(request):
         logger.error(f"Error deleting audio entries: {str(e)}", exc_info=True)
         return JsonResponse({
             'error': f'Failed to delete audio entries: {str(e)}'
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tts_cache_stats(request):
+    return JsonResponse(TTSCache.stats())
+
+
+@require_GET
+def generated_voice_subtitles(request, voice_id, extension):
+    """Captions of a generated narration as an SRT or WebVTT sidecar."""
+    generated_voice = GeneratedVoice.objects.filter(id=voice_id).exclude(subtitles=[]).first()
+    if generated_voice is None or extension not in subtitles.FORMATS:
+        return JsonResponse({'error': 'Subtitles not found'}, status=404)
+    write, content_type = subtitles.FORMATS[extension]
+    return HttpResponse(write(generated_voice.subtitles), content_type=content_type)
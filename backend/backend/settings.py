@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
+import json
 import os
 
 dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
@@ -30,6 +31,44 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 ELEVEN_LABS_API_KEY = os.getenv("ELEVEN_LABS_API_KEY")
 
+# Provider clients (apps/provider_clients.py), shared by all requests of a process
+# Pooled keep-alive connections per provider
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", 20))
+# Seconds an idle provider connection is kept open
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", 120))
+# Create the clients and open their connections when the process starts
+PROVIDER_CLIENTS_WARMUP = os.getenv("PROVIDER_CLIENTS_WARMUP", "false").lower() == "true"
+# "offline" swaps every provider for the deterministic stand-ins of apps/offline_providers.py (load tests)
+PROVIDER_BACKEND = os.getenv("PROVIDER_BACKEND", "live")
+# Stand-in latency and errors per provider, as JSON, e.g.
+# {"genai": {"latency": 2.0, "jitter": 0.3, "error_rate": 0.05, "rate_limit_rate": 0.02}}
+OFFLINE_PROVIDER_PROFILES = json.loads(os.getenv("OFFLINE_PROVIDER_PROFILES", "{}"))
+OFFLINE_PROVIDER_SEED = int(os.getenv("OFFLINE_PROVIDER_SEED", 0))
+
+# ElevenLabs requests in flight per script; keep at or below the plan's concurrency limit
+ELEVENLABS_MAX_CONCURRENCY = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", 5))
+# Extra attempts per paragraph after a rate limit or server error
+ELEVENLABS_RETRIES = int(os.getenv("ELEVENLABS_RETRIES", 2))
+# gTTS narrations are split into sentence chunks of at most this many characters
+GTTS_CHUNK_CHARS = int(os.getenv("GTTS_CHUNK_CHARS", 200))
+# gTTS chunk requests in flight per narration
+GTTS_MAX_CONCURRENCY = int(os.getenv("GTTS_MAX_CONCURRENCY", 8))
+# Extra attempts per chunk after a failed gTTS request
+GTTS_RETRIES = int(os.getenv("GTTS_RETRIES", 2))
+# Crossfade at the seams between chunks
+GTTS_CROSSFADE_MS = int(os.getenv("GTTS_CROSSFADE_MS", 30))
+# Synthesized chunks reused by any narration containing the same sentence
+GTTS_CHUNK_CACHE_ROOT = os.path.join(BASE_DIR, 'cache', 'gtts')
+GTTS_CHUNK_CACHE_MAX_BYTES = int(os.getenv("GTTS_CHUNK_CACHE_MAX_BYTES", 256 * 1024 ** 2))
+# Frame rate of the looped text card in generate-video; the picture never changes
+TEXT_VIDEO_FPS = int(os.getenv("TEXT_VIDEO_FPS", 2))
+# TrueType font of the text card (a file name is looked up in the system font directories)
+TEXT_VIDEO_FONT = os.getenv("TEXT_VIDEO_FONT", "DejaVuSans.ttf")
+# Synthesized audio reused for identical requests (GeneratedVoice rows with a cache_key)
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", 1024 ** 3))
+# Seconds an unused entry is kept
+TTS_CACHE_MAX_AGE = int(os.getenv("TTS_CACHE_MAX_AGE", 30 * 24 * 3600))
+
 # OAUTH CONFIGURATION
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
@@ -156,6 +195,41 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Image generation
+# Paragraph images requested from the API at the same time
+IMAGE_GENERATION_MAX_WORKERS = int(os.getenv("IMAGE_GENERATION_MAX_WORKERS", 4))
+# Extra attempts per paragraph after a transient failure
+IMAGE_GENERATION_RETRIES = int(os.getenv("IMAGE_GENERATION_RETRIES", 2))
+# Seconds before a single API call is abandoned
+IMAGE_GENERATION_TIMEOUT = float(os.getenv("IMAGE_GENERATION_TIMEOUT", 60))
+# Generated scene masters keyed by their normalized text and style, evicted least recently used first
+IMAGE_CACHE_ROOT = os.path.join(BASE_DIR, 'cache', 'images')
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 512 * 1024 ** 2))
+# Crops, sizes and encodings derived from the masters
+DERIVED_IMAGE_CACHE_ROOT = os.path.join(BASE_DIR, 'cache', 'derived')
+DERIVED_IMAGE_CACHE_MAX_BYTES = int(os.getenv("DERIVED_IMAGE_CACHE_MAX_BYTES", 256 * 1024 ** 2))
+
+# Video rendering
+# Cores shared by all concurrent renders in this process (defaults to all cores)
+RENDER_CPU_CORES = int(os.getenv("RENDER_CPU_CORES", os.cpu_count() or 1))
+# Upper bound on segments encoded in parallel by one render
+RENDER_MAX_SEGMENT_WORKERS = int(os.getenv("RENDER_MAX_SEGMENT_WORKERS", RENDER_CPU_CORES))
+# Jobs one render worker runs at once, sharing RENDER_CPU_CORES
+RENDER_WORKER_CONCURRENCY = int(os.getenv("RENDER_WORKER_CONCURRENCY", 2))
+# Uploaded inputs of queued render jobs (see manage.py run_render_worker)
+RENDER_JOBS_ROOT = os.path.join(BASE_DIR, 'render_jobs')
+# Blob names of finished videos keyed by a hash of their inputs, evicted least recently used first
+RENDER_CACHE_ROOT = os.path.join(BASE_DIR, 'cache', 'renders')
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", 100000))
+# Stories with burned-in captions, encoded by the render worker after the first request of the burned/ endpoint
+BURNED_VIDEO_CACHE_ROOT = os.path.join(BASE_DIR, 'cache', 'burned')
+BURNED_VIDEO_CACHE_MAX_BYTES = int(os.getenv("BURNED_VIDEO_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+# Resumable uploads of render inputs (see the uploads/ endpoints)
+UPLOAD_SESSION_MAX_BYTES = int(os.getenv("UPLOAD_SESSION_MAX_BYTES", 2 * 1024 ** 3))
+UPLOAD_SESSION_MAX_AGE = int(os.getenv("UPLOAD_SESSION_MAX_AGE", 24 * 3600))
+# Lifetime in seconds of the signed video/image content URLs
+MEDIA_TOKEN_MAX_AGE = int(os.getenv("MEDIA_TOKEN_MAX_AGE", 6 * 3600))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -9,4 +11,7 @@ urlpatterns = [
     path('crawler/', include('apps.crawler.urls')),
     path('api/gen_script/', include('apps.script_generation.urls')),
     path('api/tts/', include('apps.tts_generation.urls')),
-]
\ No newline at end of file
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -29,7 +29,8 @@ function ImageToVideo() {
   const [resolution, setResolution] = useState("1024x1024");
   const [aspect_ratio, setAspectRatio] = useState("1:1");
   const [generatedImage, setGeneratedImage] = useState(null); // Store the generated image
-  const [generatedImages, setGeneratedImages] = useState([]); // Store the generated multiple images
+  const [generatedImages, setGeneratedImages] = useState([]); // One slot per paragraph: { paragraph, image, error }
+  const [retryingIndex, setRetryingIndex] = useState(null);
   const [story, setStory] = useState("");
   const [generatedVideo, setGeneratedVideo] = useState(null);
 
@@ -119,6 +120,27 @@ function ImageToVideo() {
     setLoading(false);
   };
 
+  // Request the images of a story; returns the response data (results are tagged with their paragraph index)
+  const requestStoryImages = async (storyText) => {
+    const response = await fetch("http://127.0.0.1:8000/api/image-video/generate-images/", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({
+        story: storyText,
+        style,
+        resolution,
+        aspect_ratio: aspect_ratio
+      }),
+    });
+    return { ok: response.ok, data: await response.json() };
+  };
+
+  // Image of one result as a data URL, or null when its paragraph failed
+  const resultImage = (data, result) =>
+    result.status === "ok" ? `data:${result.mime_type};base64,${data.images_data[result.index]}` : null;
+
   const handleGenerateImages = async () => {
     if (!story) {
       message.error("Please enter a story.");
@@ -129,23 +151,23 @@ function ImageToVideo() {
     setGeneratedImages([]);
 
     try {
-      const response = await fetch("http://127.0.0.1:8000/api/image-video/generate-images/", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          story,
-          style,
-          resolution,
-          aspect_ratio: aspect_ratio
-        }),
-      });
-
-      const data = await response.json();
-
-      if (response.ok && data.images_data) {
-        setGeneratedImages(data.images_data.map(img => `data:image/png;base64,${img}`));
+      const { ok, data } = await requestStoryImages(story);
+
+      if (data.results) {
+        // Slots follow the paragraphs; a failed paragraph keeps its slot for a retry
+        const paragraphs = story.split("\n").map((p) => p.trim()).filter((p) => p);
+        const slots = paragraphs.map((paragraph) => ({ paragraph, image: null, error: null }));
+        data.results.forEach((result) => {
+          slots[result.index] = {
+            ...slots[result.index],
+            image: resultImage(data, result),
+            error: result.status === "ok" ? null : result.error,
+          };
+        });
+        setGeneratedImages(slots);
+        if (data.failed_count || !ok) {
+          message.warning(`${data.failed_count || slots.length} image(s) failed. Retry them below.`);
+        }
       } else {
         message.error(data.error || "Image generation failed.");
       }
@@ -157,6 +179,27 @@ function ImageToVideo() {
     setLoading(false);
   };
 
+  // Generate the image of one failed paragraph again
+  const handleRetryImage = async (index) => {
+    setRetryingIndex(index);
+    try {
+      const { data } = await requestStoryImages(generatedImages[index].paragraph);
+      const result = data.results && data.results[0];
+      const image = result ? resultImage(data, result) : null;
+      setGeneratedImages((slots) => slots.map((slot, i) => (
+        i === index ? { ...slot, image, error: image ? null : (result && result.error) || data.error } : slot
+      )));
+      if (!image) {
+        message.error(`Image ${index + 1} failed again.`);
+      }
+    } catch (error) {
+      console.error("Error retrying image:", error);
+      message.error("Failed to connect to the API.");
+    } finally {
+      setRetryingIndex(null);
+    }
+  };
+
   const handleGenerateVideoFromImages = async () => {
     if (videoFileList.length < 2) {
       message.error("Please upload at least 2 images for video creation");
@@ -361,8 +404,8 @@ function ImageToVideo() {
 
               {generatedImages.length > 0 && (
                 <div style={{ marginTop: 24 }}>
-                  {generatedImages.map((image, index) => (
-                    <div style={{
+                  {generatedImages.map((slot, index) => (
+                    <div key={index} style={{
                       border: "1px solid #f0f0f0",
                       borderRadius: 8,
                       padding: 16,
@@ -370,21 +413,38 @@ function ImageToVideo() {
                       flexDirection: "column",
                       alignItems: "center",
                     }}>
-                      <img
-                        src={image}
-                        alt={`Generated ${index + 1}`}
-                        style={{
-                          width: "100%",
-                          borderRadius: 4,
-                          marginBottom: 8,
-                        }}
-                      />
-                      <Button
-                        onClick={() => handleSaveImage(image, index)}
-                        style={{ width: "20%" }}
-                      >
-                        Save Image {index + 1}
-                      </Button>
+                      {slot.image ? (
+                        <>
+                          <img
+                            src={slot.image}
+                            alt={`Generated ${index + 1}`}
+                            style={{
+                              width: "100%",
+                              borderRadius: 4,
+                              marginBottom: 8,
+                            }}
+                          />
+                          <Button
+                            onClick={() => handleSaveImage(slot.image, index)}
+                            style={{ width: "20%" }}
+                          >
+                            Save Image {index + 1}
+                          </Button>
+                        </>
+                      ) : (
+                        <>
+                          <Paragraph type="secondary">
+                            Image {index + 1} failed{slot.error ? `: ${slot.error}` : ""}
+                          </Paragraph>
+                          <Button
+                            onClick={() => handleRetryImage(index)}
+                            loading={retryingIndex === index}
+                            style={{ width: "20%" }}
+                          >
+                            Retry
+                          </Button>
+                        </>
+                      )}
                     </div>
                   ))}
                 </div>
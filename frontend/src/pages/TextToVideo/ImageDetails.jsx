@@ -138,7 +138,7 @@ const ImageDetails = ({ video, visible, onClose, onPromptSelect }) => {
               {images.map((img) => (
                 <Image
                   key={img.id}
-                  src={img.image_base64}
+                  src={img.image_url}
                   alt={`Image ${img.order}`}
                   style={{
                     width: "100%",
@@ -114,7 +114,9 @@ const TextToVideo = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(false);
   const [imageLoading, setImageLoading] = useState(false);
-  const [generatedImages, setGeneratedImages] = useState([]);
+  const [generatedImages, setGeneratedImages] = useState([]); // One slot per paragraph, null when the scene failed
+  const [imageParagraphs, setImageParagraphs] = useState([]);
+  const [retryingIndex, setRetryingIndex] = useState(null);
   const [generatedAudios, setGeneratedAudios] = useState([]);
   const [generatedVideo, setGeneratedVideo] = useState(null);
   const [style, setStyle] = useState("Realistic");
@@ -147,27 +149,36 @@ const TextToVideo = () => {
           messageApi.error("Authentication token missing. Please log in again.");
           return;
         }
-        let response = await fetch("http://127.0.0.1:8000/api/image-video/user-videos/", {
-          headers: {
-            "Content-Type": "application/json",
-            "Authorization": `Bearer ${token}`,
-          },
-        });
-        if (response.status === 401) {
-          token = await refreshToken();
-          response = await fetch("http://127.0.0.1:8000/api/image-video/user-videos/", {
+        // The listing is cursor-paginated; follow `next` until the last page
+        const videos = [];
+        let nextUrl = "http://127.0.0.1:8000/api/image-video/user-videos/";
+        while (nextUrl) {
+          let response = await fetch(nextUrl, {
             headers: {
               "Content-Type": "application/json",
               "Authorization": `Bearer ${token}`,
             },
           });
+          if (response.status === 401) {
+            token = await refreshToken();
+            response = await fetch(nextUrl, {
+              headers: {
+                "Content-Type": "application/json",
+                "Authorization": `Bearer ${token}`,
+              },
+            });
+          }
+          if (!response.ok) break;
+          const page = await response.json();
+          videos.push(...page.results);
+          nextUrl = page.next;
         }
-        if (response.ok) {
-          const videos = await response.json();
+        if (!nextUrl) {
           setVideoList(
             videos.map((video) => ({
               id: video.id,
-              url: `data:video/mp4;base64,${video.video_base64}`,
+              url: video.video_url,
+              poster: video.poster_url,
               prompt: video.prompt,
               script: video.prompt,
               image_ids: video.image_ids || [],
@@ -214,7 +225,7 @@ const TextToVideo = () => {
             const data = await retryResponse.json();
             setVideoData({
               id: data.id,
-              url: `data:video/mp4;base64,${data.video_base64}`,
+              url: data.video_url,
               prompt: data.prompt,
               script: data.prompt,
               image_ids: data.images.map((img) => img.id),
@@ -225,7 +236,7 @@ const TextToVideo = () => {
             const data = await response.json();
             setVideoData({
               id: data.id,
-              url: `data:video/mp4;base64,${data.video_base64}`,
+              url: data.video_url,
               prompt: data.prompt,
               script: data.prompt,
               image_ids: data.images.map((img) => img.id),
@@ -561,72 +572,146 @@ const TextToVideo = () => {
     return new File([blob], filename, { type: mimeType });
   };
 
-  // Handle image generation
-  const generateImages = async (finalPrompt) => {
-    try {
-      let token = localStorage.getItem(ACCESS_TOKEN);
-      if (!token) {
-        throw new Error("Authentication token missing. Please log in again.");
-      }
+  // Paragraphs of the image prompt, split like the backend does; slot i of generatedImages is paragraph i
+  const splitParagraphs = (text) => text.split("\n").map((p) => p.trim()).filter((p) => p);
 
-      setImageLoading(true);
+  // Stream the scenes of a story; onImage(index, image) gets each finished scene, image is null when it failed
+  const streamSceneImages = async (story, onImage) => {
+    let token = localStorage.getItem(ACCESS_TOKEN);
+    if (!token) {
+      throw new Error("Authentication token missing. Please log in again.");
+    }
 
-      let imageResponse = await fetch("http://127.0.0.1:8000/api/image-video/generate-images/", {
+    // Scenes stream in as NDJSON, one line per image as soon as it is ready
+    const requestImages = () =>
+      fetch("http://127.0.0.1:8000/api/image-video/generate-images/stream/", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
         body: JSON.stringify({
-          story: finalPrompt,
+          story,
           style: style.toLowerCase(),
           resolution: resolution,
           aspect_ratio: "16:9",
         }),
       });
 
-      if (imageResponse.status === 401) {
-        token = await refreshToken();
-        imageResponse = await fetch("http://127.0.0.1:8000/api/image-video/generate-images/", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-            "Authorization": `Bearer ${token}`,
-          },
-          body: JSON.stringify({
-            story: finalPrompt,
-            style: style.toLowerCase(),
-            resolution: resolution,
-            aspect_ratio: "16:9",
-          }),
-        });
-      }
+    let imageResponse = await requestImages();
+    if (imageResponse.status === 401) {
+      token = await refreshToken();
+      imageResponse = await requestImages();
+    }
 
-      const imageData = await imageResponse.json();
-      console.log("Image generation response:", imageData);
-      if (!imageResponse.ok) {
-        throw new Error(imageData.error || "Failed to generate images.");
-      }
-      if (!imageData.images_data || !Array.isArray(imageData.images_data)) {
-        throw new Error("Invalid images returned from server.");
-      }
+    if (!imageResponse.ok) {
+      const errorData = await imageResponse.json();
+      throw new Error(errorData.error || "Failed to generate images.");
+    }
 
-      const validImages = imageData.images_data.filter((img) => img);
-      if (validImages.length < 2) {
-        throw new Error("Not enough valid images generated (minimum 2 required).");
+    const reader = imageResponse.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split("\n");
+      buffer = lines.pop();
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const event = JSON.parse(line);
+        if (event.type === "image") {
+          if (event.status !== "ok") {
+            console.error(`Image ${event.index + 1} failed:`, event.error);
+          }
+          onImage(event.index, event.status === "ok" ? event.image : null);
+        }
       }
+    }
+  };
+
+  // Handle image generation
+  const generateImages = async (finalPrompt) => {
+    try {
+      setImageLoading(true);
+
+      const paragraphs = splitParagraphs(finalPrompt);
+      setImageParagraphs(paragraphs);
+      // Failed scenes stay null in their slot, so every image keeps its paragraph (and audio)
+      const imagesByIndex = new Array(paragraphs.length).fill(null);
+      setGeneratedImages([...imagesByIndex]);
+      await streamSceneImages(finalPrompt, (index, image) => {
+        imagesByIndex[index] = image;
+        // Show every finished scene right away, in story order
+        setGeneratedImages([...imagesByIndex]);
+      });
 
-      setGeneratedImages(validImages);
-      messageApi.success("Images generated successfully!");
-      return validImages;
+      const failed = imagesByIndex.filter((img) => !img).length;
+      if (failed === imagesByIndex.length) {
+        throw new Error("Image generation failed for every scene.");
+      }
+      if (failed > 0) {
+        messageApi.warning(`${failed} scene(s) failed. Retry them before generating the video.`);
+      } else {
+        messageApi.success("Images generated successfully!");
+      }
+      return imagesByIndex;
     } catch (error) {
       console.error("Error during image generation:", error);
       messageApi.error(error.message || "Failed to generate images.");
+      return [];
     } finally {
       setImageLoading(false);
     }
   };
 
+  // Retry the image of one failed scene
+  const handleRetryImage = async (index) => {
+    setRetryingIndex(index);
+    try {
+      let image = null;
+      await streamSceneImages(imageParagraphs[index], (_, result) => {
+        image = result;
+      });
+      if (!image) {
+        throw new Error(`Scene ${index + 1} failed again.`);
+      }
+      setGeneratedImages((images) => images.map((img, i) => (i === index ? image : img)));
+    } catch (error) {
+      console.error("Error retrying image:", error);
+      messageApi.error(error.message || "Failed to generate the image.");
+    } finally {
+      setRetryingIndex(null);
+    }
+  };
+
+  // Poll a render job until the video is ready
+  const waitForRenderJob = async (jobId) => {
+    const resultUrl = `http://127.0.0.1:8000/api/image-video/render-jobs/${jobId}/result/`;
+    while (true) {
+      let token = localStorage.getItem(ACCESS_TOKEN);
+      let response = await fetch(resultUrl, {
+        headers: { "Authorization": `Bearer ${token}` },
+      });
+      if (response.status === 401) {
+        token = await refreshToken();
+        response = await fetch(resultUrl, {
+          headers: { "Authorization": `Bearer ${token}` },
+        });
+      }
+
+      const data = await response.json();
+      if (response.status === 200) {
+        return data;
+      }
+      if (response.status !== 202) {
+        throw new Error(data.error || "Video generation failed.");
+      }
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+  };
+
   // Handle generation (images, audios, and video)
   const handleGenerate = async () => {
     console.log("handleGenerate called with prompt:", prompt);
@@ -668,15 +753,15 @@ const TextToVideo = () => {
         // Step 3: Generate images if not already generated
         images = await generateImages(imagePrompt);
         if (images.length < 2) {
-          throw new Error(`Not enough images generated (${generatedImages.length}). Minimum 2 required.`);
+          throw new Error(`Not enough images generated (${images.length}). Minimum 2 required.`);
         }
       } else {
-        // Step 4: Generate video with images and audios
-        const imageFiles = generatedImages
-        .filter((img) => img)
-        .map((base64, index) => base64ToFile(base64, `image_${index}.png`));
+        // Step 4: Generate video with images and audios, once every scene has its image
+        if (images.some((img) => !img)) {
+          throw new Error("Some scenes have no image yet. Retry them before generating the video.");
+        }
+        const imageFiles = images.map((base64, index) => base64ToFile(base64, `image_${index}.png`));
 
-      
         if (images.length !== audios.length) {
           throw new Error(`Final image-audio mismatch after processing. Images: ${images.length}, Audios: ${audios.length}`);
         }
@@ -716,11 +801,17 @@ const TextToVideo = () => {
           });
         }
 
-        const videoData = await videoResponse.json();
-        if (videoResponse.ok && videoData.video_base64) {
+        const renderJob = await videoResponse.json();
+        if (!videoResponse.ok) {
+          throw new Error(renderJob.error || "Video generation failed.");
+        }
+
+        // The video is rendered in the background; wait for the job to finish
+        const videoData = await waitForRenderJob(renderJob.job_id);
+        if (videoData.video_url) {
           const newVideo = {
             id: videoData.video_id,
-            url: `data:video/mp4;base64,${videoData.video_base64}`,
+            url: videoData.video_url,
             prompt: videoData.prompt,
             script: videoData.prompt,
             image_ids: [],
@@ -869,6 +960,8 @@ const TextToVideo = () => {
         imageLoading={imageLoading}
         storyLoading={storyLoading}
         generatedImages={generatedImages}
+        onRetryImage={handleRetryImage}
+        retryingIndex={retryingIndex}
         style={style}
         setStyle={setStyle}
         resolution={resolution}
@@ -14,6 +14,8 @@ function UserInputSection({
   imageLoading,
   storyLoading,
   generatedImages,
+  onRetryImage,
+  retryingIndex,
   style,
   setStyle,
   resolution,
@@ -31,6 +33,9 @@ function UserInputSection({
     }
   };
 
+  // A failed scene keeps its slot; the video needs every slot filled
+  const missingImages = generatedImages.some((img) => !img);
+
   const styleOptions = ["Realistic", "Cartoon", "Abstract", "Painting"];
   const resolutionOptions = ["512x512", "1024x1024", "1280x720"];
 
@@ -111,7 +116,35 @@ function UserInputSection({
                       }}
                     />
                   </div>
-                ) : null
+                ) : (
+                  <Flex
+                    key={index}
+                    vertical
+                    justify="center"
+                    align="center"
+                    gap="small"
+                    style={{
+                      flex: "0 0 auto",
+                      width: "calc(25% - 12px)",
+                      minWidth: "200px",
+                      minHeight: "112px",
+                      borderRadius: "8px",
+                      border: "1px dashed #d9d9d9",
+                      background: "#fafafa",
+                    }}
+                  >
+                    <span style={{ color: "#8c8c8c" }}>Scene {index + 1} has no image</span>
+                    <Button
+                      size="small"
+                      icon={<ReloadOutlined />}
+                      onClick={() => onRetryImage(index)}
+                      loading={retryingIndex === index}
+                      disabled={imageLoading || storyLoading}
+                    >
+                      Retry
+                    </Button>
+                  </Flex>
+                )
               )}
             </div>
           </div>
@@ -205,7 +238,7 @@ function UserInputSection({
           }}
           onClick={handleGenerate}
           loading={loading || imageLoading}
-          disabled={storyLoading}
+          disabled={storyLoading || missingImages}
         >
           {generatedImages.length > 0 ? "Generate Video" : "Generate Images"}
         </Button>
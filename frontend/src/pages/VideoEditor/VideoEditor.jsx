@@ -117,8 +117,8 @@ const VideoEditor = () => {
                 return;
             }
 
-            const request = async () => {
-                const response = await fetch("http://127.0.0.1:8000/api/image-video/user-videos/", {
+            const request = async (url) => {
+                const response = await fetch(url, {
                     headers: {
                         "Content-Type": "application/json",
                         "Authorization": `Bearer ${token}`,
@@ -127,7 +127,7 @@ const VideoEditor = () => {
 
                 if (response.status === 401) {
                     token = await refreshToken();
-                    return await fetch("http://127.0.0.1:8000/api/image-video/user-videos/", {
+                    return await fetch(url, {
                         headers: {
                             "Content-Type": "application/json",
                             "Authorization": `Bearer ${token}`,
@@ -137,22 +137,29 @@ const VideoEditor = () => {
                 return response;
             };
 
-            const response = await request();
-
-            if (response.ok) {
-                const videos = await response.json();
-                setVideoList(
-                    videos.map((video) => ({
-                        id: video.id,
-                        url: `data:video/mp4;base64,${video.video_base64}`,
-                        prompt: video.prompt,
-                        script: video.prompt,
-                        image_ids: video.image_ids || [],
-                    }))
-                );
-            } else {
-                throw new Error("Failed to fetch videos");
+            // The listing is cursor-paginated; follow `next` until the last page
+            const videos = [];
+            let nextUrl = "http://127.0.0.1:8000/api/image-video/user-videos/";
+            while (nextUrl) {
+                const response = await request(nextUrl);
+                if (!response.ok) {
+                    throw new Error("Failed to fetch videos");
+                }
+                const page = await response.json();
+                videos.push(...page.results);
+                nextUrl = page.next;
             }
+
+            setVideoList(
+                videos.map((video) => ({
+                    id: video.id,
+                    url: video.video_url,
+                    poster: video.poster_url,
+                    prompt: video.prompt,
+                    script: video.prompt,
+                    image_ids: video.image_ids || [],
+                }))
+            );
         } catch (error) {
             console.error("Error fetching videos:", error);
             message.error("Error fetching videos: " + error.message);
@@ -55,6 +55,8 @@ function VideoList({ videos = [], onVideoClick }) {
             <video
               style={videoStyle}
               src={video.url}
+              poster={video.poster}
+              preload={video.poster ? "none" : "auto"}
               autoPlay
               muted
               loop